@@ -0,0 +1,47 @@
+$env:NO_PROXY = "169.254.169.343"
+
+# Akeyless and Azure config
+$akeyless_base_url = "http://169.254.169.254/metadata/identity/oauth2/token"
+$config_url = "https://api.secmgmt-uat.cvshealth.com"
+$access_id = "p-dfgdfgfdf"
+$secret_path = "/cvs/sssharedservices/fgdf-fgdgdf/secrets/azure/sp-sssharedservices-ftslinq-dev"
+
+# Step 1: Get Azure AD token from IMDS
+$headers = @{ "Metadata" = "true" }
+$params = @{
+    "api-version" = "2018-02-01"
+    "resource"    = "https://management.azure.com/"
+}
+
+$response = Invoke-RestMethod -Uri $akeyless_base_url -Headers $headers -Method GET -Body $null -UseBasicParsing -ContentType "application/x-www-form-urlencoded" -DisableKeepAlive -TimeoutSec 10 -ErrorAction Stop -Verbose:$false -MaximumRedirection 5 -AllowUnencryptedAuthentication:$true -SkipCertificateCheck:$true -Proxy:$null -ProxyUseDefaultCredentials:$false -ProxyCredential:$null -ProxyBypassList:$null -ProxyBypassOnLocal:$false -Force:$true -OutFile:$null -ResponseHeadersVariable "respHeaders" -BodyParameters $params
+
+$cloud_id = $response.access_token
+Write-Host "Access Token: $cloud_id"
+
+# Step 2: Convert token to Base64
+$base64_cloud_id = [Convert]::ToBase64String([System.Text.Encoding]::UTF8.GetBytes($cloud_id))
+Write-Host "Base64 Access Token: $base64_cloud_id"
+
+# Step 3: Authenticate to Akeyless
+$auth_body = @{
+    "access_id"  = $access_id
+    "access_type" = "azure_ad"
+    "cloud_id"    = $base64_cloud_id
+}
+
+$auth_response = Invoke-RestMethod -Uri "$config_url/v2/auth" -Method POST -Body ($auth_body | ConvertTo-Json -Depth 3) -ContentType "application/json"
+$token = $auth_response.token
+Write-Host "Akeyless Session Token: $token"
+
+# Step 4: Fetch the rotated secret
+$secret_body = @{
+    "name"  = $secret_path
+    "token" = $token
+}
+
+$secret_response = Invoke-RestMethod -Uri "$config_url/v2/rotated-secret-get-value" -Method POST -Body ($secret_body | ConvertTo-Json -Depth 3) -ContentType "application/json"
+$secret = $secret_response.value
+
+Write-Host "Secret:"
+$secret | Format-List
+
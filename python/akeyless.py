@@ -1,22 +1,19 @@
-import requests
 import base64
 
+from imds_token import default_provider
 
-# Step 1: Get the token from IMDS
-url = "http://169.254.169.254/metadata/identity/oauth2/token"
-headers = { "Metadata": "true" }
-params = {
-    "api-version": "2018-02-01",
-    "resource": "https://akeyless.io"
-}
+AKEYLESS_RESOURCE = "https://akeyless.io"
 
-response = requests.get(url, headers=headers, params=params)
-response.raise_for_status()
+def base64_access_token(resource=AKEYLESS_RESOURCE):
+    # Step 1: Get the token from IMDS (cached and refreshed in the background by the shared provider)
+    access_token = default_provider().get_token(resource)
 
-access_token = response.json()["access_token"]
+    # Step 2: Convert to Base64
+    token_bytes = access_token.encode("utf-8")
+    return base64.b64encode(token_bytes).decode("utf-8")
 
-# Step 2: Convert to Base64
-token_bytes = access_token.encode("utf-8")
-base64_token = base64.b64encode(token_bytes).decode("utf-8")
+def main():
+    print("Base64 Access Token:", base64_access_token())
 
-print("Base64 Access Token:", base64_token)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# Startup cost of fetching many rotated secrets: one full flow per path vs. SecretProvider.get_secrets
+# Run from the python/ directory: python -m benchmarks.bulk_secrets --secrets 40 --latency 0.1
+import argparse
+import time
+
+from benchmarks.fake_services import FakeServices
+from secret_provider import SecretProvider
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk secret fetch benchmark")
+    parser.add_argument('--secrets', type=int, default=40)
+    parser.add_argument('--latency', type=float, default=0.1, help="seconds added to every stub call")
+    parser.add_argument('--concurrency', type=int, default=40)
+    args = parser.parse_args()
+
+    paths = [f"/team/secrets/azure/sp-job-{i}" for i in range(args.secrets)]
+
+    with FakeServices(latency=args.latency) as services:
+        # What akey_rot_key.py did per path: IMDS token, auth, then the secret, all sequential
+        start = time.perf_counter()
+        for path in paths:
+            provider = SecretProvider(services.url, 'p-test', imds_url=services.imds_url)
+            provider.get_secret(path)
+            provider.token_provider.close()
+        sequential = time.perf_counter() - start
+        print(f"sequential full flow x{args.secrets}: {sequential:7.3f}s  stub calls {services.calls}")
+
+    with FakeServices(latency=args.latency) as services:
+        provider = SecretProvider(services.url, 'p-test', imds_url=services.imds_url)
+        start = time.perf_counter()
+        secrets, errors = provider.get_secrets(paths + ['/team/secrets/missing'], max_concurrency=args.concurrency)
+        bulk = time.perf_counter() - start
+        print(f"get_secrets x{args.secrets}:           {bulk:7.3f}s  stub calls {services.calls}")
+        print(f"fetched {len(secrets)}, errors {len(errors)}: {[str(e)[:40] for e in errors.values()]}")
+        print(f"speedup {sequential / bulk:.0f}x")
+
+if __name__ == "__main__":
+    main()
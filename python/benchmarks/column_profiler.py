@@ -0,0 +1,74 @@
+# Benchmark for column_profiler.profile_file against the old whole-file df.astype(str).applymap(len) check
+# (df_column_len.py), on a generated CSV; also profiles an .xlsx copy and checks edge-case sheets.
+# Run from the python/ directory: python -m benchmarks.column_profiler --rows 300000
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from column_profiler import iter_chunks, profile_file
+
+LIMIT = 30
+
+def make_frame(rows, columns=10, seed=12):
+    rng = np.random.default_rng(seed)
+    data = {}
+    for index in range(columns):
+        lengths = rng.integers(1, LIMIT + 5, rows)
+        data[f"col_{index}"] = [('x' * length) for length in lengths]
+    return pd.DataFrame(data)
+
+# What df_column_len.py did before: every value's length through a per-cell Python call
+def applymap_check(path):
+    df = pd.read_csv(path, dtype=str)
+    return int(df.astype(str).map(len).gt(LIMIT).to_numpy().sum())
+
+def check_sheets(tmp):
+    empty = os.path.join(tmp, 'empty.xlsx')
+    Workbook().save(empty)
+    assert list(iter_chunks(empty)) == []
+    assert profile_file(empty).empty
+
+    blank_header = os.path.join(tmp, 'blank_header.xlsx')
+    workbook = Workbook()
+    workbook.active.append(['name', None, 'zone'])
+    workbook.active.append(['a', 'b', 'c'])
+    workbook.save(blank_header)
+    assert list(next(iter_chunks(blank_header)).columns) == list(pd.read_excel(blank_header).columns)
+    print("empty sheet and blank header cells ok")
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:7.2f}s")
+    return result, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Column length profiler benchmark")
+    parser.add_argument('--rows', type=int, default=300000)
+    parser.add_argument('--xlsx-rows', type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        check_sheets(tmp)
+
+        df = make_frame(args.rows)
+        csv_path = os.path.join(tmp, 'load.csv')
+        df.to_csv(csv_path, index=False)
+
+        over, old = timed("applymap(len), whole file", applymap_check, csv_path)
+        report, new = timed("profile_file, streamed", profile_file, csv_path, None, LIMIT)
+        assert int(report['over_limit_rows'].sum()) == over
+        print(f"{'':<28} {old / new:6.1f}x faster, {over} values over {LIMIT}")
+
+        xlsx_path = os.path.join(tmp, 'load.xlsx')
+        df.head(args.xlsx_rows).to_excel(xlsx_path, index=False)
+        timed(f"profile_file, {args.xlsx_rows} xlsx rows", profile_file, xlsx_path, None, LIMIT)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# Benchmark for data_diff.diff_table_rows against exporting both copies of a table to pandas, on two SQLite
+# databases standing in for dev and prod. The point is what crosses the wire: rows read should follow
+# the number of differences, not the table size.
+# Run from the python/ directory: python -m benchmarks.data_diff --rows 2000000
+import argparse
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, event, text
+
+from data_diff import diff_table_rows
+
+COLUMNS = ['id', 'site', 'status', 'amount', 'updated_at', 'notes']
+STATUSES = ['open', 'closed', 'pending', 'cancelled']
+
+def make_engine(path, **kwargs):
+    engine = create_engine(f"sqlite:///{path}", **kwargs)
+
+    # Stand-ins for the md5()/bit(32) casts PostgreSQL does natively
+    @event.listens_for(engine, 'connect')
+    def register_functions(dbapi_connection, _):
+        dbapi_connection.create_function('md5', 1, lambda value: hashlib.md5(value.encode()).hexdigest(),
+                                         deterministic=True)
+        dbapi_connection.create_function('hex_int', 1, lambda value: int(value, 16), deterministic=True)
+    return engine
+
+def make_database(path, rows, seed=22):
+    rng = np.random.default_rng(seed)
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE work_orders (id INTEGER PRIMARY KEY, site TEXT, status TEXT, amount REAL,
+                                      updated_at TEXT, notes TEXT)
+        """))
+        for start in range(0, rows, 500000):
+            count = min(500000, rows - start)
+            # Ids with gaps, as a table with deletes has
+            ids = start * 3 // 2 + np.sort(rng.choice(count * 3 // 2, count, replace=False))
+            frame = pd.DataFrame({
+                'id': ids,
+                'site': [f"SITE{site:05d}" for site in rng.integers(0, 20000, count)],
+                'status': rng.choice(STATUSES, count),
+                'amount': np.round(rng.random(count) * 5000, 2),
+                'updated_at': (np.datetime64('2024-01-01T00:00') + rng.integers(0, 10 ** 6, count)).astype(str),
+                'notes': np.where(rng.random(count) < 0.3, None, 'checked'),
+            })
+            conn.exec_driver_sql("INSERT INTO work_orders VALUES (?, ?, ?, ?, ?, ?)",
+                                 list(frame.itertuples(index=False, name=None)))
+    engine.dispose()
+
+# Drift prod from dev: half the differences edited rows, a quarter deleted, a quarter new. Returns the keys
+def drift(engine, differences, seed):
+    rng = np.random.default_rng(seed)
+    with engine.begin() as conn:
+        top = conn.execute(text("SELECT MAX(id) FROM work_orders")).scalar()
+        ids = conn.execute(text("SELECT id FROM work_orders ORDER BY random() LIMIT :n"),
+                           {'n': differences - differences // 4}).scalars().all()
+        edited, deleted = ids[:differences // 2], ids[differences // 2:]
+        added = [top + 1 + int(offset) for offset in rng.choice(10 ** 6, differences // 4, replace=False)]
+        for statement, keys in (
+            ("UPDATE work_orders SET status = 'reopened', amount = amount + 1 WHERE id = :id", edited),
+            ("DELETE FROM work_orders WHERE id = :id", deleted),
+            ("INSERT INTO work_orders VALUES (:id, 'SITE99999', 'open', 1.5, '2026-10-18T00:00', NULL)", added),
+        ):
+            if keys:
+                conn.execute(text(statement), [{'id': key} for key in keys])
+    return set(edited) | set(deleted) | set(added)
+
+# What comparing environments costs without range hashing: both tables read in full and merged in pandas
+def export_diff(dev, prod):
+    with dev.connect() as conn:
+        left = pd.read_sql(text("SELECT * FROM work_orders"), conn)
+    with prod.connect() as conn:
+        right = pd.read_sql(text("SELECT * FROM work_orders"), conn)
+    merged = left.merge(right, on='id', how='outer', suffixes=('_dev', '_prod'), indicator=True)
+    differs = merged['_merge'] != 'both'
+    for name in COLUMNS[1:]:
+        differs |= (merged[f"{name}_dev"] != merged[f"{name}_prod"]) & \
+                   ~(merged[f"{name}_dev"].isna() & merged[f"{name}_prod"].isna())
+    return set(merged.loc[differs, 'id']), len(left) + len(right)
+
+# Changes that leave every range's sum of row hashes intact unless the key is hashed with the row:
+# two rows swapping all their values, and a row moved to an unused id in the same range
+def check_swaps(tmp):
+    dev_path = os.path.join(tmp, 'swap_dev.db')
+    make_database(dev_path, 5000)
+    dev = make_engine(dev_path)
+    values = ', '.join(COLUMNS[1:])
+
+    def swap(conn):
+        first, second = conn.execute(text("SELECT id FROM work_orders ORDER BY id LIMIT 2")).scalars().all()
+        rows = {row[0]: row[1:] for row in conn.execute(text(f"SELECT id, {values} FROM work_orders "
+                                                             "WHERE id IN (:a, :b)"), {'a': first, 'b': second})}
+        conn.execute(text(f"UPDATE work_orders SET ({values}) = ({', '.join(f':{name}' for name in COLUMNS[1:])}) "
+                          "WHERE id = :id"),
+                     [dict(zip(COLUMNS, (first, *rows[second]))), dict(zip(COLUMNS, (second, *rows[first])))])
+        return {(first, 'modified'), (second, 'modified')}
+
+    def renumber(conn):
+        moved = conn.execute(text("SELECT MIN(id) FROM work_orders w WHERE NOT EXISTS "
+                                  "(SELECT 1 FROM work_orders WHERE id = w.id + 1)")).scalar()
+        conn.execute(text("UPDATE work_orders SET id = id + 1 WHERE id = :id"), {'id': moved})
+        return {(moved, 'added'), (moved + 1, 'removed')}
+
+    for name, change in (('swapped rows', swap), ('renumbered row', renumber)):
+        prod_path = os.path.join(tmp, 'swap_prod.db')
+        shutil.copy(dev_path, prod_path)
+        prod = make_engine(prod_path)
+        with prod.begin() as conn:
+            expected = change(conn)
+        changes, _ = diff_table_rows(dev, prod, 'work_orders', 'id', COLUMNS)
+        found = {(row_change['key'], row_change['change']) for row_change in changes}
+        assert found == expected, (name, found, expected)
+        print(f"{name:<15} found {sorted(found)}")
+        prod.dispose()
+        os.remove(prod_path)
+    dev.dispose()
+
+# Modified timestamptz values come back timezone-aware; the Row Changes sheet must still be writable.
+# SQLite returns them as aware datetimes through a TIMESTAMPTZ converter, as psycopg2 does on PostgreSQL.
+def check_timestamptz(tmp):
+    import compare_db_schema
+
+    sqlite3.register_converter('TIMESTAMPTZ', lambda value: datetime.fromisoformat(value.decode()))
+    engines = []
+    for name, happened_at in (('tz_dev', '2026-10-01 09:00:00+00:00'), ('tz_prod', '2026-10-01 12:00:00+02:00')):
+        engine = make_engine(os.path.join(tmp, f"{name}.db"), connect_args={'detect_types': sqlite3.PARSE_DECLTYPES})
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE events (id INTEGER PRIMARY KEY, happened_at TIMESTAMPTZ)"))
+            conn.execute(text("INSERT INTO events VALUES (1, :at), (2, '2026-10-02 00:00:00+00:00')"),
+                         {'at': happened_at})
+        engines.append(engine)
+
+    changes, _ = diff_table_rows(*engines, 'events', 'id', ['id', 'happened_at'])
+    assert [(change['key'], change['column']) for change in changes] == [(1, 'happened_at')], changes
+    compare_db_schema.file_name = os.path.join(tmp, 'tz_diff.xlsx')
+    compare_db_schema.write_to_excel({'added': [], 'removed': []}, [], row_changes=changes)
+    assert pd.read_excel(compare_db_schema.file_name, sheet_name='Row Changes')['source_value'].tolist() == \
+        ['2026-10-01 09:00:00+00:00']
+    for engine in engines:
+        engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Row-level data diff benchmark")
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--differences', type=int, nargs='+', default=[0, 10, 1000, 10000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dev_path = os.path.join(tmp, 'dev.db')
+        start = time.perf_counter()
+        make_database(dev_path, args.rows)
+        print(f"{args.rows} work orders written in {time.perf_counter() - start:.0f}s")
+        check_swaps(tmp)
+        check_timestamptz(tmp)
+        dev = make_engine(dev_path)
+
+        for differences in args.differences:
+            prod_path = os.path.join(tmp, f"prod_{differences}.db")
+            shutil.copy(dev_path, prod_path)
+            prod = make_engine(prod_path)
+            expected = drift(prod, differences, differences)
+
+            start = time.perf_counter()
+            changes, stats = diff_table_rows(dev, prod, 'work_orders', 'id', COLUMNS)
+            elapsed = time.perf_counter() - start
+            assert {change['key'] for change in changes} == expected
+            print(f"{differences:>6} differences  range hashing {elapsed:7.2f}s  "
+                  f"{stats['source_rows'] + stats['target_rows']:>8} rows read in "
+                  f"{stats['source_queries'] + stats['target_queries']:>5} queries, {stats['ranges']} ranges split")
+
+            if differences == args.differences[-1]:
+                start = time.perf_counter()
+                found, read = export_diff(dev, prod)
+                assert found == expected
+                print(f"{differences:>6} differences  full export   {time.perf_counter() - start:7.2f}s  "
+                      f"{read:>8} rows read")
+            prod.dispose()
+            os.remove(prod_path)
+        dev.dispose()
+
+if __name__ == "__main__":
+    main()
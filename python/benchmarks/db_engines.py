@@ -0,0 +1,107 @@
+# Connections opened by parallel scripts: an engine created (and disposed) per unit of work, as
+# compare_db_schema.get_engine and gen_sr_summary_report did, vs. db_engines' shared pool. Connecting pays a
+# simulated TLS + auth round trip and every statement a network round trip, as against a remote PostgreSQL.
+# Also checks that named read-only queries go to the replica and everything else to the primary.
+# Run from the python/ directory: python -m benchmarks.db_engines --workers 16 --tasks 20
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+
+import db_engines
+
+opened = {'count': 0, 'peak': 0, 'open': 0}
+opened_lock = threading.Lock()
+
+def simulate_network(connect_latency, query_latency):
+    @event.listens_for(Engine, 'connect')
+    def connect(dbapi_connection, _):
+        time.sleep(connect_latency)
+        with opened_lock:
+            opened['count'] += 1
+            opened['open'] += 1
+            opened['peak'] = max(opened['peak'], opened['open'])
+
+    @event.listens_for(Engine, 'close')
+    def close(dbapi_connection, _):
+        with opened_lock:
+            opened['open'] -= 1
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def round_trip(*args):
+        time.sleep(query_latency)
+
+def make_database(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE staff_master (id INTEGER PRIMARY KEY, tech_id TEXT)"))
+        conn.execute(text("INSERT INTO staff_master VALUES (:id, :tech_id)"),
+                     [{'id': n, 'tech_id': f"T{n:06d}"} for n in range(1000)])
+    engine.dispose()
+
+def task(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT COUNT(*) FROM staff_master")).scalar()
+
+def engine_per_task(url):
+    engine = create_engine(url)
+    try:
+        return task(engine)
+    finally:
+        engine.dispose()
+
+def shared_engine(url):
+    return task(db_engines.get_engine(url))
+
+def run(label, func, url, workers, tasks):
+    opened.update(count=0, peak=0, open=0)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda _: func(url), range(workers * tasks)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<18} {elapsed:7.2f}s  {opened['count']:>5} connections opened, peak {opened['peak']:>3} open")
+    return elapsed
+
+# Which file each query name reads from, with the primary and replica holding different row counts
+def check_routing(tmp):
+    primary, replica = os.path.join(tmp, 'primary.db'), os.path.join(tmp, 'replica.db')
+    make_database(primary)
+    make_database(replica)
+    with create_engine(f"sqlite:///{replica}").begin() as conn:
+        conn.execute(text("DELETE FROM staff_master WHERE id >= 10"))
+    config = {'url': f"sqlite:///{primary}", 'replicas': [f"sqlite:///{replica}"]}
+    for query, expected in (('catalog', 10), ('severity_summary', 10), ('data_diff', 1000), (None, 1000)):
+        rows = task(db_engines.get_engine(config, query))
+        assert rows == expected, (query, rows)
+        print(f"query {str(query):<17} -> {'replica' if rows == 10 else 'primary'}")
+    assert db_engines.get_engine(config) is db_engines.get_engine(dict(config))
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared engine registry benchmark")
+    parser.add_argument('--workers', type=int, default=16, help="concurrent callers, e.g. scripts run in parallel")
+    parser.add_argument('--tasks', type=int, default=20, help="queries per caller")
+    parser.add_argument('--connect-latency-ms', type=float, default=30)
+    parser.add_argument('--latency-ms', type=float, default=2)
+    args = parser.parse_args()
+
+    simulate_network(args.connect_latency_ms / 1000, args.latency_ms / 1000)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        make_database(path)
+        url = f"sqlite:///{path}"
+
+        per_task = run('engine per task', engine_per_task, url, args.workers, args.tasks)
+        shared = run('shared pool', shared_engine, url, args.workers, args.tasks)
+        print(f"{'':<18} {per_task / shared:6.1f}x faster")
+        db_engines.print_pool_metrics()
+
+        check_routing(tmp)
+        db_engines.dispose_all()
+
+if __name__ == "__main__":
+    main()
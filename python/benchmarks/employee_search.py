@@ -0,0 +1,161 @@
+# Latency benchmark for the in-memory EmployeeSearchIndex against the ILIKE scan search_all_emp() does,
+# on a SQLite stand-in for new_hires/employees.
+# Run from the python/ directory: python -m benchmarks.employee_search --rows 1000000
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from employee_search import EmployeeSearchIndex
+
+SYLLABLES = ['an', 'ar', 'be', 'ca', 'da', 'el', 'fi', 'go', 'ha', 'is', 'jo', 'ka', 'li', 'ma', 'ne',
+             'or', 'pa', 'ri', 'sa', 'ta', 'ul', 'va', 'wi', 'ya', 'zo', 'mi', 'ro', 'de', 'na', 'te']
+REQ_STATUSES = ['Open', 'Filled', 'On Hold', 'Cancelled']
+HIRE_STATUSES = ['Offered', 'Joined', 'Declined', 'Pending']
+ZONES = [f"Z{zone}" for zone in range(12)]
+
+# search_all_emp() with the same OR-of-ILIKE search and equality filters, as SQLite can run it
+SQL_SEARCH = """
+    WITH cte AS (
+        SELECT nh.id AS emp_id, e.first_name || ' ' || e.last_name AS emp_full_name, nh.manager_id AS emp_manager_id
+        FROM new_hires nh
+        LEFT JOIN employees e ON e.id = nh.old_emp_id
+        WHERE ({search}) AND (:zone IS NULL OR nh.zone = :zone)
+    )
+    SELECT cte.emp_id FROM cte JOIN employees m ON m.id = cte.emp_manager_id
+"""
+
+def make_names(rng, count, syllables):
+    return sorted({''.join(rng.choice(SYLLABLES) for _ in range(syllables)).capitalize() for _ in range(count)})
+
+def make_database(path, rows, seed=5):
+    rng = random.Random(seed)
+    first_names = make_names(rng, 3000, 3)
+    last_names = make_names(rng, 20000, 4)
+    employee_count = max(rows // 2, 1000)
+    np_rng = np.random.default_rng(seed)
+
+    employees = pd.DataFrame({
+        'id': np.arange(1, employee_count + 1),
+        'first_name': np.array(first_names, object)[np_rng.integers(0, len(first_names), employee_count)],
+        'last_name': np.array(last_names, object)[np_rng.integers(0, len(last_names), employee_count)],
+        'updated_at': '2026-10-01 00:00:00',
+    })
+    old_emp_ids = np_rng.integers(1, employee_count + 1, rows).astype(float)
+    old_emp_ids[np_rng.random(rows) < 0.3] = np.nan
+    new_hires = pd.DataFrame({
+        'id': np.arange(1, rows + 1),
+        'req_num': [f"REQ-{n:07d}" for n in np_rng.permutation(rows)],
+        'req_status': np_rng.choice(REQ_STATUSES, rows),
+        'hire_status': np_rng.choice(HIRE_STATUSES, rows),
+        'zone': np_rng.choice(ZONES, rows),
+        'manager_id': np_rng.integers(1, min(employee_count, 5000) + 1, rows),
+        'old_emp_id': pd.array(old_emp_ids, dtype='Int64'),
+        'updated_at': '2026-10-01 00:00:00',
+    })
+
+    engine = create_engine(f"sqlite:///{path}")
+    employees.to_sql('employees', engine, index=False, chunksize=50000)
+    new_hires.to_sql('new_hires', engine, index=False, chunksize=50000)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE UNIQUE INDEX employees_id ON employees (id)"))
+        conn.execute(text("CREATE UNIQUE INDEX new_hires_id ON new_hires (id)"))
+    return engine, first_names, last_names
+
+# Keystroke-by-keystroke prefixes of names and requisition numbers, some with a zone filter
+def make_queries(rng, first_names, last_names, count):
+    queries = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.4:
+            word = rng.choice(first_names)
+        elif roll < 0.8:
+            word = rng.choice(last_names)
+        else:
+            word = f"REQ-{rng.randrange(10 ** 7):07d}"
+        zone = rng.choice(ZONES) if rng.random() < 0.3 else None
+        for length in range(1, min(len(word), 8) + 1):
+            queries.append((word[:length], zone))
+        if roll < 0.4:
+            queries.append((f"{word} {rng.choice(last_names)[:4]}", zone))
+    return queries
+
+def sql_search(conn, search_text, zone):
+    terms = search_text.split()
+    search = ' OR '.join(
+        f"(nh.req_num LIKE :t{i} OR e.first_name LIKE :t{i} OR e.last_name LIKE :t{i})" for i in range(len(terms))
+    )
+    params = {f"t{i}": f"%{term}%" for i, term in enumerate(terms)}
+    params['zone'] = zone
+    return {row.emp_id for row in conn.execute(text(SQL_SEARCH.format(search=search)), params)}
+
+def percentiles(latencies):
+    latencies = np.array(latencies) * 1000
+    return ' '.join(f"p{q}={np.percentile(latencies, q):7.2f}ms" for q in (50, 95, 99)) + f" max={latencies.max():7.2f}ms"
+
+def main():
+    parser = argparse.ArgumentParser(description="Trigram employee search benchmark")
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--words', type=int, default=300)
+    parser.add_argument('--sql-queries', type=int, default=10)
+    parser.add_argument('--changed', type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(11)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        engine, first_names, last_names = make_database(os.path.join(tmp, 'search.db'), args.rows)
+        print(f"{args.rows} new_hires written in {time.perf_counter() - start:.1f}s")
+
+        index = EmployeeSearchIndex()
+        start = time.perf_counter()
+        index.load(engine)
+        load_elapsed = time.perf_counter() - start
+        postings = len(index._base.positions)
+        print(f"index load   {load_elapsed:8.2f}s  {postings} postings ({postings * 4 / 2 ** 20:.0f} MiB)")
+
+        queries = make_queries(rng, first_names, last_names, args.words)
+        latencies = []
+        for search_text, zone in queries:
+            start = time.perf_counter()
+            index.search(search_text, zone=zone, limit=20)
+            latencies.append(time.perf_counter() - start)
+        print(f"typeahead    {len(queries):>6} queries  {percentiles(latencies)}")
+
+        # Same answers as the SQL scan, and how long the scan takes
+        sql_latencies = []
+        with engine.connect() as conn:
+            for search_text, zone in rng.sample(queries, args.sql_queries):
+                start = time.perf_counter()
+                expected = sql_search(conn, search_text, zone)
+                sql_latencies.append(time.perf_counter() - start)
+                found = {row['emp_id'] for row in index.search(search_text, zone=zone, limit=None)}
+                assert found == expected, (search_text, zone, len(found), len(expected))
+        print(f"SQLite LIKE  {len(sql_latencies):>6} queries  {percentiles(sql_latencies)}")
+
+        # Incremental refresh after renaming some employees and editing some new hires
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE new_hires SET req_num = req_num || 'X', zone = 'Z99', "
+                              "updated_at = '2026-10-02 00:00:00' WHERE id % :step = 0"),
+                         {'step': max(args.rows // args.changed, 1)})
+            conn.execute(text("UPDATE employees SET last_name = 'Renamed', updated_at = '2026-10-02 00:00:00' "
+                              "WHERE id % :step = 0"), {'step': max(args.rows // 50, 1)})
+        start = time.perf_counter()
+        reindexed = index.refresh(engine)
+        refresh_elapsed = time.perf_counter() - start
+        print(f"refresh      {refresh_elapsed:8.2f}s  {reindexed} rows re-indexed "
+              f"({load_elapsed / refresh_elapsed:.0f}x faster than a full load)")
+
+        with engine.connect() as conn:
+            for search_text, zone in [('renamed', None), ('x', 'Z99'), (first_names[0][:3], 'Z99')]:
+                found = {row['emp_id'] for row in index.search(search_text, zone=zone, limit=None)}
+                assert found == sql_search(conn, search_text, zone), (search_text, zone)
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
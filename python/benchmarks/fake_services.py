@@ -0,0 +1,98 @@
+# Local stand-ins for the Azure IMDS endpoint and the Akeyless API, for offline runs.
+# FakeServices().start() serves both on one localhost port; point imds_url/config_url at it.
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+class FakeServices:
+    def __init__(self, latency=0.0, token_ttl=3600, secret_ttl=3600, fail_auth=False):
+        self.latency = latency
+        self.fail_auth = fail_auth
+        self.token_ttl = token_ttl
+        self.secret_ttl = secret_ttl
+        self.calls = {'imds': 0, 'auth': 0, 'secret': 0}
+        self._lock = threading.Lock()
+        self.server = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    @property
+    def imds_url(self):
+        return f"{self.url}/metadata/identity/oauth2/token"
+
+    def _count(self, name):
+        with self._lock:
+            self.calls[name] += 1
+            return self.calls[name]
+
+    def start(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != '/metadata/identity/oauth2/token' or self.headers.get('Metadata') != 'true':
+                    return self._reply(400, {'error': 'bad request'})
+                time.sleep(services.latency)
+                n = services._count('imds')
+                resource = parse_qs(url.query).get('resource', [''])[0]
+                self._reply(200, {
+                    'access_token': f"imds-token-{n}",
+                    'expires_on': str(int(time.time()) + services.token_ttl),
+                    'resource': resource,
+                    'token_type': 'Bearer',
+                })
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                time.sleep(services.latency)
+                if self.path == '/v2/auth':
+                    n = services._count('auth')
+                    if services.fail_auth:
+                        return self._reply(403, {'error': 'access denied'})
+                    return self._reply(200, {'token': f"t-session-{n}"})
+                if self.path == '/v2/rotated-secret-get-value':
+                    if not body.get('token', '').startswith('t-session-'):
+                        return self._reply(401, {'error': 'unauthorized'})
+                    services._count('secret')
+                    name = body.get('name', '')
+                    if name.endswith('/missing'):
+                        return self._reply(404, {'error': f"item {name} not found"})
+                    expires = datetime.now(timezone.utc) + timedelta(seconds=services.secret_ttl)
+                    return self._reply(200, {'value': {
+                        'username': f"user-for-{name.rsplit('/', 1)[-1]}",
+                        'password': 'not-a-real-password',
+                        'expiration_date': expires.strftime('%Y-%m-%d %H:%M:%S UTC'),
+                    }})
+                self._reply(404, {'error': 'not found'})
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
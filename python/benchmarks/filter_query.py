@@ -0,0 +1,215 @@
+# Benchmark for the FilterSpec query builder in filter_query.py against the hand-written loops of
+# sql/cte_orm_example.py, on a SQLite stand-in for new_hires/employees.
+# Run from the python/ directory: python -m benchmarks.filter_query --rows 200000
+import argparse
+import random
+import time
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, event, insert, or_, select
+from sqlalchemy.orm import aliased
+
+from filter_query import FilterSpec, iter_keyset, keyset_page, stream_rows
+
+DEPARTMENTS = ['HR', 'IT', 'Finance', 'Ops', 'Sales', 'Legal']
+POSITIONS = ['Technician', 'Engineer', 'Analyst', 'Manager', 'Clerk']
+FIRST_NAMES = ['John', 'Mary', 'Ahmed', 'Li', 'Sofia', 'Ravi', 'Anna', 'Tom', 'Joan', 'Mark']
+LAST_NAMES = ['Smith', 'Jones', 'Khan', 'Wong', 'Garcia', 'Patel', 'Miller', 'Brown', 'Silva', 'Novak']
+ZONES = [f"Z{zone}" for zone in range(12)]
+
+metadata = MetaData()
+employees = Table(
+    'employees', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('first_name', String),
+    Column('last_name', String),
+)
+new_hires = Table(
+    'new_hires', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('name', String),
+    Column('position', String),
+    Column('department', String),
+    Column('zone', String),
+    Column('manager_id', Integer),
+    Column('old_emp_id', Integer),
+)
+managers = aliased(employees)
+
+def make_database(rows, seed=13):
+    rng = random.Random(seed)
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    employee_count = max(rows // 4, 100)
+    with engine.begin() as conn:
+        conn.execute(insert(employees), [
+            {'id': i, 'first_name': rng.choice(FIRST_NAMES), 'last_name': rng.choice(LAST_NAMES)}
+            for i in range(1, employee_count + 1)
+        ])
+        conn.execute(insert(new_hires), [
+            {'id': i, 'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+             'position': rng.choice(POSITIONS), 'department': rng.choice(DEPARTMENTS), 'zone': rng.choice(ZONES),
+             'manager_id': rng.randint(1, employee_count),
+             'old_emp_id': rng.randint(1, employee_count) if rng.random() < 0.6 else None}
+            for i in range(1, rows + 1)
+        ])
+    return engine
+
+# Random mix of filter combinations and 1-3 term searches, as the search screen would send them
+def make_requests(count, seed=7):
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(count):
+        filters = {}
+        if rng.random() < 0.5:
+            filters['department'] = rng.choice(DEPARTMENTS)
+        if rng.random() < 0.3:
+            filters['employee_last_name'] = rng.choice(LAST_NAMES)[:rng.randint(1, 4)]
+        if rng.random() < 0.3:
+            filters['manager_first_name'] = rng.choice(FIRST_NAMES)[:rng.randint(1, 3)]
+        if rng.random() < 0.2:
+            filters['zones'] = rng.sample(ZONES, rng.randint(1, 5))
+        if rng.random() < 0.2:
+            low = rng.randint(1, 1000)
+            filters['id_range'] = (low * 100, low * 100 + 5000)
+        terms = [rng.choice(FIRST_NAMES + POSITIONS) for _ in range(rng.randint(0, 3))]
+        requests.append((filters, ' '.join(terms)))
+    return requests
+
+def base_query():
+    return select(
+        new_hires.c.id.label('emp_id'),
+        (employees.c.first_name + ' ' + employees.c.last_name).label('emp_full_name'),
+        new_hires.c.manager_id.label('emp_manager_id'),
+    ).outerjoin(employees, employees.c.id == new_hires.c.old_emp_id)
+
+def outer_query(cte):
+    return select(
+        *cte.c,
+        (managers.c.first_name + ' ' + managers.c.last_name).label('manager_name'),
+    ).join(managers, managers.c.id == cte.c.emp_manager_id)
+
+# The original loops: one OR block per search term, IN lists inlined, all rows fetched at once
+def legacy_query(filters, search_text):
+    cte_query = base_query()
+    if 'department' in filters:
+        cte_query = cte_query.filter(new_hires.c.department == filters['department'])
+    if 'employee_last_name' in filters:
+        cte_query = cte_query.filter(employees.c.last_name.like(f"{filters['employee_last_name']}%"))
+    if 'zones' in filters:
+        cte_query = cte_query.filter(or_(*(new_hires.c.zone == zone for zone in filters['zones'])))
+    if 'id_range' in filters:
+        low, high = filters['id_range']
+        cte_query = cte_query.filter(new_hires.c.id.between(low, high))
+    search_conditions = [
+        or_(
+            new_hires.c.name.ilike(f"%{term}%"),
+            new_hires.c.position.ilike(f"%{term}%"),
+            employees.c.first_name.ilike(f"%{term}%"),
+            employees.c.last_name.ilike(f"%{term}%"),
+        )
+        for term in search_text.split()
+    ]
+    if search_conditions:
+        cte_query = cte_query.filter(or_(*search_conditions))
+    query = outer_query(cte_query.cte())
+    if 'manager_first_name' in filters:
+        query = query.filter(managers.c.first_name.like(f"{filters['manager_first_name']}%"))
+    return query
+
+cte_spec = FilterSpec(
+    {
+        'department': (new_hires.c.department, 'eq'),
+        'employee_last_name': (employees.c.last_name, 'like'),
+        'zones': (new_hires.c.zone, 'in'),
+        'id_range': (new_hires.c.id, 'range'),
+    },
+    search_columns=[new_hires.c.name, new_hires.c.position, employees.c.first_name, employees.c.last_name],
+)
+manager_spec = FilterSpec({'manager_first_name': (managers.c.first_name, 'like')})
+
+def spec_query(filters, search_text):
+    cte = cte_spec.apply(base_query(), filters, search_text).cte()
+    return manager_spec.apply(outer_query(cte), filters), cte
+
+# Run every request, counting distinct SQL strings sent to the database and compiled-cache entries
+def run_workload(engine, label, requests, execute):
+    statements = set()
+    listener = lambda conn, cursor, statement, *args: statements.add(statement)
+    event.listen(engine, 'before_cursor_execute', listener)
+    engine.clear_compiled_cache()
+    rows = 0
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        for filters, search_text in requests:
+            rows += execute(conn, filters, search_text)
+    elapsed = time.perf_counter() - start
+    event.remove(engine, 'before_cursor_execute', listener)
+    compiled = len(engine._compiled_cache)
+    print(f"{label:<28} {elapsed:8.3f}s  {len(statements):>5} distinct SQL  {compiled:>5} compiled  {rows:>10} rows")
+    return elapsed, compiled
+
+def legacy_execute(conn, filters, search_text):
+    return len(conn.execute(legacy_query(filters, search_text)).all())
+
+# What the search screen needs: the first page, not every match
+def spec_first_page(conn, filters, search_text):
+    query, cte = spec_query(filters, search_text)
+    rows, _ = keyset_page(conn, query, [cte.c.emp_id], page_size=100)
+    return len(rows)
+
+def spec_stream(conn, filters, search_text):
+    query, _ = spec_query(filters, search_text)
+    return sum(1 for _ in stream_rows(conn, query))
+
+# Walk the whole unfiltered result page by page: OFFSET re-reads every skipped row, keyset seeks
+def run_paging(engine, page_size):
+    query, cte = spec_query({}, '')
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        offset = rows = 0
+        while True:
+            page = conn.execute(query.order_by(cte.c.emp_id).limit(page_size).offset(offset)).all()
+            rows += len(page)
+            offset += page_size
+            if len(page) < page_size:
+                break
+        offset_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        keyset_rows = sum(1 for _ in iter_keyset(conn, query, [cte.c.emp_id], page_size=page_size))
+        keyset_elapsed = time.perf_counter() - start
+
+    assert rows == keyset_rows
+    print(f"{'OFFSET paging':<28} {offset_elapsed:8.3f}s  {rows:>10} rows")
+    print(f"{'keyset paging':<28} {keyset_elapsed:8.3f}s  {keyset_rows:>10} rows")
+    return offset_elapsed, keyset_elapsed
+
+# An 'in' filter given one value matches that value, not its characters
+def check_single_in():
+    for value, expected in (('Z1', ['Z1']), (['Z1', 'Z2'], ['Z1', 'Z2']), (7, [7])):
+        condition, = cte_spec.conditions({'zones': value})
+        assert condition.right.value == expected, (value, condition.right.value)
+
+def main():
+    parser = argparse.ArgumentParser(description="Dynamic filter query builder benchmark")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--page-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    check_single_in()
+    engine = make_database(args.rows)
+    requests = make_requests(args.requests)
+    print(f"{args.rows} new_hires, {args.requests} filter requests")
+
+    legacy_elapsed, legacy_compiled = run_workload(engine, "hand-written loops, .all()", requests, legacy_execute)
+    stream_elapsed, stream_compiled = run_workload(engine, "FilterSpec, stream_rows", requests, spec_stream)
+    page_elapsed, _ = run_workload(engine, "FilterSpec, first page", requests, spec_first_page)
+    print(f"compiled statements: {legacy_compiled} -> {stream_compiled}; "
+          f"first page {legacy_elapsed / page_elapsed:.1f}x faster than .all()")
+
+    offset_elapsed, keyset_elapsed = run_paging(engine, args.page_size)
+    print(f"full scan speedup: keyset {offset_elapsed / keyset_elapsed:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Benchmark for excel_highlight.highlight_differences against the old per-cell loop
+# Run from the python/ directory: python -m benchmarks.highlight --rows 300000
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from excel_highlight import RED_FILL, difference_mask, highlight_differences
+
+ENVIRONMENTS = ['dev', 'qa', 'staging', 'prod']
+COLUMN_PAIRS = [
+    ('dev_datatype', 'qa_datatype'),
+    ('prod_datatype', 'qa_datatype'),
+    ('staging_datatype', 'qa_datatype'),
+    ('dev_datatype', 'prod_datatype'),
+    ('staging_datatype', 'prod_datatype')
+]
+
+def make_frame(rows, drift=0.05, seed=7):
+    rng = np.random.default_rng(seed)
+    base = rng.choice(['varchar', 'int4', 'numeric', 'text', None], size=rows)
+    data = {'column_name': [f"col_{i}" for i in range(rows)]}
+    for env in ENVIRONMENTS:
+        values = base.copy()
+        drifted = rng.random(rows) < drift
+        values[drifted] = 'timestamp'
+        data[f"{env}_datatype"] = values
+    return pd.DataFrame(data)
+
+def make_worksheet(df):
+    worksheet = Workbook().active
+    worksheet.append(list(df.columns))
+    for row in df.itertuples(index=False):
+        worksheet.append(list(row))
+    return worksheet
+
+# The loop excel_format_columns.py and write_to_excel used before
+def legacy_highlight(worksheet, df, column_pairs, fill):
+    for col1, col2 in column_pairs:
+        col1_idx = df.columns.get_loc(col1) + 1
+        col2_idx = df.columns.get_loc(col2) + 1
+        for row_idx in range(2, len(df) + 2):
+            if df.at[row_idx - 2, col1] != df.at[row_idx - 2, col2]:
+                worksheet.cell(row=row_idx, column=col1_idx).fill = fill
+                worksheet.cell(row=row_idx, column=col2_idx).fill = fill
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed:8.3f}s")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Difference highlighting benchmark")
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    differing = sum(int(difference_mask(df, col1, col2).sum()) for col1, col2 in COLUMN_PAIRS)
+    # Categorical columns (each with its own categories) must give the same mask
+    categorical = df.astype('category')
+    assert all((difference_mask(categorical, col1, col2) == difference_mask(df, col1, col2)).all()
+               for col1, col2 in COLUMN_PAIRS)
+    print(f"{args.rows} rows, {len(COLUMN_PAIRS)} column pairs, {differing} differing row pairs")
+
+    legacy = timed("legacy per-cell loop", legacy_highlight, make_worksheet(df), df, COLUMN_PAIRS, RED_FILL)
+    vectorized = timed("vectorized fill", highlight_differences, make_worksheet(df), df, COLUMN_PAIRS, fill=RED_FILL)
+    conditional = timed("conditional formatting", highlight_differences, make_worksheet(df), df, COLUMN_PAIRS, fill=RED_FILL, mode='conditional')
+    print(f"speedup: fill {legacy / vectorized:.1f}x, conditional {legacy / conditional:.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# 64 concurrent callers asking for IMDS tokens: bare requests.get per call vs. ImdsTokenProvider
+# Run from the python/ directory: python -m benchmarks.imds_tokens
+import argparse
+import statistics
+import threading
+import time
+
+import requests
+
+from benchmarks.fake_services import FakeServices
+from imds_token import MIN_REFRESH_DELAY, ImdsTokenProvider
+
+RESOURCE = "https://management.azure.com/"
+
+# Run callers threads that each call get_token calls times; returns per-call latencies
+def run_callers(get_token, callers, calls):
+    latencies = []
+    lock = threading.Lock()
+    start_gate = threading.Barrier(callers)
+
+    def caller():
+        local = []
+        start_gate.wait()
+        for _ in range(calls):
+            start = time.perf_counter()
+            get_token()
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=caller) for _ in range(callers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+def report(label, wall, latencies, imds_calls):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:<28} wall {wall:7.3f}s  p50 {statistics.median(latencies) * 1000:8.3f} ms  "
+          f"p99 {p99 * 1000:8.3f} ms  IMDS calls {imds_calls}")
+
+def main():
+    parser = argparse.ArgumentParser(description="IMDS token provider benchmark")
+    parser.add_argument('--callers', type=int, default=64)
+    parser.add_argument('--calls', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    with FakeServices(latency=args.latency) as services:
+        def bare_get():
+            response = requests.get(services.imds_url, headers={"Metadata": "true"},
+                                    params={"api-version": "2018-02-01", "resource": RESOURCE})
+            response.raise_for_status()
+            return response.json()["access_token"]
+
+        wall, latencies = run_callers(bare_get, args.callers, args.calls)
+        report("bare requests.get", wall, latencies, services.calls['imds'])
+
+    with FakeServices(latency=args.latency) as services:
+        provider = ImdsTokenProvider(imds_url=services.imds_url, pool_size=args.callers)
+        wall, latencies = run_callers(lambda: provider.get_token(RESOURCE), args.callers, args.calls)
+        report("ImdsTokenProvider", wall, latencies, services.calls['imds'])
+        provider.close()
+
+    # Short-lived tokens: the background thread renews them, so callers keep hitting memory
+    with FakeServices(latency=args.latency, token_ttl=2) as services:
+        provider = ImdsTokenProvider(imds_url=services.imds_url, refresh_margin=1, pool_size=args.callers)
+        provider.get_token(RESOURCE)
+        deadline = time.time() + 5
+
+        def until_deadline():
+            while time.time() < deadline:
+                provider.get_token(RESOURCE)
+                time.sleep(0.001)
+
+        # Time individual calls by wrapping get_token for this phase
+        timed_get = provider.get_token
+        call_latencies = []
+
+        def get_token(resource):
+            start = time.perf_counter()
+            token = timed_get(resource)
+            call_latencies.append(time.perf_counter() - start)
+            return token
+
+        provider.get_token = get_token
+        run_callers(until_deadline, args.callers, 1)
+        report("2s tokens, background refresh", 5.0, call_latencies, services.calls['imds'])
+        provider.close()
+
+    # A token IMDS hands out already expired is an error, not cached and refetched in a loop
+    with FakeServices(token_ttl=-60) as services:
+        provider = ImdsTokenProvider(imds_url=services.imds_url)
+        try:
+            provider.get_token(RESOURCE)
+        except ValueError as e:
+            print(f"expired token rejected: {e}")
+        else:
+            raise AssertionError("expired token accepted")
+        time.sleep(0.5)
+        assert services.calls['imds'] == 1, services.calls
+        provider.close()
+
+    # 1s tokens (under a second left once fetched): renewed at most every MIN_REFRESH_DELAY seconds, not back to back
+    with FakeServices(token_ttl=1) as services:
+        provider = ImdsTokenProvider(imds_url=services.imds_url)
+        provider.get_token(RESOURCE)
+        time.sleep(3)
+        assert services.calls['imds'] <= 1 + 3 / MIN_REFRESH_DELAY, services.calls
+        print(f"1s tokens: {services.calls['imds']} IMDS calls in 3s")
+        provider.close()
+
+if __name__ == "__main__":
+    main()
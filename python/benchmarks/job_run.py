@@ -0,0 +1,104 @@
+# Overhead of JobRun instrumentation on a batch of short stages, with the metrics database a network
+# round trip away: stage rows written inline vs. buffered and flushed by job_run's background thread.
+# Run from the python/ directory: python -m benchmarks.job_run --stages 500 --latency-ms 5
+import argparse
+import os
+import tempfile
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, event, insert, text
+
+from job_run import JobRun, stage, stage_table
+
+# A slice of a morning batch: some pandas work per stage
+def workload(frame):
+    return frame.groupby('key')['value'].sum().sort_values().iloc[-1]
+
+def make_engine(path, latency):
+    engine = create_engine(f"sqlite:///{path}")
+
+    # start_job_run()/end_job_run() stand-ins; the PL/pgSQL versions write fts_job_log/fts_job_master
+    @event.listens_for(engine, 'connect')
+    def register_functions(dbapi_connection, _):
+        dbapi_connection.create_function('start_job_run', 2, lambda job_name, started_at: str(uuid.uuid4()))
+        dbapi_connection.create_function('end_job_run', 4, lambda *args: None)
+
+    # Every statement pays a round trip, as it would against a remote PostgreSQL
+    @event.listens_for(engine, 'before_cursor_execute')
+    def round_trip(*args):
+        time.sleep(latency)
+
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE fts_job_stage_log (log_id TEXT, stage TEXT, started_at TIMESTAMP, ended_at TIMESTAMP,
+                                            duration_ms INTEGER, row_count INTEGER, peak_memory_bytes INTEGER,
+                                            status TEXT, error_message TEXT)
+        """))
+    return engine
+
+def bare(frame, stages):
+    for index in range(stages):
+        with stage(f"stage_{index % 20}") as current:
+            workload(frame)
+            current.rows = len(frame)
+
+# What instrumenting without the writer thread costs: one INSERT per stage on the job's own thread
+class InlineJobRun(JobRun):
+    def __enter__(self):
+        run = super().__enter__()
+        self._writer.put = lambda row: self._insert(row)
+        return run
+
+    def _insert(self, row):
+        with self.engine.begin() as connection:
+            connection.execute(insert(stage_table), [row])
+
+def main():
+    parser = argparse.ArgumentParser(description="Job run instrumentation overhead benchmark")
+    parser.add_argument('--stages', type=int, default=500)
+    parser.add_argument('--rows', type=int, default=20000, help="rows per stage's workload")
+    parser.add_argument('--latency-ms', type=float, default=5.0, help="round trip to the metrics database")
+    args = parser.parse_args()
+    rng = np.random.default_rng(19)
+    frame = pd.DataFrame({'key': rng.integers(0, 500, args.rows), 'value': rng.random(args.rows)})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(os.path.join(tmp, 'jobs.db'), args.latency_ms / 1000)
+        runs = [
+            ("no job run", None),
+            ("inline writes", lambda: InlineJobRun(engine, 'bench', trace_memory=False)),
+            ("buffered writes", lambda: JobRun(engine, 'bench', trace_memory=False)),
+            ("buffered writes + tracemalloc", lambda: JobRun(engine, 'bench', trace_memory=True)),
+        ]
+        baseline = None
+        for label, make_run in runs:
+            start = time.perf_counter()
+            if make_run is None:
+                bare(frame, args.stages)
+            else:
+                with make_run() as run:
+                    bare(frame, args.stages)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            per_stage = (elapsed - baseline) / args.stages * 1000
+            print(f"{label:<32} {elapsed:8.3f}s  {per_stage:+7.3f} ms/stage")
+            if make_run is not None:
+                assert len(run.stages) == args.stages + 1
+
+        with engine.connect() as conn:
+            written = conn.execute(text("SELECT COUNT(*) FROM fts_job_stage_log")).scalar()
+            slowest = conn.execute(text("""
+                SELECT stage, SUM(duration_ms) AS ms, MAX(peak_memory_bytes) AS peak FROM fts_job_stage_log
+                WHERE stage != '(total)' AND peak_memory_bytes IS NOT NULL GROUP BY stage ORDER BY ms DESC LIMIT 3
+            """)).fetchall()
+        assert written == 3 * (args.stages + 1), written
+        print(f"{written} stage rows written; slowest stages of the traced run:")
+        for name, ms, peak in slowest:
+            print(f"  {name:<12} {ms:>7} ms  peak {peak / 2 ** 20:6.2f} MiB")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
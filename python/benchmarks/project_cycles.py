@@ -0,0 +1,175 @@
+# Benchmark for project_cycles.generate_due_cycles against calling generate_project_execution_data() once per
+# project, as the scheduler does today, on a SQLite stand-in. Both must produce the same execution rows.
+# Run from the python/ directory: python -m benchmarks.project_cycles --projects 20000
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import create_engine, text
+
+from project_cycles import RECURRENCE_MONTHS, SCOPE_COLUMNS, generate_due_cycles
+
+AS_OF = date(2026, 10, 18)
+ZONES = [f"Z{zone}" for zone in range(20)]
+STATES = [f"S{state}" for state in range(30)]
+STORE_TYPES = ['Mall', 'Highway', 'Metro', 'Outlet', 'Express', 'Flagship']
+SCOPES = {'Global': 0.02, 'Zone': 0.25, 'State': 0.25, 'Store Type': 0.08, 'Specified Sites': 0.40}
+RECURRENCES = {'one-time': 0.3, 'monthly': 0.35, 'quarterly': 0.2, 'half-yearly': 0.1, 'yearly': 0.05}
+SCOPE_VALUES = {'Zone': ZONES, 'State': STATES, 'Store Type': STORE_TYPES}
+ROW_COLUMNS = ['project_id', 'site', 'cycle_index', 'cycle_start_date', 'cycle_end_date']
+
+def make_database(path, projects, sites, seed=20):
+    rng = np.random.default_rng(seed)
+    engine = create_engine(f"sqlite:///{path}")
+    site_master = pd.DataFrame({
+        'site': [f"SITE{site:05d}" for site in range(sites)],
+        'zone': rng.choice(ZONES, sites),
+        'state': rng.choice(STATES, sites),
+        'store_type': rng.choice(STORE_TYPES, sites),
+    })
+
+    rows = []
+    for project_id in range(1, projects + 1):
+        recurrence = str(rng.choice(list(RECURRENCES), p=list(RECURRENCES.values())))
+        scope = str(rng.choice(list(SCOPES), p=list(SCOPES.values())))
+        if scope == 'Specified Sites':
+            scope_data = ','.join(rng.choice(site_master['site'], int(rng.integers(3, 20)), replace=False))
+        elif scope == 'Global':
+            scope_data = None
+        else:
+            scope_data = ','.join(rng.choice(SCOPE_VALUES[scope], int(rng.integers(1, 3)), replace=False))
+        # Recurring projects are at most one cycle behind, some ending on a month end; half have no cycle yet
+        last_end = AS_OF + timedelta(days=int(rng.integers(-27, 60)))
+        if rng.random() < 0.1:
+            last_end = date(2026, 9, 30)
+        has_cycle = recurrence != 'one-time' and rng.random() < 0.5
+        start = last_end - timedelta(days=400 if has_cycle else 0)
+        rows.append((project_id, recurrence, start.isoformat(),
+                     (start + timedelta(days=90)).isoformat() if recurrence == 'one-time' else None,
+                     int(rng.integers(1, 12)) if has_cycle else None,
+                     None, last_end.isoformat() if has_cycle else None, scope, scope_data))
+    definitions = pd.DataFrame(rows, columns=['id', 'recurrence', 'start_date', 'end_date', 'cycle_index',
+                                              'cycle_start_date', 'cycle_end_date', 'scope', 'scope_data'])
+    with engine.begin() as conn:
+        site_master.to_sql('site_master', conn, index=False)
+        definitions.to_sql('project_definition', conn, index=False)
+        conn.execute(text("CREATE UNIQUE INDEX pd_id ON project_definition (id)"))
+        conn.execute(text("""
+            CREATE TABLE project_execution_data (project_id INTEGER, site TEXT, cycle_index INTEGER,
+                                                 cycle_start_date DATE, cycle_end_date DATE,
+                                                 is_on_project BOOLEAN, execution_status TEXT)
+        """))
+        conn.execute(text("CREATE INDEX ped_project_cycle ON project_execution_data (project_id, cycle_index)"))
+        # A fifth of the one-time projects were generated before
+        conn.execute(text("""
+            INSERT INTO project_execution_data
+            SELECT id, 'SITE00000', 1, start_date, end_date, 1, 'done' FROM project_definition
+            WHERE recurrence = 'one-time' AND id % 5 = 0
+        """))
+    return engine
+
+# generate_project_execution_data() statement for statement, one project per call. SQLite has no date + interval
+# with PostgreSQL's month-end clamping, so the window is computed here the way PostgreSQL would
+def legacy_generate(conn, project_id):
+    project = conn.execute(text("SELECT * FROM project_definition WHERE id = :id"), {'id': project_id}).mappings().one()
+    if project['recurrence'] == 'one-time':
+        index, start, end = 1, project['start_date'], project['end_date']
+    else:
+        index = (project['cycle_index'] or 0) + 1
+        start = date.fromisoformat(project['cycle_end_date'] or project['start_date']) + timedelta(days=1)
+        end = (start + relativedelta(months=RECURRENCE_MONTHS[project['recurrence']]) - timedelta(days=1)).isoformat()
+        start = start.isoformat()
+    params = {'id': project_id, 'index': index, 'start': start, 'end': end, 'scope_data': project['scope_data']}
+    if conn.execute(text("SELECT 1 FROM project_execution_data WHERE project_id = :id AND cycle_index = :index"),
+                    params).first():
+        return False
+    conn.execute(text("DELETE FROM project_execution_data WHERE project_id = :id AND cycle_index = :index "
+                      "AND execution_status = 'pending'"), params)
+    insert = ("INSERT INTO project_execution_data SELECT :id, site, :index, :start, :end, 1, 'pending' "
+              "FROM site_master")
+    if project['scope'] == 'Global':
+        conn.execute(text(insert), params)
+    elif project['scope'] in SCOPE_COLUMNS:
+        # zone = ANY(string_to_array(scope_data, ','))
+        conn.execute(text(f"{insert} WHERE instr(',' || :scope_data || ',', ',' || "
+                          f"{SCOPE_COLUMNS[project['scope']]} || ',') > 0"), params)
+    else:
+        conn.execute(text("INSERT INTO project_execution_data VALUES (:id, :site, :index, :start, :end, 1, 'pending')"),
+                     [{**params, 'site': site} for site in (project['scope_data'] or '').split(',') if site])
+    conn.execute(text("UPDATE project_definition SET cycle_index = :index, cycle_start_date = :start, "
+                      "cycle_end_date = :end WHERE id = :id"), params)
+    return True
+
+# The scheduler's loop: every one-time project and every recurring project whose next cycle has started
+def legacy_run(engine, project_ids=None):
+    with engine.connect() as conn:
+        due = conn.execute(text("""
+            SELECT id FROM project_definition
+            WHERE recurrence = 'one-time' OR date(coalesce(cycle_end_date, start_date), '+1 day') <= :as_of
+        """), {'as_of': AS_OF.isoformat()}).scalars().all()
+    generated = 0
+    for project_id in due:
+        if project_ids is not None and project_id not in project_ids:
+            continue
+        with engine.begin() as conn:
+            generated += legacy_generate(conn, project_id)
+    return generated
+
+def generated_rows(engine):
+    with engine.connect() as conn:
+        rows = pd.read_sql(text(f"SELECT {', '.join(ROW_COLUMNS)} FROM project_execution_data "
+                                f"WHERE execution_status = 'pending'"), conn)
+    return rows.astype(str).sort_values(ROW_COLUMNS).reset_index(drop=True)
+
+def definitions(engine):
+    with engine.connect() as conn:
+        return pd.read_sql(text("SELECT id, cycle_index, cycle_start_date, cycle_end_date FROM project_definition "
+                                "ORDER BY id"), conn).astype(str)
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:8.2f}s  {result}")
+    return elapsed, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Project cycle generation benchmark")
+    parser.add_argument('--projects', type=int, default=20000)
+    parser.add_argument('--sites', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_path = os.path.join(tmp, 'seed.db')
+        make_database(seed_path, args.projects, args.sites).dispose()
+        engines = {}
+        for name in ('legacy', 'bulk', 'mixed'):
+            shutil.copy(seed_path, os.path.join(tmp, f"{name}.db"))
+            engines[name] = create_engine(f"sqlite:///{os.path.join(tmp, name + '.db')}")
+
+        legacy_elapsed, _ = timed("per-project procedure calls", legacy_run, engines['legacy'])
+        bulk_elapsed, stats = timed("bulk generator", generate_due_cycles, engines['bulk'], as_of=AS_OF)
+        print(f"{'':<32} {legacy_elapsed / bulk_elapsed:8.1f}x faster")
+        expected = generated_rows(engines['legacy'])
+        pd.testing.assert_frame_equal(generated_rows(engines['bulk']), expected)
+        pd.testing.assert_frame_equal(definitions(engines['bulk']), definitions(engines['legacy']))
+        print(f"{'':<32} {len(expected)} execution rows, identical to the procedure's")
+
+        # Idempotent: a second run the same day adds nothing
+        _, stats = timed("bulk generator re-run", generate_due_cycles, engines['bulk'], as_of=AS_OF)
+        assert stats['generated'] == 0, stats
+        # and it picks up where a partial per-project run stopped
+        timed("procedure, first half", legacy_run, engines['mixed'], set(range(1, args.projects // 2)))
+        timed("bulk generator, rest", generate_due_cycles, engines['mixed'], as_of=AS_OF)
+        pd.testing.assert_frame_equal(generated_rows(engines['mixed']), expected)
+        for engine in engines.values():
+            engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# Benchmark for project_json.build_documents against build_json.sql's rows x fields rebuild, on a SQLite stand-in.
+# build_json.sql serializes the whole row once per metadata field, so it is timed on a sample of sites and
+# scaled up; the incremental builder runs over every site.
+# Run from the python/ directory: python -m benchmarks.project_json --sites 100000 --fields 300
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, event, text
+
+from project_json import build_documents, validate_documents
+
+WORDS = ['ok', 'pending', 'failed', 'n/a', 'replaced', 'Cabinet "B"', 'rack\\2', 'verified']
+
+def columns(fields):
+    return [f"col_{index:03d}" for index in range(fields)]
+
+def make_engine(path):
+    engine = create_engine(f"sqlite:///{path}")
+
+    # md5() stand-in for the per-row hash PostgreSQL computes natively
+    @event.listens_for(engine, 'connect')
+    def register_functions(dbapi_connection, _):
+        dbapi_connection.create_function('md5', 1, lambda value: hashlib.md5(value.encode()).hexdigest(),
+                                         deterministic=True)
+    return engine
+
+# Every fourth column an integer, a decimal, a status word or a date, about a tenth of them empty
+def make_rows(rng, sites, fields, first=0):
+    values = []
+    for index in range(fields):
+        kind = index % 4
+        if kind == 0:
+            column = rng.integers(0, 100000, sites).tolist()
+        elif kind == 1:
+            column = np.round(rng.random(sites) * 1000, 2).tolist()
+        elif kind == 2:
+            column = rng.choice(WORDS, sites).tolist()
+        else:
+            column = (np.datetime64('2024-01-01') + rng.integers(0, 700, sites)).astype(str).tolist()
+        empty = rng.random(sites) < 0.1
+        values.append([None if blank else value for value, blank in zip(column, empty)])
+    return [(f"SITE{first + site:06d}", *row) for site, row in enumerate(zip(*values))]
+
+def make_database(engine, sites, fields, seed=21, batch=5000):
+    rng = np.random.default_rng(seed)
+    names = columns(fields)
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE project_data (site TEXT PRIMARY KEY, {', '.join(names)})"))
+        conn.execute(text("CREATE TABLE project_metadata (field_name TEXT, field_display_name TEXT, column_name TEXT)"))
+        conn.execute(text("INSERT INTO project_metadata VALUES (:field_name, :display, :column_name)"),
+                     [{'field_name': f"field_{name}", 'display': f"Field {name[4:]}", 'column_name': name}
+                      for name in names])
+        conn.execute(text("""
+            CREATE TABLE new_project_data_json (site TEXT PRIMARY KEY, field_info JSON NOT NULL, source_hash TEXT,
+                                                built_at TIMESTAMP)
+        """))
+        statement = f"INSERT INTO project_data VALUES ({', '.join(['?'] * (fields + 1))})"
+        for start in range(0, sites, batch):
+            conn.exec_driver_sql(statement, make_rows(rng, min(batch, sites - start), fields, start))
+
+# (t.*)::jsonb, built from at most 60 columns per json_object() call to stay under SQLite's argument limit
+def row_json(fields):
+    groups = [columns(fields)[start:start + 60] for start in range(0, fields, 60)]
+    pairs = [', '.join(f"'{name}', t.{name}" for name in group) for group in groups]
+    objects = [f"json_object({group})" for group in pairs]
+    expression = objects[0]
+    for other in objects[1:]:
+        expression = f"json_patch({expression}, {other})"
+    return expression
+
+# build_json.sql and its validation as SQLite runs them, on the first sites sites
+def legacy_build(engine, fields, sites):
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS legacy_project_data_json"))
+        conn.execute(text(f"""
+            CREATE TABLE legacy_project_data_json AS
+            SELECT t.site,
+                   json_group_array(json_object('field_name', meta.field_name,
+                                                'field_display_name', meta.field_display_name,
+                                                'value', {row_json(fields)} -> meta.column_name,
+                                                'is_track_time', json('false'))) AS field_info
+            FROM (SELECT * FROM project_data ORDER BY site LIMIT :sites) t
+            JOIN (SELECT * FROM project_metadata ORDER BY column_name) meta ON TRUE
+            GROUP BY t.site
+        """), {'sites': sites})
+        conn.execute(text(f"""
+            SELECT COUNT(*) FROM legacy_project_data_json np
+            JOIN json_each(np.field_info) ej
+            JOIN project_metadata fm ON ej.value ->> 'field_name' = fm.field_name
+            JOIN project_data t ON t.site = np.site
+            WHERE ({row_json(fields)} -> fm.column_name) IS NOT (ej.value -> 'value')
+        """)).scalar()
+    return sites
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    summary = {k: len(v) if isinstance(v, list) else v for k, v in result.items()} if isinstance(result, dict) else result
+    print(f"{label:<34} {elapsed:8.2f}s  {summary}")
+    return elapsed, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-site JSON document build benchmark")
+    parser.add_argument('--sites', type=int, default=100000)
+    parser.add_argument('--fields', type=int, default=300)
+    parser.add_argument('--legacy-sites', type=int, default=200, help="sites build_json.sql is timed on")
+    parser.add_argument('--changed', type=float, default=0.01, help="share of sites edited between builds")
+    args = parser.parse_args()
+    rng = np.random.default_rng(210)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(os.path.join(tmp, 'projects.db'))
+        start = time.perf_counter()
+        make_database(engine, args.sites, args.fields)
+        print(f"{args.sites} sites x {args.fields} fields written in {time.perf_counter() - start:.0f}s")
+
+        legacy_sites = min(args.legacy_sites, args.sites)
+        elapsed, _ = timed(f"build_json.sql, {legacy_sites} sites", legacy_build, engine, args.fields,
+                                    legacy_sites)
+        legacy_elapsed = elapsed * args.sites / legacy_sites
+        print(f"{'':<34} {legacy_elapsed:8.0f}s  scaled to {args.sites} sites")
+
+        full_elapsed, stats = timed("first build, every site", build_documents, engine)
+        assert stats['rebuilt'] == args.sites, stats
+        print(f"{'':<34} {legacy_elapsed / full_elapsed:8.1f}x faster than build_json.sql")
+        with engine.connect() as conn:
+            legacy, built = conn.execute(text("""
+                SELECT l.field_info, n.field_info FROM legacy_project_data_json l
+                JOIN new_project_data_json n ON n.site = l.site ORDER BY l.site LIMIT 1
+            """)).one()
+        assert json.loads(legacy) == json.loads(built)
+
+        timed("rebuild, nothing changed", build_documents, engine)
+
+        # A day's edits: some fields of some sites, a few sites closed and a few opened
+        names = columns(args.fields)
+        edited = rng.choice(args.sites, int(args.sites * args.changed), replace=False)
+        with engine.begin() as conn:
+            for site in edited.tolist():
+                name = names[int(rng.integers(0, args.fields))]
+                conn.execute(text(f"UPDATE project_data SET {name} = :value WHERE site = :site"),
+                             {'value': 'edited', 'site': f"SITE{site:06d}"})
+            closed = conn.execute(text("DELETE FROM project_data WHERE site IN "
+                                       "(SELECT site FROM project_data ORDER BY random() LIMIT 50)")).rowcount
+            conn.exec_driver_sql(f"INSERT INTO project_data VALUES ({', '.join(['?'] * (args.fields + 1))})",
+                                 make_rows(rng, 50, args.fields, args.sites))
+        elapsed, stats = timed(f"incremental, {len(edited)} edited", build_documents, engine)
+        assert stats['removed'] == closed, stats
+        print(f"{'':<34} {legacy_elapsed / elapsed:8.0f}x faster than build_json.sql")
+
+        _, mismatches = timed(f"validate {len(stats['sites'])} rebuilt sites", validate_documents, engine,
+                              stats['sites'])
+        assert not mismatches, mismatches[:5]
+
+        # A document damaged after the build is caught by validating its site
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE new_project_data_json SET field_info = replace(field_info, '\"value\": null', "
+                              "'\"value\": 0') WHERE site = 'SITE000007'"))
+        _, mismatches = timed("validate one site", validate_documents, engine, ['SITE000007'])
+        assert mismatches and all(site == 'SITE000007' for site, *_ in mismatches)
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Benchmark for the keyed schema diff in compare_db_schema.py
+# Run from the python/ directory: python -m benchmarks.schema_diff
+import argparse
+import random
+import time
+
+from compare_db_schema import compare_columns_and_generate_sql_queries, compare_tables
+
+DATA_TYPES = ['varchar', 'int4', 'int8', 'numeric', 'timestamp', 'bool', 'text']
+
+# Build a synthetic {table: {column: attributes}} schema and a drifted copy of it
+def make_schemas(table_count, column_count, drift=0.02, seed=42):
+    rng = random.Random(seed)
+    source_schema = {}
+    target_schema = {}
+    for t in range(table_count):
+        table_name = f"table_{t}"
+        source_columns = {}
+        target_columns = {}
+        for c in range(column_count):
+            column_name = f"col_{c}"
+            data_type = rng.choice(DATA_TYPES)
+            column = {
+                'column_name': column_name,
+                'data_type': data_type,
+                'column_default': None,
+                'max_length': 255 if data_type == 'varchar' else None,
+                'is_nullable': 'YES'
+            }
+            source_columns[column_name] = column
+            roll = rng.random()
+            if roll < drift / 2:
+                continue  # column only exists in source
+            if roll < drift:
+                column = dict(column, is_nullable='NO')
+            target_columns[column_name] = column
+        target_columns['legacy_col'] = {
+            'column_name': 'legacy_col', 'data_type': 'text', 'column_default': None, 'max_length': None, 'is_nullable': 'YES'
+        }
+        source_schema[table_name] = source_columns
+        target_schema[table_name] = target_columns
+    return source_schema, target_schema
+
+def run(table_count, column_count):
+    source_schema, target_schema = make_schemas(table_count, column_count)
+    start = time.perf_counter()
+    column_changes = compare_columns_and_generate_sql_queries(source_schema, target_schema, 'dev', 'qa')
+    compare_tables(source_schema, target_schema)
+    elapsed = time.perf_counter() - start
+    total_columns = table_count * column_count
+    print(f"{table_count:>6} tables x {column_count:>4} cols  {elapsed:8.3f}s  "
+          f"{elapsed / total_columns * 1e6:6.2f} us/column  {len(column_changes):>7} changes")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Schema diff scaling benchmark")
+    parser.add_argument('--tables', type=int, default=5000)
+    parser.add_argument('--columns', type=int, default=200)
+    args = parser.parse_args()
+
+    # Time per column should stay flat as tables grow ...
+    print("Scaling with table count:")
+    for fraction in (8, 4, 2, 1):
+        run(args.tables // fraction, 50)
+
+    # ... and as columns per table grow (the old next(...) lookups were quadratic here)
+    print("Scaling with columns per table:")
+    for column_count in (25, 50, 100, args.columns):
+        run(args.tables // 10, column_count)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# Benchmark and offline check for schema_snapshot.py: fingerprint-driven re-reads, load_snapshot(as_of=...) and
+# incremental_column_changes, against a stub catalog standing in for pg_class/information_schema
+# (the catalog queries themselves need PostgreSQL).
+# Run from the python/ directory: python -m benchmarks.schema_snapshot --tables 2000
+import argparse
+import hashlib
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import schema_snapshot
+from benchmarks.schema_diff import make_schemas
+from compare_db_schema import compare_columns_and_generate_sql_queries
+
+# One database's catalog: {table: {column: attributes}}, minus the tables this role can't read
+class StubCatalog:
+    def __init__(self, tables, hidden=()):
+        self.tables = tables
+        self.hidden = set(hidden)
+        # Fingerprinted but failing to read, as a table the fingerprint query lists and get_schema() doesn't
+        self.unreadable = set()
+        self.tables_read = 0
+
+    def visible(self):
+        return {name: columns for name, columns in self.tables.items() if name not in self.hidden}
+
+    def fingerprints(self):
+        return {name: hashlib.md5(json.dumps(columns, sort_keys=True).encode()).hexdigest()
+                for name, columns in self.visible().items()}
+
+    def schema(self, tables):
+        visible = self.visible()
+        names = [name for name in (visible if tables is None else tables)
+                 if name in visible and name not in self.unreadable]
+        self.tables_read += len(names)
+        return {name: visible[name] for name in names}
+
+# Point schema_snapshot's catalog reads at the StubCatalog passed as the engine, and its clock at clock
+def install_stubs(clock):
+    schema_snapshot.get_table_fingerprints = lambda engine, schema_name='public': engine.fingerprints()
+    schema_snapshot.get_schema = lambda engine, schema_name='public', tables=None, raise_errors=False: \
+        engine.schema(tables)
+    schema_snapshot.get_constraints = lambda engine, schema_name='public', raise_errors=False: {}
+    schema_snapshot.get_indexes = lambda engine, schema_name='public', raise_errors=False: {}
+
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock[0]
+    schema_snapshot.datetime = Clock
+
+def retype(catalog, table_name, data_type='uuid'):
+    column = next(iter(catalog.tables[table_name].values()))
+    catalog.tables[table_name] = dict(catalog.tables[table_name], **{column['column_name']: dict(column, data_type=data_type)})
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    print(f"{label:<40} {time.perf_counter() - start:8.3f}s")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Schema snapshot benchmark")
+    parser.add_argument('--tables', type=int, default=2000)
+    parser.add_argument('--columns', type=int, default=50)
+    args = parser.parse_args()
+
+    clock = [datetime(2026, 10, 1, 9, 0, 0)]
+    install_stubs(clock)
+    source_schema, target_schema = make_schemas(args.tables, args.columns)
+    # A table the role has no privilege on is in neither the fingerprints nor information_schema
+    dev = StubCatalog(source_schema, hidden=['table_0'])
+    qa = StubCatalog(target_schema, hidden=['table_0'])
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        for name, catalog in (('dev', dev), ('qa', qa)):
+            snapshot, changed = timed(f"first snapshot of {name}", schema_snapshot.take_snapshot,
+                                      catalog, snapshot_dir, name)
+            assert snapshot is not None and len(changed) == args.tables - 1 == catalog.tables_read
+        first_taken = clock[0]
+
+        # Unchanged catalog: nothing re-read
+        clock[0] += timedelta(hours=1)
+        dev.tables_read = 0
+        snapshot, changed = timed("unchanged dev", schema_snapshot.take_snapshot, dev, snapshot_dir, 'dev')
+        assert snapshot is not None and changed == [] and dev.tables_read == 0
+
+        # Two tables retyped: only those re-read, the rest carried over from the previous snapshot
+        clock[0] += timedelta(hours=1)
+        retype(dev, 'table_1')
+        retype(dev, 'table_2')
+        dev.tables_read = 0
+        dev_snapshot, changed = timed("dev, 2 tables retyped", schema_snapshot.take_snapshot, dev, snapshot_dir, 'dev')
+        assert sorted(changed) == ['table_1', 'table_2'] and dev.tables_read == 2
+        assert dev_snapshot['tables'] == dev.visible()
+
+        # A changed table that can't be read: nothing saved, the last good snapshot stays the latest
+        clock[0] += timedelta(minutes=30)
+        retype(dev, 'table_4')
+        dev.unreadable.add('table_4')
+        snapshot, changed = schema_snapshot.take_snapshot(dev, snapshot_dir, 'dev')
+        assert snapshot is None and changed == ['table_4']
+        assert schema_snapshot.load_snapshot(snapshot_dir, 'dev') == dev_snapshot
+        dev.unreadable.clear()
+        dev.tables['table_4'] = dev_snapshot['tables']['table_4']
+
+        # as_of picks the snapshot taken at or before it
+        earlier = schema_snapshot.load_snapshot(snapshot_dir, 'dev', as_of=first_taken + timedelta(minutes=30))
+        assert earlier['taken_at'] == first_taken.strftime(schema_snapshot.SNAPSHOT_TIME_FORMAT)
+        assert earlier['tables']['table_1'] != dev_snapshot['tables']['table_1']
+        assert schema_snapshot.load_snapshot(snapshot_dir, 'dev', as_of=first_taken - timedelta(seconds=1)) is None
+
+        # Incremental diffs match a full diff and only redo the tables whose fingerprints moved
+        qa_snapshot = schema_snapshot.load_snapshot(snapshot_dir, 'qa')
+        full = timed("full column diff", compare_columns_and_generate_sql_queries,
+                     dev_snapshot['tables'], qa_snapshot['tables'], 'public', 'public')
+        incremental = timed("incremental diff, no cache", schema_snapshot.incremental_column_changes,
+                            dev_snapshot, qa_snapshot, snapshot_dir)
+        assert sorted(map(json.dumps, incremental)) == sorted(map(json.dumps, full))
+
+        clock[0] += timedelta(hours=1)
+        retype(qa, 'table_3', 'int8')
+        qa_snapshot, _ = schema_snapshot.take_snapshot(qa, snapshot_dir, 'qa')
+        incremental = timed("incremental diff, 1 table changed", schema_snapshot.incremental_column_changes,
+                            dev_snapshot, qa_snapshot, snapshot_dir)
+        full = compare_columns_and_generate_sql_queries(dev_snapshot['tables'], qa_snapshot['tables'], 'public', 'public')
+        assert sorted(map(json.dumps, incremental)) == sorted(map(json.dumps, full))
+        print("re-reads, as_of and incremental diffs ok")
+
+if __name__ == "__main__":
+    main()
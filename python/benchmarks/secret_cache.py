@@ -0,0 +1,48 @@
+# Latency of cold vs. cached rotated-secret fetches against local IMDS/Akeyless stubs
+# Run from the python/ directory: python -m benchmarks.secret_cache --latency 0.1
+import argparse
+import tempfile
+import time
+
+from benchmarks.fake_services import FakeServices
+from secret_provider import EncryptedDiskCache, Fernet, SecretProvider
+
+SECRET_PATH = '/team/secrets/azure/sp-reporting'
+
+def timed(label, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed * 1000:9.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Secret cache benchmark")
+    parser.add_argument('--latency', type=float, default=0.1, help="seconds added to every stub call")
+    parser.add_argument('--jobs', type=int, default=20, help="short-lived jobs sharing the disk cache")
+    args = parser.parse_args()
+
+    with FakeServices(latency=args.latency) as services:
+        provider = SecretProvider(services.url, 'p-test', imds_url=services.imds_url)
+        timed("cold fetch (IMDS + auth + secret)", lambda: provider.get_secret(SECRET_PATH))
+        timed("in-process cache hit", lambda: provider.get_secret(SECRET_PATH))
+        print(f"stub calls: {services.calls}")
+
+        if Fernet is None:
+            print("cryptography not installed; skipping the disk cache run")
+            return
+
+        key = Fernet.generate_key()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            def run_jobs():
+                # A fresh provider per job simulates separate short-lived processes
+                for _ in range(args.jobs):
+                    job = SecretProvider(services.url, 'p-test', imds_url=services.imds_url,
+                                         disk_cache=EncryptedDiskCache(cache_dir, key=key))
+                    job.get_secret(SECRET_PATH)
+
+            before = dict(services.calls)
+            timed(f"{args.jobs} jobs sharing the disk cache", run_jobs)
+            print(f"stub secret fetches for {args.jobs} jobs: {services.calls['secret'] - before['secret']}")
+
+if __name__ == "__main__":
+    main()
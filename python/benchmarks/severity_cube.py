@@ -0,0 +1,144 @@
+# Benchmark for the pre-aggregated severity cube in severity_cube.py against GetSeverityCounts()-style scans,
+# on a SQLite stand-in for siebel_srs.
+# Run from the python/ directory: python -m benchmarks.severity_cube --rows 1000000
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from severity_cube import SeverityCube
+
+START = pd.Timestamp('2025-10-01')
+DAYS = 365
+
+# GetSeverityCounts() translated to SQLite: 30 COUNT(CASE ...) columns over the whole date range
+def scan_query(level, severities=range(1, 16)):
+    bucket = {
+        'daily': "date(COALESCE(open_date, close_date))",
+        'weekly': "date(COALESCE(open_date, close_date), 'weekday 0', '-6 days')",
+        'monthly': "date(COALESCE(open_date, close_date), 'start of month')",
+    }[level]
+    columns = [f"COUNT(CASE WHEN severity = {s} AND date(open_date) BETWEEN :start AND :end THEN 1 END) AS open_sev{s}"
+               for s in severities]
+    columns += [f"COUNT(CASE WHEN severity = {s} AND date(close_date) BETWEEN :start AND :end THEN 1 END) AS close_sev{s}"
+                for s in severities]
+    return f"""
+        SELECT {bucket} AS aggregation_date, {', '.join(columns)}
+        FROM siebel_srs
+        WHERE (date(open_date) BETWEEN :start AND :end OR date(close_date) BETWEEN :start AND :end)
+          AND (:assoc_mgr_id IS NULL OR assoc_manager_id = :assoc_mgr_id)
+        GROUP BY aggregation_date
+        ORDER BY aggregation_date
+    """
+
+# Opens per open day and closes per close day, straight from the source, to check the cube against
+EXPECTED_QUERY = """
+    SELECT date(open_date) AS day, severity, 'open' AS event, COUNT(*) AS sr_count
+    FROM siebel_srs WHERE open_date IS NOT NULL AND severity IS NOT NULL GROUP BY 1, 2
+    UNION ALL
+    SELECT date(close_date), severity, 'close', COUNT(*)
+    FROM siebel_srs WHERE close_date IS NOT NULL AND severity IS NOT NULL GROUP BY 1, 2
+"""
+# Per-manager cells and the all-managers rollup rows must both match
+CUBE_QUERY = """
+    SELECT day, severity, event, SUM(sr_count) AS sr_count FROM sr_severity_cube WHERE assoc_manager_id {op} -2 GROUP BY 1, 2, 3
+"""
+
+def make_database(path, rows, seed=21):
+    rng = np.random.default_rng(seed)
+    opened = START + pd.to_timedelta(rng.integers(0, DAYS * 24 * 3600, rows), unit='s')
+    closed = pd.Series(opened + pd.to_timedelta(rng.exponential(5 * 24 * 3600, rows).astype('int64'), unit='s'))
+    closed[rng.random(rows) < 0.3] = pd.NaT
+    assoc_managers = rng.integers(1, 60, rows)
+    frame = pd.DataFrame({
+        'id': np.arange(1, rows + 1),
+        'open_date': opened.strftime('%Y-%m-%d %H:%M:%S'),
+        'close_date': closed.dt.strftime('%Y-%m-%d %H:%M:%S'),
+        'severity': np.minimum(rng.geometric(0.25, rows), 20),
+        'assoc_manager_id': assoc_managers,
+        'manager_id': assoc_managers % 11 + 1,
+        'updated_at': '2026-10-01 00:00:00.000000',
+    })
+    engine = create_engine(f"sqlite:///{path}")
+    frame.to_sql('siebel_srs', engine, index=False, chunksize=50000)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE UNIQUE INDEX siebel_srs_id ON siebel_srs (id)"))
+        conn.execute(text("CREATE INDEX siebel_srs_updated_at ON siebel_srs (updated_at)"))
+    return engine
+
+def check(engine):
+    with engine.connect() as conn:
+        expected = pd.read_sql(text(EXPECTED_QUERY), conn)
+        for op in ('!=', '='):
+            actual = pd.read_sql(text(CUBE_QUERY.format(op=op)), conn)
+            merged = expected.merge(actual, on=['day', 'severity', 'event'], how='outer',
+                                    suffixes=('_expected', '_cube')).fillna(0)
+            mismatches = merged[merged['sr_count_expected'] != merged['sr_count_cube']]
+            assert mismatches.empty, mismatches.head()
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed:8.3f}s")
+    return elapsed, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Severity cube benchmark")
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--changed', type=float, default=0.01, help="fraction of SRs updated before the refresh")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_database(os.path.join(tmp, 'srs.db'), args.rows)
+        cube = SeverityCube(engine)
+        cube.create_tables()
+        build_elapsed, stats = timed(f"initial build ({args.rows} SRs)", cube.refresh)
+        check(engine)
+        with engine.connect() as conn:
+            cells = conn.execute(text("SELECT COUNT(*) FROM sr_severity_cube")).scalar()
+        print(f"{cells} cube rows for {stats['changed_srs']} SRs")
+
+        start_date, end_date = date(2025, 10, 1), date(2026, 9, 30)
+        # A dashboard view is one associate manager's year; the last pair is the all-managers view
+        for level, assoc_mgr_id in [('daily', 7), ('weekly', 7), ('monthly', 7), ('monthly', None)]:
+            params = {'start': start_date.isoformat(), 'end': end_date.isoformat(), 'assoc_mgr_id': assoc_mgr_id}
+            scope = 'all' if assoc_mgr_id is None else 'one AM'
+            with engine.connect() as conn:
+                scan_elapsed, _ = timed(f"{level} {scope}, scan", conn.execute(text(scan_query(level)), params).fetchall)
+            cube_elapsed, _ = timed(f"{level} {scope}, cube", cube.counts, start_date, end_date, level,
+                                    assoc_mgr_id=assoc_mgr_id, severities=range(1, 16))
+            print(f"{'':<34} {scan_elapsed / cube_elapsed:8.1f}x faster")
+        timed("monthly one AM, cube, sev 1-20", cube.counts, start_date, end_date, 'monthly',
+              assoc_mgr_id=7, severities=range(1, 21))
+
+        # Close some open SRs and re-grade others, then fold only those rows in
+        rng = np.random.default_rng(5)
+        changed = rng.choice(np.arange(1, args.rows + 1), int(args.rows * args.changed), replace=False)
+        with engine.begin() as conn:
+            conn.execute(text("""
+                UPDATE siebel_srs
+                SET close_date = COALESCE(close_date, '2026-10-02 09:00:00'),
+                    severity = CASE WHEN id % 2 = 0 THEN severity + 1 ELSE severity END,
+                    manager_id = CASE WHEN id % 3 = 0 THEN NULL ELSE manager_id END,
+                    updated_at = '2026-10-02 10:00:00.000000'
+                WHERE id = :id
+            """), [{'id': int(sr_id)} for sr_id in changed])
+        refresh_elapsed, stats = timed(f"incremental refresh ({len(changed)} SRs)", cube.refresh)
+        check(engine)
+        print(f"{stats['cube_cells']} cube cells touched, {build_elapsed / refresh_elapsed:.0f}x faster than a rebuild")
+
+        removed = [int(sr_id) for sr_id in changed[:100]]
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM siebel_srs WHERE id = :id"), [{'id': sr_id} for sr_id in removed])
+        timed(f"remove ({len(removed)} deleted SRs)", cube.remove, removed)
+        check(engine)
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# Benchmark for the single-scan pivot in severity_pivot.py against pivot_severity_summary_json()'s
+# per-day correlated subqueries, run on the 28th of a month on a SQLite stand-in for siebel_srs/staff_master.
+# Run from the python/ directory: python -m benchmarks.severity_pivot --techs 3000
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from severity_pivot import STAFF_COLUMNS, TOTAL_COLUMN, default_period, write_pivot_json
+
+TODAY = date(2026, 9, 28)
+
+# One breakdown column per day, each a correlated subquery per staff row, as pivot_severity_summary_json() generates
+LEGACY_DAY_COLUMN = """,
+    (SELECT group_concat(cnt || ' P' || sev, ', ')
+     FROM (SELECT CASE WHEN severity > 5 THEN '5+' ELSE CAST(severity AS TEXT) END AS sev, COUNT(*) AS cnt
+           FROM siebel_srs s2
+           WHERE s2.siebel_id = sm.emp_id AND date(s2.closed_date) = '{day}'
+           GROUP BY sev ORDER BY sev)) AS "{day}\""""
+LEGACY_QUERY = """
+    SELECT sm.tech_id, sm.first_name, sm.state, sm.city, sm.zone, sm.team,
+           (SELECT COUNT(*) FROM siebel_srs s2
+            WHERE s2.siebel_id = sm.emp_id AND date(s2.closed_date) BETWEEN '{start}' AND '{end}') AS "Total SRs"
+           {day_columns}
+    FROM staff_master sm
+    WHERE sm.emp_id IN (SELECT DISTINCT siebel_id FROM siebel_srs WHERE date(closed_date) BETWEEN '{start}' AND '{end}')
+    ORDER BY sm.tech_id
+"""
+
+def make_database(path, techs, per_day, seed=16):
+    rng = np.random.default_rng(seed)
+    staff = pd.DataFrame({
+        'tech_id': [f"T{n:06d}" for n in range(1, techs + 1)],
+        'emp_id': np.arange(100001, 100001 + techs),
+        'first_name': [f"Tech{n}" for n in range(1, techs + 1)],
+        'state': rng.choice(['CA', 'TX', 'NY', 'FL', 'WA'], techs),
+        'city': rng.choice(['North', 'South', 'East', 'West'], techs),
+        'zone': rng.choice([f"Z{zone}" for zone in range(12)], techs),
+        'team': rng.choice(['Install', 'Repair', 'Field'], techs),
+    })
+
+    # The month so far plus the previous month, and some SRs still open; a tenth of the staff closes nothing
+    month_start = TODAY.replace(day=1)
+    history_days = (TODAY - (month_start - timedelta(days=31))).days
+    rows = techs * history_days * per_day
+    closed = pd.Timestamp(month_start - timedelta(days=31)) + pd.to_timedelta(
+        rng.integers(0, history_days * 24 * 3600, rows), unit='s')
+    closed = pd.Series(closed.strftime('%Y-%m-%d %H:%M:%S'))
+    closed[rng.random(rows) < 0.1] = None
+    srs = pd.DataFrame({
+        'id': np.arange(1, rows + 1),
+        'siebel_id': rng.integers(100001, 100001 + int(techs * 0.9), rows),
+        'severity': np.minimum(rng.geometric(0.3, rows), 9),
+        'closed_date': closed,
+    })
+    # A few SRs without a severity: counted in the total, left out of the day's breakdown
+    srs['severity'] = srs['severity'].astype('Int64').mask(rng.random(rows) < 0.02)
+
+    engine = create_engine(f"sqlite:///{path}")
+    staff.to_sql('staff_master', engine, index=False)
+    srs.to_sql('siebel_srs', engine, index=False, chunksize=50000)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE UNIQUE INDEX staff_master_emp_id ON staff_master (emp_id)"))
+        conn.execute(text("CREATE INDEX siebel_srs_siebel_id ON siebel_srs (siebel_id)"))
+        conn.execute(text("CREATE INDEX siebel_srs_closed_date ON siebel_srs (closed_date)"))
+    return engine, rows
+
+# The existing function's output: every row fetched, then serialised as one JSON value
+def legacy_pivot(engine, start_date, end_date):
+    day_columns = ''.join(LEGACY_DAY_COLUMN.format(day=(start_date + timedelta(days=offset)).isoformat())
+                          for offset in range((end_date - start_date).days + 1))
+    query = LEGACY_QUERY.format(start=start_date.isoformat(), end=end_date.isoformat(), day_columns=day_columns)
+    with engine.connect() as conn:
+        records = [dict(row._mapping) for row in conn.execute(text(query))]
+    return json.dumps(records, default=str)
+
+def streamed_pivot(engine, start_date, end_date):
+    output = io.StringIO()
+    write_pivot_json(engine, output, start_date, end_date)
+    return output
+
+# Wall time first, then a second run under tracemalloc for the peak Python memory
+def measured(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed:8.3f}s  peak {peak / 2 ** 20:7.1f} MiB")
+    return elapsed, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Severity pivot benchmark")
+    parser.add_argument('--techs', type=int, default=3000)
+    parser.add_argument('--per-day', type=int, default=3, help="SRs per technician per day")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, rows = make_database(os.path.join(tmp, 'pivot.db'), args.techs, args.per_day)
+        start_date, end_date = default_period(TODAY)
+        print(f"{rows} SRs, {args.techs} staff, {start_date} .. {end_date}")
+
+        legacy_elapsed, legacy = measured("correlated subqueries", legacy_pivot, engine, start_date, end_date)
+        pivot_elapsed, output = measured("single scan, streamed", streamed_pivot, engine, start_date, end_date)
+        print(f"{'':<28} {legacy_elapsed / pivot_elapsed:8.1f}x faster")
+
+        # Same technicians, keys, key order and breakdown strings
+        expected, actual = json.loads(legacy), json.loads(output.getvalue())
+        assert [list(record) for record in expected] == [list(record) for record in actual]
+        assert expected == actual
+        assert list(actual[0])[:len(STAFF_COLUMNS) + 1] == STAFF_COLUMNS + [TOTAL_COLUMN]
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
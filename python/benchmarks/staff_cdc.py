@@ -0,0 +1,160 @@
+# Benchmark for the hash-based staff_staging -> staff_master loader in staff_cdc.py against the blanket
+# history insert + UPDATE of compare_old_new_data_in_col.sql, on a SQLite stand-in.
+# Run from the python/ directory: python -m benchmarks.staff_cdc --rows 500000
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from staff_cdc import HISTORY_COLUMNS, KEY, SYNC_COLUMNS, load_staging, sync_staff
+
+ZONES = [f"Z{zone}" for zone in range(12)]
+TEAMS = [f"Team{team}" for team in range(60)]
+TITLES = ['Technician I', 'Technician II', 'Senior Technician', 'Lead', 'Supervisor']
+
+# compare_old_new_data_in_col.sql as SQLite runs it: != comparisons, then every matched row rewritten
+LEGACY_STATEMENTS = [
+    """
+    INSERT INTO staff_history (emp_id, zone, team, title, firstname, lastname, mobile, change_date, comments)
+    SELECT sm.emp_id, sm.zone, sm.team, sm.title, sm.firstname, sm.lastname, sm.mobile, CURRENT_TIMESTAMP,
+           json_object('changes', json_object(
+               'zone', json_object('old', sm.zone, 'new', ss.zone),
+               'team', json_object('old', sm.team, 'new', ss.team),
+               'title', json_object('old', sm.title, 'new', ss.title)))
+    FROM staff_master sm
+    JOIN staff_staging ss ON sm.emp_id = ss.emp_id
+    WHERE sm.zone != ss.zone OR sm.team != ss.team OR sm.title != ss.title
+    """,
+    """
+    UPDATE staff_master
+    SET zone = ss.zone, team = ss.team, title = ss.title,
+        firstname = ss.firstname, lastname = ss.lastname, mobile = ss.mobile
+    FROM staff_staging ss
+    WHERE staff_master.emp_id = ss.emp_id
+    """,
+]
+
+def make_master(rows, seed=17):
+    rng = np.random.default_rng(seed)
+    titles = pd.Series(rng.choice(TITLES, rows), dtype=object)
+    titles[rng.random(rows) < 0.05] = None
+    return pd.DataFrame({
+        KEY: np.arange(1, rows + 1),
+        'zone': rng.choice(ZONES, rows),
+        'team': rng.choice(TEAMS, rows),
+        'title': titles,
+        'firstname': [f"First{n % 5000}" for n in range(rows)],
+        'lastname': [f"Last{n % 40000}" for n in range(rows)],
+        'mobile': [f"555{n:07d}" for n in rng.permutation(rows)],
+    })
+
+# The next feed: a few transfers, some titles gained or lost (NULL on one side), some phone-only changes
+# and a handful of hires that staff_master does not have yet
+def make_staging(master, changed, seed=18):
+    rng = np.random.default_rng(seed)
+    staging = master.copy()
+    rows = len(staging)
+    picks = rng.choice(rows, changed, replace=False)
+    moves, titles, cleared, phones = np.array_split(picks, 4)
+    staging.loc[moves, 'zone'] = rng.choice(ZONES, len(moves))
+    staging.loc[titles, 'title'] = np.where(staging.loc[titles, 'title'].isna(), 'Lead', None)
+    staging.loc[cleared, 'team'] = None
+    staging.loc[phones, 'mobile'] = [f"556{n:07d}" for n in range(len(phones))]
+    hires = make_master(changed // 10, seed=seed).assign(**{KEY: lambda frame: frame[KEY] + rows})
+    return pd.concat([staging, hires], ignore_index=True)
+
+def make_database(path, master):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+    master.to_sql('staff_master', engine, index=False, chunksize=50000)
+    master.head(0).to_sql('staff_staging', engine, index=False)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE UNIQUE INDEX staff_master_emp_id ON staff_master (emp_id)"))
+        conn.execute(text("CREATE UNIQUE INDEX staff_staging_emp_id ON staff_staging (emp_id)"))
+        conn.execute(text("""
+            CREATE TABLE staff_history (emp_id INTEGER, zone TEXT, team TEXT, title TEXT, firstname TEXT,
+                                        lastname TEXT, mobile TEXT, change_date TIMESTAMP, comments TEXT)
+        """))
+    return engine
+
+# Bytes of WAL a sync appends: every page SQLite had to rewrite, the stand-in for PostgreSQL's WAL and dead tuples
+def wal_written(engine, path, func):
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.exec_driver_sql("PRAGMA wal_autocheckpoint=0")
+    result = func(engine)
+    return os.path.getsize(f"{path}-wal"), result
+
+def legacy_sync(engine):
+    written = 0
+    with engine.begin() as conn:
+        for statement in LEGACY_STATEMENTS:
+            written += conn.execute(text(statement)).rowcount
+    return written
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:8.3f}s")
+    return elapsed, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Staff CDC loader benchmark")
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--changed', type=float, default=0.02, help="fraction of staff rows changed in the feed")
+    args = parser.parse_args()
+
+    master = make_master(args.rows)
+    staging = make_staging(master, int(args.rows * args.changed))
+    # Everything that differs at all, NULLs included, is what staff_history should record
+    merged = staging.merge(master, on=KEY, suffixes=('_new', '_old'))
+    differs = lambda name: ~((merged[f"{name}_new"] == merged[f"{name}_old"])
+                             | (merged[f"{name}_new"].isna() & merged[f"{name}_old"].isna()))
+    expected_history = int(np.logical_or.reduce([differs(name) for name in HISTORY_COLUMNS]).sum())
+    expected_changed = int(np.logical_or.reduce([differs(name) for name in SYNC_COLUMNS]).sum())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Feed to synced staff_master: the whole feed staged, then compare_old_new_data_in_col.sql
+        path = os.path.join(tmp, 'legacy.db')
+        engine = make_database(path, master)
+        legacy = lambda engine: (load_staging(engine, staging), legacy_sync(engine))
+        legacy_elapsed, (legacy_wal, _) = timed("full staging + blanket UPDATE", wal_written, engine, path, legacy)
+        with engine.connect() as conn:
+            legacy_history = conn.execute(text("SELECT COUNT(*) FROM staff_history")).scalar()
+        print(f"{'':<32} {legacy_history} history rows (expected {expected_history}), "
+              f"{len(staging) + len(merged) + legacy_history} rows written, {legacy_wal / 2 ** 20:.0f} MiB WAL")
+        engine.dispose()
+
+        path = os.path.join(tmp, 'cdc.db')
+        engine = make_database(path, master)
+        cdc = lambda engine: sync_staff(engine, staging)
+        cdc_elapsed, (cdc_wal, stats) = timed("hash CDC", wal_written, engine, path, cdc)
+        print(f"{'':<32} {stats}, {cdc_wal / 2 ** 20:.0f} MiB WAL")
+        print(f"{'':<32} {legacy_elapsed / cdc_elapsed:.1f}x faster, "
+              f"{len(merged) / max(stats['master_written'], 1):.0f}x fewer master rows written, "
+              f"{legacy_wal / cdc_wal:.1f}x less WAL")
+        assert stats['history_written'] == expected_history and stats['changed'] == expected_changed
+
+        # staff_master now matches the feed for every existing employee, and a second run writes nothing
+        with engine.connect() as conn:
+            synced = pd.read_sql(text("SELECT * FROM staff_master ORDER BY emp_id"), conn)
+            # The changed rows were staged in a temporary table, not in the shared staff_staging
+            assert conn.execute(text("SELECT COUNT(*) FROM staff_staging")).scalar() == 0
+        pd.testing.assert_frame_equal(synced.astype('string'), staging.head(args.rows).astype('string'))
+        assert sync_staff(engine, staging)['written'] == 0
+        engine.dispose()
+
+        # A staff_staging filled by someone else is applied the same way
+        engine = make_database(os.path.join(tmp, 'staged.db'), master)
+        load_staging(engine, staging)
+        timed("hash CDC, already staged", sync_staff, engine)
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Interpreter startup per cli.py command, from python -X importtime: what each invocation pays before doing
+# any work, vs. importing every script eagerly as a single CLI with top-level imports would.
+# Run from the python/ directory: python -m benchmarks.startup --repeat 5
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Packages whose import dominates startup; a light command should load none but what it needs
+HEAVY_PACKAGES = ['pandas', 'numpy', 'openpyxl', 'sqlalchemy', 'requests']
+
+CASES = [
+    ('cli.py --help', ['cli.py', '--help']),
+    ('cli.py secret --help', ['cli.py', 'secret', '--help']),
+    ('cli.py highlight --help', ['cli.py', 'highlight', '--help']),
+    ('cli.py profile-columns --help', ['cli.py', 'profile-columns', '--help']),
+    ('eager import of every script', ['-c', "import compare_db_schema, gen_sr_summary_report, excel_format_columns, "
+                                           "column_profiler, akey_rot_key, akeyless"]),
+]
+# Packages each case must not import
+MUST_NOT_IMPORT = {
+    'cli.py --help': HEAVY_PACKAGES,
+    'cli.py secret --help': ['pandas', 'numpy', 'openpyxl', 'sqlalchemy'],
+}
+
+# (wall seconds, import seconds, {top-level package: cumulative import seconds}) of one run
+def measure(args, cwd):
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=cwd, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{completed.stderr[-2000:]}")
+
+    total = 0
+    packages = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        total += int(self_us)
+        # Top-level imports are the ones without indentation
+        if name == name.lstrip():
+            packages[name] = packages.get(name, 0) + int(cumulative_us) / 1e6
+    return wall, total / 1e6, packages
+
+def main():
+    parser = argparse.ArgumentParser(description="cli.py startup time benchmark")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per case; the fastest is reported")
+    args = parser.parse_args()
+
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for label, case_args in CASES:
+        runs = [measure(case_args, cwd) for _ in range(args.repeat)]
+        wall, imports, packages = min(runs, key=lambda run: run[0])
+        heavy = [name for name in HEAVY_PACKAGES if name in packages]
+        print(f"{label:<32} {wall * 1000:7.0f} ms wall  {imports * 1000:7.0f} ms importing  "
+              f"heavy: {', '.join(heavy) or '-'}")
+        loaded = [name for name in MUST_NOT_IMPORT.get(label, []) if name in packages]
+        assert not loaded, f"{label} imported {loaded}"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+# End-to-end benchmark suite for the reporting and diff pipelines on synthetic data (benchmarks/synthetic.py).
+# Every stage runs under a timer and tracemalloc, and the run is written to a JSON results file; pass an
+# earlier results file as --baseline to exit non-zero when a stage got slower or hungrier than the tolerance.
+# Run from the python/ directory:
+#   python -m benchmarks.suite --rows 100000 --output results.json
+#   python -m benchmarks.suite --rows 100000 --baseline results.json --output new.json
+#   python -m benchmarks.suite --compare results.json new.json
+# --url runs against a local PostgreSQL instead of a temporary SQLite file (its tables are replaced). There the
+# functions from sql/ are installed and called; SQLite runs inline stand-ins of their queries.
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from benchmarks import synthetic
+
+# Bump when stages or the results layout change; files of another version are not compared
+RESULTS_VERSION = 2
+# A stage regresses when it takes this much longer (or peaks this much higher) than the baseline
+TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.25
+# Stages faster than this are too noisy to fail a run on
+MIN_SECONDS = 0.05
+# Days get_daily_summary() is asked for
+DAILY_DAYS = 7
+
+# Function definitions installed on PostgreSQL before the stages run
+SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'sql')
+SQL_FUNCTIONS = ['sr_as_of_yst_faster_apporach.sql', 'sr_pj_cnt.sql']
+# get_severity_summary() has no manager columns, which gen_sr_summary_report.py partitions on
+SEVERITY_SUMMARY_FUNCTION = """
+    SELECT f.*, sm.associate_manager, sm.manager
+    FROM get_severity_summary() f
+    JOIN (SELECT DISTINCT tech_id, associate_manager, manager FROM staff_master) sm ON sm.tech_id = f.tech_id
+"""
+DAILY_SUMMARY_FUNCTION = "SELECT * FROM get_daily_summary(CAST(:start_date AS date), CAST(:end_date AS date))"
+
+# closed_date's day and a day series in the SQLite stand-ins
+DAY_EXPRESSION = "date({column})"
+DATE_SERIES = ("WITH RECURSIVE d(report_date) AS (SELECT date(:start_date) UNION ALL SELECT date(report_date, '+1 day') "
+               "FROM d WHERE report_date < date(:end_date)) SELECT report_date FROM d")
+
+# SQLite stand-in for get_severity_summary() (sql/sr_as_of_yst_faster_apporach.sql) over period(), plus the
+# manager columns gen_sr_summary_report.py partitions on
+SEVERITY_SUMMARY_QUERY = """
+    SELECT sm.tech_id, sm.first_name, sm.state, sm.city, sm.zone, sm.team, sm.associate_manager, sm.manager,
+           {closed_day} AS closed_day,
+           CASE WHEN s.severity > 5 THEN '5+' ELSE CAST(s.severity AS TEXT) END AS bucket,
+           COUNT(*) AS count
+    FROM siebel_srs s
+    JOIN staff_master sm ON s.siebel_id = sm.emp_id
+    WHERE s.closed_date >= '{start_date}' AND s.closed_date < '{end_exclusive}'
+    GROUP BY sm.tech_id, sm.first_name, sm.state, sm.city, sm.zone, sm.team, sm.associate_manager, sm.manager,
+             {closed_day}, CASE WHEN s.severity > 5 THEN '5+' ELSE CAST(s.severity AS TEXT) END
+    ORDER BY sm.tech_id, {closed_day}, bucket
+"""
+# SQLite stand-in for get_daily_summary() (sql/sr_pj_cnt.sql) for every active technician, joins as written there
+DAILY_SUMMARY_QUERY = """
+    WITH date_series AS ({date_series}),
+    filtered_staff AS (
+        SELECT id AS staff_id, emp_id, first_name || ' ' || last_name AS full_name, tech_id, zone, team
+        FROM staff_master
+        WHERE is_active
+    )
+    SELECT g.report_date, s.full_name, s.tech_id, s.zone, s.team,
+           COUNT(CASE WHEN {sr_open_day} = g.report_date THEN 1 END) AS open_srs,
+           COUNT(CASE WHEN {sr_closed_day} = g.report_date THEN 1 END) AS closed_srs,
+           COUNT(CASE WHEN {pa_day} = g.report_date AND pa.record_type = 'Activity' THEN 1 END) AS activity_count,
+           COUNT(CASE WHEN {pa_day} = g.report_date AND pa.record_type = 'Time Task' THEN 1 END) AS time_task_count
+    FROM date_series g
+    CROSS JOIN filtered_staff s
+    LEFT JOIN siebel_srs sr ON sr.siebel_id = s.emp_id
+        AND ({sr_open_day} = g.report_date OR {sr_closed_day} = g.report_date)
+    LEFT JOIN project_activities pa ON pa.staff_id = s.staff_id
+        AND {pa_day} = g.report_date
+        AND pa.record_type IN ('Activity', 'Time Task')
+    GROUP BY g.report_date, s.full_name, s.tech_id, s.zone, s.team
+    ORDER BY g.report_date, s.full_name
+"""
+
+# get_severity_summary()'s period: the 1st of the month up to the day before as_of
+def period(as_of):
+    return as_of.replace(day=1), as_of - timedelta(days=1)
+
+# get_severity_summary() reads CURRENT_DATE, so on PostgreSQL the data is generated around today;
+# SQLite runs stay on synthetic.AS_OF and are comparable across days
+def run_as_of(engine):
+    return date.today() if engine.dialect.name == 'postgresql' else synthetic.AS_OF
+
+def install_functions(engine):
+    with engine.begin() as conn:
+        for name in SQL_FUNCTIONS:
+            with open(os.path.join(SQL_DIR, name), encoding='utf-8') as file:
+                conn.exec_driver_sql(file.read())
+
+# Each stage takes the run's context and returns how many rows (or files) it produced
+def stage_generate(context):
+    written = synthetic.generate(context['engine'], context['rows'], as_of=context['as_of'])
+    context['catalogs'] = synthetic.make_catalogs(synthetic.scale(context['rows'])['catalog_tables'])
+    return sum(written.values())
+
+def stage_severity_summary(context):
+    from gen_sr_summary_report import load_summary
+
+    engine = context['engine']
+    if engine.dialect.name == 'postgresql':
+        query = SEVERITY_SUMMARY_FUNCTION
+    else:
+        start_date, end_date = period(context['as_of'])
+        closed_day = DAY_EXPRESSION.format(column='s.closed_date')
+        query = SEVERITY_SUMMARY_QUERY.format(closed_day=closed_day, start_date=start_date,
+                                              end_exclusive=end_date + timedelta(days=1))
+    context['summary'] = load_summary(engine, query=query)
+    return len(context['summary'])
+
+def stage_sr_summary_reports(context):
+    import gen_sr_summary_report
+
+    df = context.get('summary')
+    if df is None:
+        stage_severity_summary(context)
+        df = context['summary']
+    df = df.assign(closed_day=pd.to_datetime(df['closed_day']))
+    gen_sr_summary_report.REPORT_DIR = os.path.join(context['tmp'], 'sr_reports')
+    os.makedirs(gen_sr_summary_report.REPORT_DIR, exist_ok=True)
+    report_files, failures, _ = gen_sr_summary_report.generate_all_reports(df, workers=context['report_workers'],
+                                                                            force=True)
+    assert not failures, failures
+    return len(report_files)
+
+def stage_severity_pivot(context):
+    from severity_pivot import write_pivot_json
+
+    return write_pivot_json(context['engine'], io.StringIO(), *period(context['as_of']))
+
+def stage_daily_summary(context):
+    engine = context['engine']
+    end_date = context['as_of'] - timedelta(days=1)
+    if engine.dialect.name == 'postgresql':
+        query = DAILY_SUMMARY_FUNCTION
+    else:
+        day = DAY_EXPRESSION
+        query = DAILY_SUMMARY_QUERY.format(
+            date_series=DATE_SERIES,
+            sr_open_day=day.format(column='sr.open_date'),
+            sr_closed_day=day.format(column='sr.closed_date'),
+            pa_day=day.format(column='pa.created_at'),
+        )
+    with engine.connect() as conn:
+        frame = pd.read_sql(text(query), conn, params={
+            'start_date': (end_date - timedelta(days=DAILY_DAYS - 1)).isoformat(),
+            'end_date': end_date.isoformat(),
+        })
+    return len(frame)
+
+def stage_schema_diff(context):
+    import compare_db_schema
+
+    dev, qa = context['catalogs']['dev'], context['catalogs']['qa']
+    column_changes = compare_db_schema.compare_columns_and_generate_sql_queries(dev, qa, 'dev', 'qa')
+    table_changes = compare_db_schema.compare_tables(dev, qa)
+    compare_db_schema.file_name = os.path.join(context['tmp'], 'schema_changes.xlsx')
+    compare_db_schema.write_to_excel(table_changes, column_changes)
+    return len(column_changes)
+
+def stage_excel_format_columns(context):
+    from excel_format_columns import highlight_frame
+
+    df = synthetic.catalog_frame(context['catalogs'])
+    return highlight_frame(df, os.path.join(context['tmp'], 'highlighted_file.xlsx'))
+
+def stage_employee_search(context):
+    from employee_search import EmployeeSearchIndex
+
+    index = EmployeeSearchIndex()
+    rows = index.load(context['engine'])
+    for term in ('emp1', 'name12', 'req-00', 'ma', 'z3'):
+        index.search(term)
+    return rows
+
+STAGES = {
+    'generate': stage_generate,
+    'severity_summary': stage_severity_summary,
+    'sr_summary_reports': stage_sr_summary_reports,
+    'severity_pivot': stage_severity_pivot,
+    'daily_summary': stage_daily_summary,
+    'schema_diff': stage_schema_diff,
+    'excel_format_columns': stage_excel_format_columns,
+    'employee_search': stage_employee_search,
+}
+
+def measure(func, context, trace):
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    rows = func(context)
+    seconds = time.perf_counter() - start
+    peak = None
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {'seconds': round(seconds, 4), 'peak_bytes': peak, 'rows': rows}
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(rows, url=None, stages=None, trace=True, report_workers=None):
+    from gen_sr_summary_report import REPORT_WORKERS
+
+    stages = stages or list(STAGES)
+    report_workers = report_workers or REPORT_WORKERS
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(url or f"sqlite:///{os.path.join(tmp, 'suite.db')}")
+        as_of = run_as_of(engine)
+        if engine.dialect.name == 'postgresql':
+            install_functions(engine)
+        context = {'engine': engine, 'rows': rows, 'tmp': tmp, 'as_of': as_of, 'report_workers': report_workers}
+        if 'generate' not in stages:
+            stages = ['generate'] + stages
+        results = {}
+        try:
+            for name in stages:
+                results[name] = measure(STAGES[name], context, trace)
+                peak = results[name]['peak_bytes']
+                print(f"{name:<22} {results[name]['seconds']:9.2f}s  "
+                      f"{'' if peak is None else f'peak {peak / 2 ** 20:8.1f} MiB'}  {results[name]['rows']:>9} rows")
+        finally:
+            engine.dispose()
+    return {
+        'version': RESULTS_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'rows': rows,
+        'backend': engine.dialect.name,
+        'traced': trace,
+        'as_of': as_of.isoformat(),
+        'report_workers': report_workers,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'commit': git_commit(),
+        'stages': results,
+    }
+
+# Regressions of current against baseline, one message each. Stages missing from either side are skipped;
+# runs of different versions, sizes, backends or worker counts are not comparable at all. Row counts are only
+# compared between runs on the same as_of day, since the month-to-date period changes with it.
+def compare_results(baseline, current, tolerance=TOLERANCE, memory_tolerance=MEMORY_TOLERANCE,
+                    min_seconds=MIN_SECONDS):
+    for key in ('version', 'rows', 'backend', 'traced', 'report_workers'):
+        if baseline.get(key) != current.get(key):
+            raise ValueError(f"Results are not comparable: {key} {baseline.get(key)!r} vs {current.get(key)!r}")
+
+    regressions = []
+    for name, result in current['stages'].items():
+        before = baseline['stages'].get(name)
+        if before is None:
+            continue
+        if result['seconds'] >= min_seconds and result['seconds'] > before['seconds'] * (1 + tolerance):
+            regressions.append(f"{name}: {before['seconds']:.2f}s -> {result['seconds']:.2f}s "
+                               f"(+{result['seconds'] / max(before['seconds'], 1e-9) - 1:.0%})")
+        if result['peak_bytes'] and before['peak_bytes'] and \
+                result['peak_bytes'] > before['peak_bytes'] * (1 + memory_tolerance):
+            regressions.append(f"{name}: peak {before['peak_bytes'] / 2 ** 20:.1f} MiB -> "
+                               f"{result['peak_bytes'] / 2 ** 20:.1f} MiB")
+        if baseline['as_of'] == current['as_of'] and result['rows'] != before['rows']:
+            regressions.append(f"{name}: {before['rows']} rows -> {result['rows']} rows")
+    return regressions
+
+def load_results(path):
+    with open(path) as file:
+        return json.load(file)
+
+def main():
+    parser = argparse.ArgumentParser(description="Reporting and diff pipeline benchmark suite")
+    parser.add_argument('--rows', type=int, default=100000, help="siebel_srs rows; other tables scale from it")
+    parser.add_argument('--url', help="local PostgreSQL URL to run against instead of a temporary SQLite file")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), help="stages to run (generate always runs)")
+    parser.add_argument('--no-trace', action='store_true', help="time without tracemalloc, which slows allocation")
+    parser.add_argument('--report-workers', type=int,
+                        help="processes writing SR reports (default gen_sr_summary_report.REPORT_WORKERS)")
+    parser.add_argument('--output', help="results file to write")
+    parser.add_argument('--baseline', help="results file to compare against; exits 1 on regressions")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), help="only compare two results files")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE)
+    args = parser.parse_args()
+
+    if args.compare:
+        baseline, current = (load_results(path) for path in args.compare)
+    else:
+        current = run(args.rows, args.url, args.stages, trace=not args.no_trace, report_workers=args.report_workers)
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump(current, file, indent=2)
+            print(f"Results written to {args.output}")
+        baseline = load_results(args.baseline) if args.baseline else None
+
+    if baseline is None:
+        return
+    try:
+        regressions = compare_results(baseline, current, args.tolerance, args.memory_tolerance)
+    except ValueError as error:
+        parser.error(str(error))
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print("No regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
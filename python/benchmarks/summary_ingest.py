@@ -0,0 +1,76 @@
+# Memory benchmark for streaming vs. full-frame ingestion of get_severity_summary() rows
+# Run from the python/ directory: python -m benchmarks.summary_ingest --rows 500000
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from gen_sr_summary_report import build_partition_reports, load_summary, load_summary_streaming
+
+# Write a synthetic month of per-day, per-bucket rows into a local SQLite stand-in for get_severity_summary().
+# The last null_tail rows have no city, zone or team, so the last streamed chunk has those columns all NULL.
+def make_database(path, rows, techs=2000, seed=3, null_tail=0):
+    rng = np.random.default_rng(seed)
+    tech = rng.integers(0, techs, rows)
+    frame = pd.DataFrame({
+        'tech_id': [f"T{t:05d}" for t in tech],
+        'first_name': [f"First{t}" for t in tech],
+        'state': [f"S{t % 40:02d}" for t in tech],
+        'city': [f"City{t % 300}" for t in tech],
+        'zone': [f"Z{t % 12}" for t in tech],
+        'team': [f"Team{t % 60}" for t in tech],
+        'associate_manager': [f"AM {t % 150}" for t in tech],
+        'manager': [f"MGR {t % 30}" for t in tech],
+        'closed_day': (pd.Timestamp('2026-10-01') + pd.to_timedelta(rng.integers(0, 28, rows), unit='D')).strftime('%Y-%m-%d'),
+        'bucket': rng.choice(['1', '2', '3', '4', '5', '5+'], rows),
+        'count': rng.integers(1, 5, rows),
+    })
+    # get_severity_summary() returns one row per (tech, day, bucket)
+    frame = frame.drop_duplicates(['tech_id', 'closed_day', 'bucket'])
+    if null_tail:
+        frame.loc[frame.index[-null_tail:], ['city', 'zone', 'team']] = None
+    engine = create_engine(f"sqlite:///{path}")
+    frame.to_sql('severity_summary', engine, index=False, chunksize=50000)
+    return engine
+
+def measure(label, func, *args, **kwargs):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed:8.2f}s  peak {peak / 2**20:8.1f} MiB  {len(result):>9} rows kept")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Summary ingestion memory benchmark")
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--chunksize', type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_database(os.path.join(tmp, 'summary.db'), args.rows, null_tail=args.chunksize)
+        query = "SELECT * FROM severity_summary"
+        print(f"{args.rows} generated rows")
+
+        full = measure("read_sql full frame", load_summary, engine, query=query)
+        streamed = measure(f"streamed, chunksize={args.chunksize}", load_summary_streaming, engine, query=query, chunksize=args.chunksize)
+
+        # Both paths must produce the same reports
+        full['closed_day'] = pd.to_datetime(full['closed_day'])
+        expected = {name: frame for name, frame, _ in build_partition_reports(full, 'manager')}
+        for name, frame, _ in build_partition_reports(streamed, 'manager'):
+            pd.testing.assert_frame_equal(frame.astype(object), expected[name].astype(object))
+        print("reports identical")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
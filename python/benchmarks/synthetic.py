@@ -0,0 +1,162 @@
+# Synthetic stand-in data for the reporting and diff pipelines: staff_master, siebel_srs, project_activities,
+# employees/new_hires and dev/qa/prod/staging schema catalogs, sized from one row count (10k up to 10M SRs).
+# Big tables are generated and written chunk by chunk, so the generator's memory stays flat with scale.
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from benchmarks.schema_diff import make_schemas
+
+# Day the data is generated around; fixed so runs on different days stay comparable
+AS_OF = date(2026, 10, 18)
+# Days of SR and activity history before AS_OF
+HISTORY_DAYS = 60
+CHUNK_ROWS = 200000
+
+STATES = [f"S{state:02d}" for state in range(40)]
+ZONES = [f"Z{zone}" for zone in range(12)]
+TITLES = ['Technician I', 'Technician II', 'Senior Technician', 'Lead']
+SR_STATUSES = ['Closed', 'Open', 'Pending', 'Cancelled']
+# Severity 1-8 weighted towards the middle, so every get_severity_summary() bucket including 5+ is populated
+SEVERITY_WEIGHTS = np.array([0.08, 0.15, 0.25, 0.22, 0.15, 0.08, 0.05, 0.02])
+RECORD_TYPES = ['Activity', 'Time Task', 'Note']
+REQ_STATUSES = ['Open', 'Filled', 'On Hold', 'Cancelled']
+HIRE_STATUSES = ['Offered', 'Joined', 'Declined', 'Pending']
+ENVIRONMENTS = ['dev', 'qa', 'prod', 'staging']
+
+# Row counts of every table for a run of sr_rows SRs
+def scale(sr_rows):
+    new_hires = max(sr_rows // 10, 1000)
+    return {
+        'siebel_srs': sr_rows,
+        'staff_master': min(max(sr_rows // 250, 100), 50000),
+        'project_activities': sr_rows // 2,
+        'new_hires': new_hires,
+        'employees': max(new_hires // 2, 1000),
+        'catalog_tables': min(max(sr_rows // 1000, 20), 5000),
+    }
+
+def staff_frame(count, rng):
+    ids = np.arange(1, count + 1)
+    managers = np.maximum(count // 200, 1)
+    associate_managers = np.maximum(count // 40, 1)
+    return pd.DataFrame({
+        'id': ids,
+        'emp_id': ids + 100000,
+        'tech_id': [f"T{n:06d}" for n in ids],
+        'first_name': [f"First{n}" for n in ids],
+        'last_name': [f"Last{n % 9973}" for n in ids],
+        'state': rng.choice(STATES, count),
+        'city': [f"City{n % 300}" for n in rng.integers(0, 10 ** 6, count)],
+        'zone': rng.choice(ZONES, count),
+        'team': [f"Team{n % 60}" for n in ids],
+        'title': rng.choice(TITLES, count),
+        'associate_manager': [f"AM {n % associate_managers}" for n in ids],
+        'manager': [f"MGR {n % managers}" for n in ids],
+        'assoc_manager_tid': [f"A{n % associate_managers:05d}" for n in ids],
+        'manager_tid': [f"M{n % managers:05d}" for n in ids],
+        'is_active': rng.random(count) < 0.95,
+    })
+
+def _timestamps(rng, count, as_of):
+    start = np.datetime64(as_of - timedelta(days=HISTORY_DAYS), 's')
+    return start + rng.integers(0, HISTORY_DAYS * 86400, count).astype('timedelta64[s]')
+
+def sr_chunks(count, staff_count, rng, as_of=AS_OF):
+    for first in range(0, count, CHUNK_ROWS):
+        size = min(CHUNK_ROWS, count - first)
+        opened = _timestamps(rng, size, as_of)
+        closed = opened + rng.integers(600, 10 * 86400, size).astype('timedelta64[s]')
+        still_open = (rng.random(size) < 0.15) | (closed >= np.datetime64(as_of, 's'))
+        yield pd.DataFrame({
+            'sr_id': np.arange(first + 1, first + size + 1),
+            'siebel_id': rng.integers(1, staff_count + 1, size) + 100000,
+            'severity': rng.choice(np.arange(1, 9), size, p=SEVERITY_WEIGHTS),
+            'status': np.where(still_open, 'Open', rng.choice(SR_STATUSES, size)),
+            'open_date': opened.astype(str),
+            'closed_date': np.where(still_open, None, closed.astype(str)),
+        })
+
+def activity_chunks(count, staff_count, rng, as_of=AS_OF):
+    for first in range(0, count, CHUNK_ROWS):
+        size = min(CHUNK_ROWS, count - first)
+        yield pd.DataFrame({
+            'id': np.arange(first + 1, first + size + 1),
+            'staff_id': rng.integers(1, staff_count + 1, size),
+            'record_type': rng.choice(RECORD_TYPES, size),
+            'created_at': _timestamps(rng, size, as_of).astype(str),
+        })
+
+def new_hire_frames(count, employee_count, rng):
+    employees = pd.DataFrame({
+        'id': np.arange(1, employee_count + 1),
+        'first_name': [f"Emp{n % 3001}" for n in rng.integers(0, 10 ** 6, employee_count)],
+        'last_name': [f"Name{n % 20011}" for n in rng.integers(0, 10 ** 6, employee_count)],
+        'updated_at': '2026-10-01 00:00:00',
+    })
+    old_emp_ids = rng.integers(1, employee_count + 1, count).astype(float)
+    old_emp_ids[rng.random(count) < 0.3] = np.nan
+    new_hires = pd.DataFrame({
+        'id': np.arange(1, count + 1),
+        'req_num': [f"REQ-{n:07d}" for n in rng.permutation(count)],
+        'req_status': rng.choice(REQ_STATUSES, count),
+        'hire_status': rng.choice(HIRE_STATUSES, count),
+        'zone': rng.choice(ZONES, count),
+        'manager_id': rng.integers(1, min(employee_count, 5000) + 1, count),
+        'old_emp_id': pd.array(old_emp_ids, dtype='Int64'),
+        'updated_at': '2026-10-01 00:00:00',
+    })
+    return employees, new_hires
+
+# {environment: {table: {column: attributes}}} in get_schema()'s shape: dev drifts from qa as in
+# benchmarks.schema_diff, prod and staging drift from qa with their own seeds
+def make_catalogs(tables, columns=60):
+    dev, qa = make_schemas(tables, columns, seed=42)
+    _, prod = make_schemas(tables, columns, seed=43)
+    _, staging = make_schemas(tables, columns, seed=44)
+    return {'dev': dev, 'qa': qa, 'prod': prod, 'staging': staging}
+
+# One row per (table, column) with each environment's data type, the layout excel_format_columns.py highlights
+def catalog_frame(catalogs):
+    keys = sorted({(table, column) for schema in catalogs.values()
+                   for table, schema_columns in schema.items() for column in schema_columns})
+    frame = pd.DataFrame(keys, columns=['table', 'column'])
+    for env, schema in catalogs.items():
+        frame[f"{env}_datatype"] = [schema.get(table, {}).get(column, {}).get('data_type')
+                                    for table, column in keys]
+    return frame
+
+def _write(engine, name, chunks):
+    rows = 0
+    for index, chunk in enumerate(chunks):
+        chunk.to_sql(name, engine, index=False, if_exists='replace' if index == 0 else 'append', chunksize=50000)
+        rows += len(chunk)
+    return rows
+
+# Write every table into engine, replacing earlier runs' tables. Returns {table: rows}
+def generate(engine, sr_rows, as_of=AS_OF, seed=23):
+    rng = np.random.default_rng(seed)
+    sizes = scale(sr_rows)
+    staff_count = sizes['staff_master']
+    employees, new_hires = new_hire_frames(sizes['new_hires'], sizes['employees'], rng)
+    written = {
+        'staff_master': _write(engine, 'staff_master', [staff_frame(staff_count, rng)]),
+        'siebel_srs': _write(engine, 'siebel_srs', sr_chunks(sr_rows, staff_count, rng, as_of)),
+        'project_activities': _write(engine, 'project_activities',
+                                     activity_chunks(sizes['project_activities'], staff_count, rng, as_of)),
+        'employees': _write(engine, 'employees', [employees]),
+        'new_hires': _write(engine, 'new_hires', [new_hires]),
+    }
+    with engine.begin() as conn:
+        for statement in (
+            "CREATE UNIQUE INDEX ix_staff_master_emp_id ON staff_master (emp_id)",
+            "CREATE INDEX ix_siebel_srs_closed_date ON siebel_srs (closed_date)",
+            "CREATE INDEX ix_siebel_srs_siebel_id ON siebel_srs (siebel_id)",
+            "CREATE INDEX ix_project_activities_staff ON project_activities (staff_id, created_at)",
+            "CREATE UNIQUE INDEX ix_employees_id ON employees (id)",
+            "CREATE UNIQUE INDEX ix_new_hires_id ON new_hires (id)",
+        ):
+            conn.execute(text(statement))
+    return written
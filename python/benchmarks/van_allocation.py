@@ -0,0 +1,185 @@
+# Benchmark for the searchsorted interval join in van_allocation.py against update_btw_dates.sql's
+# set-based range-join UPDATE, backfilling years of van_mileage on a SQLite stand-in.
+# Run from the python/ directory: python -m benchmarks.van_allocation --rows 50000000
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from van_allocation import NO_EMP, AllocationIntervals, backfill_mileage, load_allocations
+
+START = date(2019, 1, 1)
+
+# update_btw_dates.sql as SQLite runs it; active_only=False is the same join over every allocation
+LEGACY_UPDATE = """
+    UPDATE van_mileage
+    SET emp_id = ad.emp_id
+    FROM (SELECT van_number, emp_id, start_date, end_date FROM van_allocation_history {where}) ad
+    WHERE van_mileage.van_number = ad.van_number
+      AND van_mileage.mileage_date >= ad.start_date
+      AND van_mileage.mileage_date <= ad.end_date
+"""
+# Who should own each sampled row: the covering allocation that started last
+EXPECTED_QUERY = """
+    SELECT vm.id,
+           (SELECT vah.emp_id FROM van_allocation_history vah
+            WHERE vah.van_number = vm.van_number AND vah.start_date <= vm.mileage_date
+              AND (vah.end_date IS NULL OR vah.end_date >= vm.mileage_date)
+            ORDER BY vah.start_date DESC, vah.is_active DESC LIMIT 1) AS expected,
+           vm.emp_id
+    FROM van_mileage vm
+    WHERE vm.id % :step = 0
+"""
+
+# Back-to-back allocations per van, min_days-max_days long, the last one open-ended and active.
+# A few reassignments were recorded without closing the previous allocation, and a few vans sat unassigned.
+def make_allocations(vans, days, min_days, max_days, seed=18):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for van in range(vans):
+        start = int(rng.integers(0, 120))
+        emp_offset = int(rng.integers(0, 5000))
+        while start < days:
+            length = int(rng.integers(min_days, max_days + 1))
+            end = start + length - 1
+            last = end >= days - 1
+            roll = rng.random()
+            recorded_end = end + int(rng.integers(1, 30)) if roll < 0.03 else end
+            rows.append((f"VAN{van:06d}", 10000 + (emp_offset + len(rows)) % 50000,
+                         (START + timedelta(days=start)).isoformat(),
+                         None if last else (START + timedelta(days=recorded_end)).isoformat(),
+                         int(last)))
+            start = end + 1 + (int(rng.integers(1, 20)) if roll > 0.97 else 0)
+    return pd.DataFrame(rows, columns=['van_number', 'emp_id', 'start_date', 'end_date', 'is_active'])
+
+def make_database(path, vans, days, min_days, max_days):
+    engine = create_engine(f"sqlite:///{path}")
+    allocations = make_allocations(vans, days, min_days, max_days)
+    allocations.to_sql('van_allocation_history', engine, index=False)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX vah_van_start ON van_allocation_history (van_number, start_date)"))
+        conn.execute(text("""
+            CREATE TABLE van_mileage (id INTEGER PRIMARY KEY, van_number TEXT, mileage_date TEXT,
+                                      miles INTEGER, emp_id INTEGER)
+        """))
+        conn.execute(text("CREATE TABLE vans (van_number TEXT)"))
+        conn.execute(text("INSERT INTO vans VALUES (:van)"), [{'van': f"VAN{van:06d}"} for van in range(vans)])
+        conn.execute(text("CREATE TABLE days (mileage_date TEXT)"))
+        conn.execute(text("INSERT INTO days VALUES (:day)"),
+                     [{'day': (START + timedelta(days=day)).isoformat()} for day in range(days)])
+        # Loaded day by day, every van's odometer reading for the day
+        conn.execute(text("""
+            INSERT INTO van_mileage (van_number, mileage_date, miles)
+            SELECT v.van_number, d.mileage_date, abs(random()) % 300 FROM days d CROSS JOIN vans v
+        """))
+        conn.execute(text("DROP TABLE vans"))
+        conn.execute(text("DROP TABLE days"))
+    return engine
+
+def legacy_update(engine, active_only):
+    with engine.begin() as conn:
+        return conn.execute(text(LEGACY_UPDATE.format(where="WHERE is_active = 1" if active_only else ""))).rowcount
+
+def reset(engine):
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE van_mileage SET emp_id = NULL"))
+
+# A sample of rows must be owned by the covering allocation that started last
+def check(engine, rows, samples):
+    with engine.connect() as conn:
+        sample = pd.read_sql(text(EXPECTED_QUERY), conn, params={'step': max(rows // samples, 1)}).fillna(-1)
+    mismatches = sample[sample['expected'] != sample['emp_id']]
+    assert mismatches.empty, mismatches.head()
+
+# A long allocation with two shorter ones inside it: both inner ones are reported as overlaps, and the long one
+# owns the van again between and after them
+def check_nested():
+    day = lambda offset: START + timedelta(days=offset)
+    allocations = pd.DataFrame({
+        'van_number': ['V1', 'V1', 'V1'],
+        'emp_id': [1, 2, 3],
+        'start_date': [day(1), day(5), day(10)],
+        'end_date': [day(100), day(6), day(20)],
+        'is_active': [False, False, False],
+    })
+    intervals = AllocationIntervals(allocations)
+    assert intervals.overlaps[['emp_id', 'next_emp_id']].values.tolist() == [[1, 2], [1, 3]]
+    days = [0, 1, 5, 6, 7, 10, 20, 21, 100, 101]
+    owners = intervals.assign(np.array(['V1'] * len(days), dtype=object),
+                              np.array([np.datetime64(day(offset), 'D').astype(np.int64) for offset in days]))
+    assert owners.tolist() == [NO_EMP, 1, 2, 2, 1, 3, 3, 1, 1, NO_EMP], owners
+    print("nested allocations ok")
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed:9.2f}s")
+    return elapsed, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Van mileage allocation backfill benchmark")
+    parser.add_argument('--rows', type=int, default=50000000)
+    parser.add_argument('--days', type=int, default=7 * 365, help="days of mileage history")
+    parser.add_argument('--allocation-days', type=int, nargs=2, default=[7, 120], metavar=('MIN', 'MAX'),
+                        help="allocation lengths; pool vans change hands every few weeks")
+    parser.add_argument('--samples', type=int, default=20000, help="rows checked against a per-row lookup")
+    args = parser.parse_args()
+    vans = max(args.rows // args.days, 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        engine = make_database(os.path.join(tmp, 'vans.db'), vans, args.days, *args.allocation_days)
+        rows = vans * args.days
+        print(f"{rows} mileage rows for {vans} vans over {args.days} days, written in {time.perf_counter() - start:.0f}s")
+
+        check_nested()
+        with engine.connect() as conn:
+            allocations = load_allocations(conn)
+        intervals = AllocationIntervals(allocations)
+        print(f"{len(allocations)} allocations, {len(intervals.overlaps)} overlapping")
+
+        # The join itself, no database: a year of every van's days through one searchsorted
+        year = min(args.days, 365)
+        van_numbers = np.tile(intervals.vans.to_numpy(), year)
+        days = np.repeat(np.arange(year) + np.datetime64(START, 'D').astype(np.int64), len(intervals.vans))
+        elapsed, _ = timed(f"searchsorted join ({len(days)} rows)", intervals.assign, van_numbers, days)
+        print(f"{'':<36} {len(days) / elapsed / 1e6:9.1f}M rows/s")
+        del van_numbers, days
+
+        active_elapsed, assigned = timed("set-based UPDATE, active only", legacy_update, engine, True)
+        print(f"{'':<36} {assigned} rows assigned (open-ended allocations never match)")
+        reset(engine)
+        all_elapsed, assigned = timed("set-based UPDATE, all allocations", legacy_update, engine, False)
+        print(f"{'':<36} {assigned} rows assigned")
+        reset(engine)
+
+        engine_elapsed, stats = timed("interval engine backfill", backfill_mileage, engine)
+        print(f"{'':<36} {stats}")
+        print(f"{'':<36} {all_elapsed / engine_elapsed:9.1f}x the set-based UPDATE's speed")
+        check(engine, rows, args.samples)
+
+        # Allocation history corrected after the fact: a later backfill only has to write what moved
+        with engine.begin() as conn:
+            corrected = conn.execute(text("UPDATE van_allocation_history SET emp_id = emp_id + 1 "
+                                          "WHERE rowid % 50 = 0 AND is_active = 0")).rowcount
+        rerun_elapsed, stats = timed(f"engine re-backfill ({corrected} corrected)", backfill_mileage, engine)
+        print(f"{'':<36} {stats}")
+        check(engine, rows, args.samples)
+        redo_elapsed, assigned = timed("set-based UPDATE re-run", legacy_update, engine, False)
+        print(f"{'':<36} {assigned} rows rewritten, {redo_elapsed / rerun_elapsed:.1f}x slower than the engine")
+
+        # An allocation recorded without an emp_id is reported, not a crash; its mileage keeps its emp_id
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE van_allocation_history SET emp_id = NULL WHERE rowid = 1"))
+        _, stats = timed("engine backfill, one NULL emp_id", backfill_mileage, engine)
+        assert stats['null_emp_allocations'] == 1, stats
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# One entry point for the scripts: python cli.py <command> [options]
+# Only the chosen command's module is imported, so a secret fetch or token lookup does not pay for pandas,
+# openpyxl and sqlalchemy at startup. Keep this module's own imports to the standard library.
+import argparse
+import importlib
+import sys
+
+# command: (module, function, takes options, help). Commands without options are configured in their module.
+COMMANDS = {
+    'schema-diff': ('compare_db_schema', 'main', True, "compare schemas (and data_diff_tables) between databases"),
+    'sr-report': ('gen_sr_summary_report', 'main', True, "write the SR summary workbooks per manager"),
+    'highlight': ('excel_format_columns', 'main', True, "highlight data types that differ between environments"),
+    'profile-columns': ('column_profiler', 'main', True, "check a file's value lengths against varchar limits"),
+    'secret': ('akey_rot_key', 'main', True, "fetch an Akeyless rotated secret"),
+    'akeyless-token': ('akeyless', 'main', False, "print the base64 IMDS token for Akeyless"),
+}
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(prog='cli.py', usage="%(prog)s [-h] command [options ...]",
+                                     description="Reporting, schema diff and secret scripts; options after the "
+                                                 "command are passed on to it (cli.py <command> --help)")
+    parser.add_argument('command', choices=list(COMMANDS), metavar='command',
+                        help='; '.join(f"{name}: {details[3]}" for name, details in COMMANDS.items()))
+    args = parser.parse_args(argv[:1])
+    options = argv[1:]
+
+    module_name, function_name, takes_options, _ = COMMANDS[args.command]
+    if options and not takes_options:
+        parser.error(f"{args.command} takes no options; it is configured in {module_name}.py")
+
+    # The command's own argparse reads sys.argv, so it sees only its options
+    sys.argv = [f"cli.py {args.command}"] + options
+    command = getattr(importlib.import_module(module_name), function_name)
+    return command()
+
+if __name__ == "__main__":
+    main()
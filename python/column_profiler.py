@@ -0,0 +1,165 @@
+import argparse
+import os
+from collections import Counter
+
+import pandas as pd
+
+DEFAULT_CHUNKSIZE = 100000
+PERCENTILES = (50, 95, 99)
+
+# Yield DataFrame chunks of string values from a CSV, Excel or Parquet file without loading it whole
+def iter_chunks(path, chunksize=DEFAULT_CHUNKSIZE, sheet_name=None):
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension in ('.csv', '.txt', '.gz'):
+        # dtype=str keeps the text exactly as it will be loaded (leading zeros, no float formatting)
+        yield from pd.read_csv(path, dtype=str, chunksize=chunksize)
+
+    elif extension in ('.xlsx', '.xlsm'):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet_name] if sheet_name else workbook.active
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            # Blank header cells get pandas' read_excel names rather than 'None'
+            header = [f"Unnamed: {index}" if value is None else str(value) for index, value in enumerate(header)]
+            batch = []
+            for row in rows:
+                batch.append([None if value is None else str(value) for value in row])
+                if len(batch) == chunksize:
+                    yield pd.DataFrame(batch, columns=header)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=header)
+        finally:
+            workbook.close()
+
+    elif extension == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Profiling Parquet files needs the 'pyarrow' package")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+
+    else:
+        raise ValueError(f"Unsupported file type: {path}")
+
+# {column_name: character_maximum_length} for one table of a get_schema() result
+def limits_from_schema(schema, table_name):
+    return {column_name: column['max_length']
+            for column_name, column in schema.get(table_name, {}).items()
+            if column['max_length']}
+
+# Running per-column length statistics
+class ColumnStats:
+    def __init__(self, limit=None, sample_size=5):
+        self.limit = limit
+        self.sample_size = sample_size
+        self.lengths = Counter()
+        self.max_length = 0
+        self.over_limit = 0
+        self.samples = []
+
+    def update(self, values, row_offset):
+        values = values.dropna()
+        if values.empty:
+            return
+        if values.dtype != object and not pd.api.types.is_string_dtype(values):
+            values = values.astype(str)
+        lengths = values.str.len()
+
+        self.lengths.update(lengths.value_counts().to_dict())
+        self.max_length = max(self.max_length, int(lengths.max()))
+
+        if self.limit:
+            over = lengths > self.limit
+            over_count = int(over.sum())
+            if over_count:
+                self.over_limit += over_count
+                room = self.sample_size - len(self.samples)
+                if room > 0:
+                    for position, value in values[over].head(room).items():
+                        # +2: 1-based row numbers with a header row, as seen in the file
+                        self.samples.append((row_offset + position + 2, len(value), value[:80]))
+
+    def percentile(self, q):
+        total = sum(self.lengths.values())
+        if not total:
+            return 0
+        threshold = total * q / 100
+        running = 0
+        for length in sorted(self.lengths):
+            running += self.lengths[length]
+            if running >= threshold:
+                return length
+        return self.max_length
+
+# Profile every column's value lengths in one streaming pass.
+# limits maps column name -> allowed length (e.g. limits_from_schema(get_schema(...), table)); names match case-insensitively.
+def profile_file(path, limits=None, default_limit=None, chunksize=DEFAULT_CHUNKSIZE, sample_size=5, sheet_name=None):
+    limits = {name.lower(): limit for name, limit in (limits or {}).items()}
+    stats = {}
+    row_offset = 0
+
+    for chunk in iter_chunks(path, chunksize=chunksize, sheet_name=sheet_name):
+        chunk = chunk.reset_index(drop=True)
+        for column_name in chunk.columns:
+            column_stats = stats.get(column_name)
+            if column_stats is None:
+                limit = limits.get(str(column_name).lower(), default_limit)
+                column_stats = stats[column_name] = ColumnStats(limit, sample_size)
+            column_stats.update(chunk[column_name], row_offset)
+        row_offset += len(chunk)
+
+    report = []
+    for column_name, column_stats in stats.items():
+        row = {
+            'column': column_name,
+            'limit': column_stats.limit,
+            'max_length': column_stats.max_length,
+        }
+        for q in PERCENTILES:
+            row[f"p{q}"] = column_stats.percentile(q)
+        row['over_limit_rows'] = column_stats.over_limit
+        row['samples'] = column_stats.samples
+        report.append(row)
+
+    report_df = pd.DataFrame(report, columns=['column', 'limit', 'max_length'] + [f"p{q}" for q in PERCENTILES]
+                             + ['over_limit_rows', 'samples'])
+    print(f"Profiled {row_offset} rows, {len(report_df)} columns")
+    return report_df
+
+def main():
+    parser = argparse.ArgumentParser(description="Check a file's value lengths against target varchar limits")
+    parser.add_argument('path')
+    parser.add_argument('--db-uri', help="read limits from this database's information_schema.columns")
+    parser.add_argument('--schema', default='public')
+    parser.add_argument('--table')
+    parser.add_argument('--max-length', type=int, help="limit for columns without a known varchar length")
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--sheet')
+    args = parser.parse_args()
+
+    limits = {}
+    if args.db_uri and args.table:
+        from compare_db_schema import get_schema
+        from db_engines import get_engine
+
+        schema = get_schema(get_engine(args.db_uri, 'catalog'), schema_name=args.schema, tables=[args.table])
+        limits = limits_from_schema(schema, args.table)
+
+    report_df = profile_file(args.path, limits=limits, default_limit=args.max_length,
+                             chunksize=args.chunksize, sheet_name=args.sheet)
+    with pd.option_context('display.max_colwidth', 120, 'display.width', 200):
+        print(report_df.to_string(index=False))
+
+    if (report_df['over_limit_rows'] > 0).any():
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import bindparam, inspect, text
+
+# Each differing key range is split into this many sub-ranges, hashed in one grouped query per side
+SEGMENTS = 16
+# Ranges with at most this many rows on both sides are compared key by key instead of split further
+LEAF_ROWS = 1000
+# Differing rows fetched in full per round trip
+FETCH_BATCH = 1000
+
+# One side of a comparison: where the table lives and how that database hashes a row
+class _Side:
+    def __init__(self, engine, schema_name, table_name, key, columns):
+        self.engine = engine
+        preparer = engine.dialect.identifier_preparer
+        self.table = preparer.quote(table_name) if schema_name is None else \
+            f"{preparer.quote_schema(schema_name)}.{preparer.quote(table_name)}"
+        self.key = preparer.quote(key)
+        self.columns = [preparer.quote(name) for name in columns]
+        self.queries = 0
+        self.rows = 0
+
+    # md5 of the row text, plus two 32-bit integers cut from it so range hashes can be summed exactly.
+    # The key is part of the hashed row: range hashes are sums, so without it two rows swapping their
+    # values (or a row renumbered within the range) would leave the sum unchanged.
+    # Elsewhere (the SQLite stand-in) md5() and hex_int() functions have to be registered on the connection.
+    def _digest(self):
+        hashed = [self.key] + self.columns
+        if self.engine.dialect.name == 'postgresql':
+            row = f"md5(CAST(ROW({', '.join(hashed)}) AS text))"
+            parts = [f"('x' || substr(digest, {start}, 8))::bit(32)::bigint" for start in (1, 9)]
+        else:
+            row = f"md5({' || char(31) || '.join(f'quote({name})' for name in hashed)})"
+            parts = [f"hex_int(substr(digest, {start}, 8))" for start in (1, 9)]
+        return row, parts
+
+    def _query(self, sql, params):
+        with self.engine.connect() as connection:
+            rows = connection.execute(sql, params).fetchall()
+        self.queries += 1
+        self.rows += len(rows)
+        return rows
+
+    def key_range(self):
+        return self._query(text(f"SELECT MIN({self.key}), MAX({self.key}) FROM {self.table}"), {})[0]
+
+    # Bucket of key k in [lo, hi]. On PostgreSQL it is computed in NUMERIC: (k - lo) * segments overflows BIGINT
+    # for sparse or snowflake-style ids, and so does the width of a range running from negative to positive keys.
+    # SQLite (the stand-in) has no NUMERIC and keeps 64-bit integers, so it is limited to smaller key spans.
+    def _bucket(self):
+        if self.engine.dialect.name == 'postgresql':
+            return "floor((CAST(k AS NUMERIC) - CAST(:lo AS NUMERIC)) * :segments / CAST(:width AS NUMERIC))"
+        return "(k - :lo) * :segments / :width"
+
+    # {bucket: (count, hash_a, hash_b)} for the segments sub-ranges of [lo, hi], one scan of the range
+    def bucket_hashes(self, lo, hi, segments):
+        row, parts = self._digest()
+        sql = text(f"""
+            SELECT {self._bucket()} AS bucket, COUNT(*), SUM({parts[0]}), SUM({parts[1]})
+            FROM (SELECT CAST({self.key} AS BIGINT) AS k, {row} AS digest FROM {self.table}
+                  WHERE {self.key} BETWEEN :lo AND :hi) r
+            GROUP BY 1
+        """)
+        return {int(bucket): (count, int(a), int(b)) for bucket, count, a, b in
+                self._query(sql, {'lo': lo, 'hi': hi, 'segments': segments, 'width': hi - lo + 1})}
+
+    def key_digests(self, lo, hi):
+        row, _ = self._digest()
+        sql = text(f"SELECT {self.key}, {row} FROM {self.table} WHERE {self.key} BETWEEN :lo AND :hi")
+        return dict(self._query(sql, {'lo': lo, 'hi': hi}))
+
+    def fetch(self, keys):
+        sql = text(f"SELECT {self.key}, {', '.join(self.columns)} FROM {self.table} WHERE {self.key} IN :keys") \
+            .bindparams(bindparam('keys', expanding=True))
+        return {row[0]: row[1:] for row in self._query(sql, {'keys': keys})}
+
+# Inclusive key range of bucket b when [lo, hi] is split into segments buckets as bucket_hashes() does
+def _bucket_range(lo, hi, segments, bucket):
+    width = hi - lo + 1
+    return lo + (bucket * width + segments - 1) // segments, lo + ((bucket + 1) * width + segments - 1) // segments - 1
+
+# The integer primary key of table_name, or None when it has none (or a composite one)
+def integer_key(engine, table_name, schema_name=None):
+    key = inspect(engine).get_pk_constraint(table_name, schema=schema_name)['constrained_columns']
+    return key[0] if len(key) == 1 else None
+
+# Row-level diff of one table between two databases without exporting it: both sides hash the same key ranges
+# in the database, and only ranges whose hashes differ are split further, down to ranges small enough to
+# compare key by key; only the rows that differ are fetched. The key must be an integer column.
+# Returns one change per differing (key, column), plus query/row counts per side, which grow with the
+# number of differences rather than the table size.
+def diff_table_rows(source_engine, target_engine, table_name, key, columns, source_schema_name=None,
+                    target_schema_name=None, segments=SEGMENTS, leaf_rows=LEAF_ROWS):
+    columns = [name for name in columns if name != key]
+    sides = (_Side(source_engine, source_schema_name, table_name, key, columns),
+             _Side(target_engine, target_schema_name, table_name, key, columns))
+    stats = {'ranges': 0, 'leaf_ranges': 0}
+    differing = []
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        bounds = [bound for bound in executor.map(lambda side: side.key_range(), sides)]
+        keys = [value for bound in bounds for value in bound if value is not None]
+        pending = [(min(keys), max(keys))] if keys else []
+
+        while pending:
+            lo, hi = pending.pop()
+            stats['ranges'] += 1
+            source, target = executor.map(lambda side: side.bucket_hashes(lo, hi, segments), sides)
+            for bucket in source.keys() | target.keys():
+                source_hash, target_hash = source.get(bucket), target.get(bucket)
+                if source_hash == target_hash:
+                    continue
+                bucket_lo, bucket_hi = _bucket_range(lo, hi, segments, bucket)
+                counts = [bucket_hash[0] if bucket_hash else 0 for bucket_hash in (source_hash, target_hash)]
+                if max(counts) > leaf_rows and bucket_hi > bucket_lo:
+                    pending.append((bucket_lo, bucket_hi))
+                    continue
+                stats['leaf_ranges'] += 1
+                source_digests, target_digests = executor.map(lambda side: side.key_digests(bucket_lo, bucket_hi),
+                                                              sides)
+                differing += [k for k in source_digests.keys() | target_digests.keys()
+                              if source_digests.get(k) != target_digests.get(k)]
+
+        changes = []
+        differing.sort()
+        for start in range(0, len(differing), FETCH_BATCH):
+            batch = differing[start:start + FETCH_BATCH]
+            source_rows, target_rows = executor.map(lambda side: side.fetch(batch), sides)
+            for k in batch:
+                changes += _row_changes(table_name, k, columns, source_rows.get(k), target_rows.get(k))
+
+    for name, side in zip(('source', 'target'), sides):
+        stats[f"{name}_queries"] = side.queries
+        stats[f"{name}_rows"] = side.rows
+    stats['differing_rows'] = len(differing)
+    return changes, stats
+
+# "added" rows are only in the source and "removed" rows only in the target, as compare_tables() names tables
+def _row_changes(table_name, key, columns, source_row, target_row):
+    if target_row is None:
+        return [{'table': table_name, 'key': key, 'change': 'added', 'column': '',
+                 'source_value': str(dict(zip(columns, source_row))), 'target_value': ''}]
+    if source_row is None:
+        return [{'table': table_name, 'key': key, 'change': 'removed', 'column': '',
+                 'source_value': '', 'target_value': str(dict(zip(columns, target_row)))}]
+    # Values as text, like the added/removed rows: timezone-aware timestamps (timestamptz) can't be written to Excel
+    return [{'table': table_name, 'key': key, 'change': 'modified', 'column': name,
+             'source_value': _text(source_value), 'target_value': _text(target_value)}
+            for name, source_value, target_value in zip(columns, source_row, target_row) if source_value != target_value]
+
+def _text(value):
+    return None if value is None else str(value)
@@ -0,0 +1,224 @@
+import itertools
+import os
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# Named databases, e.g.
+# DB_CONFIGS = {
+#     'reporting': {'url': 'postgresql+psycopg2://...', 'replicas': ['postgresql+psycopg2://...'], 'pool_size': 10},
+#     'job_log': {'host': ..., 'database': ..., 'user': ..., 'password': ..., 'port': 5432},
+# }
+# DB_<NAME>_URL and DB_<NAME>_REPLICAS (comma separated) configure a name from the environment instead.
+DB_CONFIGS = {}
+
+# Pool settings for every engine; each can be overridden per config and from the environment (DB_POOL_SIZE, ...).
+# Callers past pool_size + max_overflow wait up to pool_timeout for a connection instead of opening another,
+# so parallel scripts cannot storm the server with connections.
+POOL_DEFAULTS = {
+    'pool_size': 5,
+    'max_overflow': 5,
+    'pool_timeout': 30,
+    # Reconnect connections older than this many seconds, before a firewall or the server drops them
+    'pool_recycle': 1800,
+    'pool_pre_ping': True,
+    # Milliseconds a statement may run before PostgreSQL cancels it; 0 disables the limit
+    'statement_timeout': 0,
+}
+POOL_ENVIRONMENT = {
+    'pool_size': ('DB_POOL_SIZE', int),
+    'max_overflow': ('DB_MAX_OVERFLOW', int),
+    'pool_timeout': ('DB_POOL_TIMEOUT', float),
+    'pool_recycle': ('DB_POOL_RECYCLE', int),
+    'pool_pre_ping': ('DB_POOL_PRE_PING', lambda value: value.lower() not in ('0', 'false', 'no')),
+    'statement_timeout': ('DB_STATEMENT_TIMEOUT_MS', int),
+}
+
+# Query names that only read and may be served by a replica when the database has one.
+# Catalog reads and report loads lag harmlessly; anything that writes, or compares data between environments
+# (data diffs), stays on the primary.
+READONLY_QUERIES = {'catalog', 'severity_summary', 'severity_pivot', 'employee_search'}
+
+# Checkout counts and wait times of one engine's pool; wait is the time a caller spends in pool.connect(),
+# including connecting and pre-pinging when no idle connection is ready
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, wait, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def snapshot(self, pool):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_total_s': round(self.wait_total, 6),
+                'wait_avg_s': round(self.wait_total / self.checkouts, 6) if self.checkouts else 0.0,
+                'wait_max_s': round(self.wait_max, 6),
+                'pool_size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'overflow': max(pool.overflow(), 0),
+            }
+
+# QueuePool that times every checkout into its PoolMetrics
+class _TimedQueuePool(QueuePool):
+    metrics = None
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record(time.perf_counter() - start)
+        return connection
+
+    # engine.dispose() replaces the pool; keep counting into the same metrics
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+# A primary engine plus its replicas, taken in turn for read-only queries
+class _Database:
+    def __init__(self, primary, replicas):
+        self.primary = primary
+        self.replicas = replicas
+        self._next_replica = itertools.cycle(replicas) if replicas else None
+        self._lock = threading.Lock()
+
+    def engine(self, query):
+        if query not in READONLY_QUERIES or not self.replicas:
+            return self.primary
+        with self._lock:
+            return next(self._next_replica)
+
+    def engines(self):
+        return [self.primary] + self.replicas
+
+_databases = {}
+_metrics = {}
+_registry_lock = threading.Lock()
+_registry_pid = os.getpid()
+
+# URL of a url string, URL or compare_db_schema-style {'host', 'database', 'user', 'password', 'port'} dict
+def _to_url(config):
+    if isinstance(config, dict):
+        if config.get('url'):
+            return make_url(config['url'])
+        return URL.create('postgresql', username=config['user'], password=config['password'], host=config['host'],
+                          port=config.get('port', 5432), database=config['database'])
+    return make_url(config)
+
+# (primary url, replica urls, settings) of a name, url or config dict
+def _resolve(config):
+    settings = dict(POOL_DEFAULTS)
+    for option, (variable, parse) in POOL_ENVIRONMENT.items():
+        if os.environ.get(variable):
+            settings[option] = parse(os.environ[variable])
+
+    if isinstance(config, str) and '://' not in config:
+        prefix = f"DB_{config.upper()}"
+        if os.environ.get(f"{prefix}_URL"):
+            replicas = [url for url in os.environ.get(f"{prefix}_REPLICAS", '').split(',') if url]
+            return make_url(os.environ[f"{prefix}_URL"]), [make_url(url) for url in replicas], settings
+        if config not in DB_CONFIGS:
+            raise KeyError(f"No database configured as {config!r}: add it to DB_CONFIGS or set {prefix}_URL")
+        config = DB_CONFIGS[config]
+
+    if isinstance(config, dict):
+        settings.update((option, config[option]) for option in POOL_DEFAULTS if option in config)
+        return _to_url(config), [_to_url(replica) for replica in config.get('replicas', [])], settings
+    return _to_url(config), [], settings
+
+def _create(url, settings, read_only=False):
+    key = url.render_as_string(hide_password=True) + (' (replica)' if read_only else '')
+    options = {}
+    # In-memory SQLite keeps one connection per thread and cannot use a QueuePool
+    if not (url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')):
+        options = {option: settings[option] for option in ('pool_size', 'max_overflow', 'pool_timeout',
+                                                           'pool_recycle', 'pool_pre_ping')}
+        options['poolclass'] = _TimedQueuePool
+
+    if url.get_backend_name() == 'postgresql':
+        server_options = []
+        if settings['statement_timeout']:
+            server_options.append(f"-c statement_timeout={int(settings['statement_timeout'])}")
+        if read_only:
+            server_options.append("-c default_transaction_read_only=on")
+        if server_options:
+            options['connect_args'] = {'options': ' '.join(server_options)}
+
+    engine = create_engine(url, **options)
+    if isinstance(engine.pool, _TimedQueuePool):
+        engine.pool.metrics = _metrics.setdefault(key, PoolMetrics())
+    return engine
+
+# Engines are per process: a forked child (e.g. a ProcessPoolExecutor worker) must not reuse the parent's
+# sockets, so it drops the inherited engines without closing them and builds its own
+def _check_process():
+    global _registry_pid
+    if os.getpid() != _registry_pid:
+        for database in _databases.values():
+            for engine in database.engines():
+                engine.dispose(close=False)
+        _databases.clear()
+        _metrics.clear()
+        _registry_pid = os.getpid()
+
+# Shared, pooled engine for config: a name from DB_CONFIGS or the environment, a URL, or a db_config dict.
+# Built once per process and database, so every caller in the process shares one pool. Pass the query's
+# name to let read-only queries (READONLY_QUERIES) go to a replica when the database has one.
+def get_engine(config, query=None):
+    primary_url, replica_urls, settings = _resolve(config)
+    key = (primary_url.render_as_string(hide_password=False),
+           tuple(url.render_as_string(hide_password=False) for url in replica_urls))
+    with _registry_lock:
+        _check_process()
+        database = _databases.get(key)
+        if database is None:
+            database = _Database(_create(primary_url, settings),
+                                 [_create(url, settings, read_only=True) for url in replica_urls])
+            _databases[key] = database
+    return database.engine(query)
+
+# {engine url (password hidden): checkout metrics} for every pooled engine built in this process
+def pool_metrics():
+    with _registry_lock:
+        _check_process()
+        pools = {engine.pool.metrics: engine.pool for database in _databases.values()
+                 for engine in database.engines() if isinstance(engine.pool, _TimedQueuePool)}
+        return {key: metrics.snapshot(pools[metrics]) for key, metrics in _metrics.items() if metrics in pools}
+
+# Print one line per pool, e.g. at the end of a job
+def print_pool_metrics():
+    for key, metrics in pool_metrics().items():
+        print(f"{key}: {metrics['checkouts']} checkouts, wait avg {metrics['wait_avg_s'] * 1000:.1f} ms, "
+              f"max {metrics['wait_max_s'] * 1000:.1f} ms, {metrics['timeouts']} timeouts, "
+              f"{metrics['checked_out']}/{metrics['pool_size']} checked out, {metrics['overflow']} overflow")
+
+# Close every pooled connection, e.g. before exiting a long-running process
+def dispose_all():
+    with _registry_lock:
+        for database in _databases.values():
+            for engine in database.engines():
+                engine.dispose()
+        _databases.clear()
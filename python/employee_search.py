@@ -0,0 +1,351 @@
+import threading
+
+import numpy as np
+from sqlalchemy import text
+
+# Same columns search_all_emp() searches (nh.req_num, e.first_name, e.last_name) and filters on
+NEW_HIRES_QUERY = """
+    SELECT id, req_num, req_status, hire_status, zone, manager_id, old_emp_id{updated}
+    FROM new_hires{where}
+"""
+EMPLOYEES_QUERY = """
+    SELECT id, first_name, last_name{updated}
+    FROM employees{where}
+"""
+# Leading columns of NEW_HIRES_QUERY, in order
+NEW_HIRE_FIELDS = ('id', 'req_num', 'req_status', 'hire_status', 'zone', 'manager_id', 'old_emp_id')
+FILTER_COLUMNS = ('req_status', 'hire_status', 'zone')
+
+# Field boundaries inside a row's search text, so 1-2 character terms still appear inside some trigram
+FIELD_START = b'\x02'
+FIELD_END = b'\x03'
+# A term whose posting lists cover more rows than this is answered by scanning rows in order instead,
+# which for such common terms fills a page of results after a few rows
+SCAN_THRESHOLD = 50000
+# Rows per chunk when building posting lists, to bound the temporary arrays
+BUILD_CHUNK_ROWS = 200000
+# Rebuild the main index once re-indexed rows reach this fraction of it
+COMPACT_RATIO = 0.2
+NO_ID = -1
+
+def _search_bytes(req_num, first_name, last_name):
+    return f"\x02{req_num or ''}\x03\x02{first_name or ''}\x03\x02{last_name or ''}\x03".lower().encode('utf-8')
+
+def _normalize_term(term):
+    return term.lower().encode('utf-8').replace(FIELD_START, b'').replace(FIELD_END, b'')
+
+def _trigram_codes(data):
+    data = np.frombuffer(data, dtype=np.uint8).astype(np.uint32)
+    return (data[:-2] << 16) | (data[1:-1] << 8) | data[2:]
+
+# Sorted union of sorted position arrays (np.unique's hashing is far slower on already-sorted input)
+def _union(arrays):
+    if len(arrays) == 1:
+        return arrays[0]
+    merged = np.sort(np.concatenate(arrays))
+    return merged[np.r_[True, merged[1:] != merged[:-1]]]
+
+# Sorted intersection, probing the larger lists by binary search instead of re-sorting them
+def _intersection(arrays):
+    arrays = sorted(arrays, key=len)
+    result = arrays[0]
+    for other in arrays[1:]:
+        if not len(result):
+            break
+        found = np.searchsorted(other, result)
+        found[found == len(other)] = 0
+        result = result[other[found] == result] if len(other) else other
+    return result
+
+# Trigram -> sorted row positions, stored CSR-style in three flat arrays (codes, starts, positions)
+class _Postings:
+    def __init__(self, codes, starts, positions):
+        self.codes = codes
+        self.starts = starts
+        self.positions = positions
+
+    @classmethod
+    def build(cls, texts, first_position):
+        keys = []
+        for offset in range(0, len(texts), BUILD_CHUNK_ROWS):
+            chunk = texts[offset:offset + BUILD_CHUNK_ROWS]
+            lengths = np.fromiter(map(len, chunk), dtype=np.int64, count=len(chunk))
+            rows = np.repeat(np.arange(first_position + offset, first_position + offset + len(chunk), dtype=np.int64), lengths)
+            if len(rows) < 3:
+                continue
+            codes = _trigram_codes(b''.join(chunk)).astype(np.int64)
+            # Drop trigrams that straddle two rows
+            same_row = rows[:-2] == rows[2:]
+            keys.append((codes[same_row] << 32) | rows[:-2][same_row])
+
+        if not keys:
+            return cls(np.empty(0, np.uint32), np.zeros(1, np.int64), np.empty(0, np.int32))
+        # Sorting (trigram, row) keys groups each trigram's rows in order; then drop repeats within a row
+        keys = np.sort(np.concatenate(keys))
+        keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+        codes = (keys >> 32).astype(np.uint32)
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        return cls(codes[starts], np.r_[starts, len(keys)], (keys & 0xFFFFFFFF).astype(np.int32))
+
+    def get(self, code):
+        i = np.searchsorted(self.codes, code)
+        if i == len(self.codes) or self.codes[i] != code:
+            return self.positions[:0]
+        return self.positions[self.starts[i]:self.starts[i + 1]]
+
+    # Indexes of every trigram that contains a 1-2 byte term
+    def containing(self, term):
+        codes = self.codes
+        b0, b1, b2 = codes >> 16, (codes >> 8) & 0xFF, codes & 0xFF
+        if len(term) == 1:
+            mask = (b0 == term[0]) | (b1 == term[0]) | (b2 == term[0])
+        else:
+            mask = ((b0 == term[0]) & (b1 == term[1])) | ((b1 == term[0]) & (b2 == term[1]))
+        return np.flatnonzero(mask)
+
+# In-memory replacement for search_all_emp(): a trigram inverted index over new_hires joined to employees.
+# Searches never touch the database; refresh() picks up rows whose updated_column moved since the last load.
+# Rows deleted from new_hires are not visible to refresh(); pass their ids to remove() or load() again.
+class EmployeeSearchIndex:
+    def __init__(self, updated_column='updated_at', compact_ratio=COMPACT_RATIO):
+        self.updated_column = updated_column
+        self.compact_ratio = compact_ratio
+        self._lock = threading.Lock()
+        self._new_hires_watermark = None
+        self._employees_watermark = None
+        self._reset()
+
+    def _reset(self):
+        self._employees = {}
+        self._ids = np.empty(0, np.int64)
+        self._manager_ids = np.empty(0, np.int64)
+        self._old_emp_ids = np.empty(0, np.int64)
+        self._req_nums = np.empty(0, object)
+        self._alive = np.empty(0, bool)
+        # value -> code and code -> value for each filter column
+        self._filter_values = {column: {} for column in FILTER_COLUMNS}
+        self._filter_labels = {column: [] for column in FILTER_COLUMNS}
+        self._filter_codes = {column: np.empty(0, np.int32) for column in FILTER_COLUMNS}
+        self._base = _Postings.build([], 0)
+        self._base_size = 0
+        self._delta = None
+
+    def __len__(self):
+        return int(self._alive.sum())
+
+    def _fetch(self, connection, query, since):
+        updated = f", {self.updated_column} AS updated_at" if self.updated_column else ""
+        if since is None:
+            return connection.execute(text(query.format(updated=updated, where=""))).fetchall()
+        where = f" WHERE {self.updated_column} > :since"
+        return connection.execute(text(query.format(updated=updated, where=where)), {'since': since}).fetchall()
+
+    def _watermark(self, rows, current):
+        if not self.updated_column or not rows:
+            return current
+        latest = max((row.updated_at for row in rows if row.updated_at is not None), default=None)
+        if latest is None or current is None:
+            return current if latest is None else latest
+        return max(current, latest)
+
+    def _text(self, position):
+        employee = self._employees.get(int(self._old_emp_ids[position]), (None, None))
+        return _search_bytes(self._req_nums[position], employee[0], employee[1])
+
+    def _texts(self, start, stop):
+        get_employee = self._employees.get
+        no_employee = (None, None)
+        return [_search_bytes(req_num, *get_employee(old_emp_id, no_employee))
+                for req_num, old_emp_id in zip(self._req_nums[start:stop].tolist(), self._old_emp_ids[start:stop].tolist())]
+
+    # Load everything from scratch
+    def load(self, engine):
+        with engine.connect() as connection:
+            employees = self._fetch(connection, EMPLOYEES_QUERY, None)
+            new_hires = self._fetch(connection, NEW_HIRES_QUERY, None)
+        with self._lock:
+            self._reset()
+            self._employees = {row.id: (row.first_name, row.last_name) for row in employees}
+            self._append(new_hires)
+            self._new_hires_watermark = self._watermark(new_hires, None)
+            self._employees_watermark = self._watermark(employees, None)
+        return len(new_hires)
+
+    # Apply rows changed since the last load/refresh; returns the number of new-hire rows re-indexed.
+    # updated_column must be set by every insert/update (e.g. a trigger) for changes to be seen.
+    def refresh(self, engine):
+        if not self.updated_column or self._new_hires_watermark is None:
+            return self.load(engine)
+
+        with engine.connect() as connection:
+            employees = self._fetch(connection, EMPLOYEES_QUERY, self._employees_watermark)
+            new_hires = self._fetch(connection, NEW_HIRES_QUERY, self._new_hires_watermark)
+
+        with self._lock:
+            changed_names = []
+            for row in employees:
+                names = (row.first_name, row.last_name)
+                if self._employees.get(row.id) != names:
+                    changed_names.append(row.id)
+                self._employees[row.id] = names
+
+            # A renamed employee changes the search text of every new hire that points at them
+            # (manager names are looked up when results are returned, so they need no re-index)
+            records = list(new_hires)
+            changed_ids = {row.id for row in new_hires}
+            affected = np.flatnonzero(self._alive & np.isin(self._old_emp_ids, changed_names))
+            for position in affected:
+                if int(self._ids[position]) not in changed_ids:
+                    records.append(self._record(position))
+
+            if records:
+                self._append(records)
+            self._new_hires_watermark = self._watermark(new_hires, self._new_hires_watermark)
+            self._employees_watermark = self._watermark(employees, self._employees_watermark)
+        return len(records)
+
+    def remove(self, emp_ids):
+        with self._lock:
+            self._alive &= ~np.isin(self._ids, list(emp_ids))
+
+    # A stored row as a NEW_HIRE_FIELDS tuple
+    def _record(self, position):
+        values = {
+            'id': int(self._ids[position]),
+            'req_num': self._req_nums[position],
+            'manager_id': None if self._manager_ids[position] == NO_ID else int(self._manager_ids[position]),
+            'old_emp_id': None if self._old_emp_ids[position] == NO_ID else int(self._old_emp_ids[position]),
+            **{column: self._filter_labels[column][self._filter_codes[column][position]] for column in FILTER_COLUMNS},
+        }
+        return tuple(values[field] for field in NEW_HIRE_FIELDS)
+
+    def _filter_code_array(self, column, values):
+        codes = self._filter_values[column]
+        labels = self._filter_labels[column]
+        for value in dict.fromkeys(values):
+            if value not in codes:
+                codes[value] = len(labels)
+                labels.append(value)
+        return np.array([codes[value] for value in values], np.int32)
+
+    # Append records (rows starting with NEW_HIRE_FIELDS) as new positions, retiring older positions of the same ids
+    def _append(self, records):
+        columns = dict(zip(NEW_HIRE_FIELDS, zip(*records)))
+        ids = np.array(columns['id'], np.int64)
+        self._alive &= ~np.isin(self._ids, ids)
+
+        def id_array(column):
+            return np.array([NO_ID if value is None else value for value in columns[column]], np.int64)
+
+        first_position = len(self._ids)
+        self._ids = np.concatenate([self._ids, ids])
+        self._manager_ids = np.concatenate([self._manager_ids, id_array('manager_id')])
+        self._old_emp_ids = np.concatenate([self._old_emp_ids, id_array('old_emp_id')])
+        req_nums = np.empty(len(ids), object)
+        req_nums[:] = columns['req_num']
+        self._req_nums = np.concatenate([self._req_nums, req_nums])
+        self._alive = np.concatenate([self._alive, np.ones(len(ids), bool)])
+        for column in FILTER_COLUMNS:
+            self._filter_codes[column] = np.concatenate([self._filter_codes[column],
+                                                         self._filter_code_array(column, columns[column])])
+
+        if first_position == 0:
+            self._base = _Postings.build(self._texts(0, len(self._ids)), 0)
+            self._base_size = len(self._ids)
+            self._delta = None
+        elif len(self._ids) - self._base_size > self.compact_ratio * self._base_size:
+            self._compact()
+        else:
+            # Re-indexed rows go to a small side index, rebuilt on each refresh, until compaction
+            self._delta = _Postings.build(self._texts(self._base_size, len(self._ids)), self._base_size)
+
+    # Renumber live rows and rebuild one index over them, dropping retired positions
+    def _compact(self):
+        live = np.flatnonzero(self._alive)
+        self._ids = self._ids[live]
+        self._manager_ids = self._manager_ids[live]
+        self._old_emp_ids = self._old_emp_ids[live]
+        self._req_nums = self._req_nums[live]
+        self._alive = np.ones(len(live), bool)
+        for column in FILTER_COLUMNS:
+            self._filter_codes[column] = self._filter_codes[column][live]
+        self._base = _Postings.build(self._texts(0, len(live)), 0)
+        self._base_size = len(live)
+        self._delta = None
+
+    def _postings(self, code):
+        positions = self._base.get(code)
+        if self._delta is not None:
+            # Delta positions all come after base positions, so the concatenation stays sorted
+            positions = np.concatenate([positions, self._delta.get(code)])
+        return positions
+
+    # Sorted candidate positions for one term; None means "too common, scan instead"
+    def _term_candidates(self, term):
+        if len(term) >= 3:
+            lists = [self._postings(code) for code in set(_trigram_codes(term).tolist())]
+            if min(map(len, lists)) > SCAN_THRESHOLD:
+                return None
+            return _intersection(lists)
+
+        slices = []
+        for postings in (self._base, self._delta):
+            if postings is None:
+                continue
+            matches = postings.containing(term)
+            slices.extend((postings.starts[i], postings.starts[i + 1], postings) for i in matches)
+        if sum(end - start for start, end, _ in slices) > SCAN_THRESHOLD:
+            return None
+        if not slices:
+            return np.empty(0, np.int32)
+        return _union([postings.positions[start:end] for start, end, postings in slices])
+
+    # Same result columns as search_all_emp(); terms are ORed like the original (match='all' ANDs them).
+    # Filters are exact matches; None means "any". Returns at most limit rows in index order.
+    def search(self, search_text=None, req_status=None, hire_status=None, zone=None, limit=20, match='any'):
+        terms = [term for term in dict.fromkeys(_normalize_term(t) for t in (search_text or '').split()) if term]
+        filters = {'req_status': req_status, 'hire_status': hire_status, 'zone': zone}
+        matches = any if match == 'any' else all
+
+        with self._lock:
+            candidates = None
+            if terms:
+                per_term = [self._term_candidates(term) for term in terms]
+                indexed = [positions for positions in per_term if positions is not None]
+                if match == 'any' and len(indexed) == len(per_term):
+                    candidates = _union(indexed)
+                elif match != 'any' and indexed:
+                    candidates = _intersection(indexed)
+
+            keep = self._alive if candidates is None else self._alive[candidates]
+            for column, value in filters.items():
+                if value is None:
+                    continue
+                code = self._filter_values[column].get(value)
+                if code is None:
+                    return []
+                codes = self._filter_codes[column]
+                keep = keep & ((codes if candidates is None else codes[candidates]) == code)
+            candidates = np.flatnonzero(keep) if candidates is None else candidates[keep]
+
+            results = []
+            for position in candidates:
+                # Trigrams narrow the candidates; the substring check makes the match exact
+                if terms:
+                    row_text = self._text(position)
+                    if not matches(term in row_text for term in terms):
+                        continue
+                # Inner join to the manager, as in search_all_emp()
+                manager = self._employees.get(int(self._manager_ids[position]))
+                if manager is None:
+                    continue
+                employee = self._employees.get(int(self._old_emp_ids[position]), (None, None))
+                results.append({
+                    'emp_id': int(self._ids[position]),
+                    'emp_full_name': f"{employee[0] or ''} {employee[1] or ''}",
+                    'emp_manager_id': int(self._manager_ids[position]),
+                    'manager_name': f"{manager[0] or ''} {manager[1] or ''}",
+                })
+                if len(results) == limit:
+                    break
+            return results
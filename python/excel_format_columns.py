@@ -1,12 +1,7 @@
-import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import PatternFill
-
-# Load your data into a DataFrame
-df = pd.read_excel('your_file.xlsx')  # Replace with your actual file path
+import argparse
 
 # Define the column pairs you want to compare
-column_pairs = [
+COLUMN_PAIRS = [
     ('dev_datatype', 'qa_datatype'),
     ('prod_datatype', 'qa_datatype'),
     ('staging_datatype', 'qa_datatype'),
@@ -14,29 +9,46 @@ column_pairs = [
     ('staging_datatype', 'prod_datatype')
 ]
 
-# Use pandas ExcelWriter with openpyxl engine to write the DataFrame to Excel
-with pd.ExcelWriter('highlighted_file.xlsx', engine='openpyxl') as writer:
-    # Write the DataFrame to the Excel file
-    df.to_excel(writer, sheet_name='Sheet1', index=False)
-
-    # Access the openpyxl workbook and worksheet
-    workbook  = writer.book
-    worksheet = workbook.active
-    
-    # Define the red fill for highlighting differences
-    highlight_fill = PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid')
-
-    # Loop through each pair of columns
-    for col1, col2 in column_pairs:
-        # Get column indices for openpyxl (1-based indexing)
-        col1_idx = df.columns.get_loc(col1) + 1
-        col2_idx = df.columns.get_loc(col2) + 1
-        
-        # Iterate through each row and apply formatting directly
-        for row_idx in range(2, len(df) + 2):  # Start from row 2 to skip header row
-            # Compare the values and apply formatting if they differ
-            if df.at[row_idx - 2, col1] != df.at[row_idx - 2, col2]:
-                worksheet.cell(row=row_idx, column=col1_idx).fill = highlight_fill
-                worksheet.cell(row=row_idx, column=col2_idx).fill = highlight_fill
-
-# The highlighted file is saved as 'highlighted_file.xlsx'
+# 'fill' styles only the differing cells; 'conditional' lets Excel evaluate one rule per pair
+# (better for very large sheets since no per-cell styles are written)
+HIGHLIGHT_MODE = 'fill'
+
+# Write df to output_file with the cells that differ within each column pair highlighted in red.
+# pandas and openpyxl are imported here, not at the top, so `cli.py highlight --help` starts quickly.
+def highlight_frame(df, output_file='highlighted_file.xlsx', column_pairs=COLUMN_PAIRS, mode=HIGHLIGHT_MODE):
+    import pandas as pd
+
+    from excel_highlight import RED_FILL, highlight_differences
+
+    # Use pandas ExcelWriter with openpyxl engine to write the DataFrame to Excel
+    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+        # Write the DataFrame to the Excel file
+        df.to_excel(writer, sheet_name='Sheet1', index=False)
+
+        # Access the openpyxl workbook and worksheet
+        workbook  = writer.book
+        worksheet = workbook.active
+
+        # Highlight differences in red
+        highlight_differences(worksheet, df, column_pairs, fill=RED_FILL, mode=mode)
+    return len(df)
+
+# Load input_file and save the highlighted copy as output_file
+def highlight_file(input_file, output_file='highlighted_file.xlsx', column_pairs=COLUMN_PAIRS, mode=HIGHLIGHT_MODE):
+    import pandas as pd
+
+    df = pd.read_excel(input_file)
+    return highlight_frame(df, output_file, column_pairs, mode)
+
+def main():
+    parser = argparse.ArgumentParser(description="Highlight data types that differ between environments")
+    parser.add_argument('input_file')
+    parser.add_argument('--output', default='highlighted_file.xlsx')
+    parser.add_argument('--mode', choices=['fill', 'conditional'], default=HIGHLIGHT_MODE)
+    args = parser.parse_args()
+
+    rows = highlight_file(args.input_file, args.output, mode=args.mode)
+    print(f"Highlighted {rows} rows into {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.styles import PatternFill
+from openpyxl.utils import get_column_letter
+
+YELLOW_FILL = PatternFill(start_color='FCEA04', end_color='FCEA04', fill_type='solid')
+RED_FILL = PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid')
+
+# Vectorized "values differ" mask for two columns, case-sensitive.
+# Missing values (None/NaN/NaT) and "" are all written as empty cells, so any two of them count as equal;
+# an empty value and a present one differ.
+def difference_mask(df, col1, col2):
+    left = df[col1]
+    right = df[col2]
+    # Categoricals with different categories can't be compared directly
+    if isinstance(left.dtype, pd.CategoricalDtype) or isinstance(right.dtype, pd.CategoricalDtype):
+        left = left.astype(object)
+        right = right.astype(object)
+    # Comparisons against pd.NA come back as NA; treat them as "differ" and let both_blank settle them
+    differ = (left != right).to_numpy(dtype=bool, na_value=True)
+    both_blank = ((left.isna() | (left == '')) & (right.isna() | (right == ''))).to_numpy(dtype=bool, na_value=False)
+    return differ & ~both_blank
+
+# Highlight the cells of each column pair whose values differ.
+# mode='fill' computes each pair's mask in one vectorized pass and styles only the differing cells;
+# mode='conditional' adds one native Excel rule per pair so no per-cell styles are written at all.
+def highlight_differences(worksheet, df, column_pairs, fill=YELLOW_FILL, mode='fill', first_row=2):
+    if df.empty:
+        return
+
+    last_row = first_row + len(df) - 1
+    for col1, col2 in column_pairs:
+        # Get column indices for openpyxl (1-based indexing)
+        col1_idx = df.columns.get_loc(col1) + 1
+        col2_idx = df.columns.get_loc(col2) + 1
+
+        if mode == 'conditional':
+            col1_letter = get_column_letter(col1_idx)
+            col2_letter = get_column_letter(col2_idx)
+            cell_range = f"{col1_letter}{first_row}:{col1_letter}{last_row} {col2_letter}{first_row}:{col2_letter}{last_row}"
+            # Same rule as difference_mask: EXACT is case-sensitive and, unlike <>, doesn't treat an empty
+            # cell as equal to 0 or FALSE; two empty cells are skipped explicitly
+            first = f"${col1_letter}{first_row}"
+            second = f"${col2_letter}{first_row}"
+            formula = f"AND(LEN({first})+LEN({second})>0,NOT(EXACT({first},{second})))"
+            worksheet.conditional_formatting.add(cell_range, FormulaRule(formula=[formula], fill=fill))
+            continue
+
+        for offset in np.flatnonzero(difference_mask(df, col1, col2)):
+            row_idx = first_row + int(offset)
+            worksheet.cell(row=row_idx, column=col1_idx).fill = fill
+            worksheet.cell(row=row_idx, column=col2_idx).fill = fill
@@ -0,0 +1,115 @@
+from sqlalchemy import or_, tuple_
+
+FILTER_OPS = ('eq', 'like', 'ilike', 'in', 'range')
+DEFAULT_PAGE_SIZE = 1000
+LIKE_ESCAPE = '\\'
+
+# Escape LIKE wildcards in user input so "50%" or "a_b" match literally
+def escape_like(value):
+    value = str(value)
+    return (value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+                 .replace('%', LIKE_ESCAPE + '%')
+                 .replace('_', LIKE_ESCAPE + '_'))
+
+# Declarative filters for one query: {filter key: (column, op)} plus the columns free-text search looks in.
+# Every value becomes a bound parameter, so a given set of active filters always compiles to the same SQL
+# and SQLAlchemy's compiled cache / the database's plan cache are reused across calls.
+class FilterSpec:
+    def __init__(self, fields, search_columns=()):
+        for key, (_, op) in fields.items():
+            if op not in FILTER_OPS:
+                raise ValueError(f"Unknown filter op {op!r} for {key!r}; expected one of {FILTER_OPS}")
+        self.fields = fields
+        self.search_columns = list(search_columns)
+
+    def _condition(self, column, op, value):
+        if op == 'eq':
+            return column == value
+        if op == 'like':
+            return column.like(escape_like(value) + '%', escape=LIKE_ESCAPE)
+        if op == 'ilike':
+            return column.ilike(escape_like(value) + '%', escape=LIKE_ESCAPE)
+        if op == 'in':
+            # Expanding IN: one statement for any list length. A single value (a string included, which
+            # list() would split into characters) is a one-item list.
+            if isinstance(value, (str, bytes)) or not hasattr(value, '__iter__'):
+                value = [value]
+            return column.in_(list(value))
+        # range: (low, high), either end may be None for an open bound; both ends inclusive
+        low, high = value
+        if low is not None and high is not None:
+            return column.between(low, high)
+        return column >= low if low is not None else column <= high
+
+    # Any term matching any search column, like the original "term1 OR term2" search
+    def search_condition(self, search_text):
+        terms = list(dict.fromkeys((search_text or '').split()))
+        if not terms or not self.search_columns:
+            return None
+        # Pad to a power of two by repeating the last term (OR-ing a term twice changes nothing but the SQL),
+        # so N-term searches share log2(N) statement shapes at most twice the LIKE work
+        slots = 1 << (len(terms) - 1).bit_length()
+        terms += [terms[-1]] * (slots - len(terms))
+        return or_(*(
+            column.ilike('%' + escape_like(term) + '%', escape=LIKE_ESCAPE)
+            for term in terms
+            for column in self.search_columns
+        ))
+
+    # WHERE clauses for the filters that have a value; None, '' and empty lists are ignored
+    def conditions(self, filters, search_text=None):
+        conditions = []
+        for key, (column, op) in self.fields.items():
+            value = filters.get(key)
+            if value is None or value == '' or (op == 'in' and not value):
+                continue
+            if op == 'range' and value[0] is None and value[1] is None:
+                continue
+            conditions.append(self._condition(column, op, value))
+
+        search = self.search_condition(search_text)
+        if search is not None:
+            conditions.append(search)
+        return conditions
+
+    # Works on select() statements and legacy Query objects alike
+    def apply(self, query, filters, search_text=None):
+        conditions = self.conditions(filters, search_text)
+        return query.filter(*conditions) if conditions else query
+
+# One page ordered by key_columns, starting after the key values `after` (None for the first page).
+# Returns (rows, next_after); next_after is None on the last page.
+# key_columns must be unique together (e.g. end with the primary key) and be selected by stmt.
+def keyset_page(connection, stmt, key_columns, page_size=DEFAULT_PAGE_SIZE, after=None):
+    key_columns = list(key_columns)
+    if after is not None:
+        if len(key_columns) == 1:
+            stmt = stmt.where(key_columns[0] > after[0])
+        else:
+            stmt = stmt.where(tuple_(*key_columns) > tuple_(*after))
+    stmt = stmt.order_by(*key_columns).limit(page_size)
+
+    rows = connection.execute(stmt).all()
+    if len(rows) < page_size:
+        return rows, None
+    last = rows[-1]._mapping
+    return rows, tuple(last[column] for column in key_columns)
+
+# Every row of stmt, one keyset page at a time: no OFFSET rescans, no open cursor between pages
+def iter_keyset(connection, stmt, key_columns, page_size=DEFAULT_PAGE_SIZE):
+    after = None
+    while True:
+        rows, after = keyset_page(connection, stmt, key_columns, page_size, after)
+        yield from rows
+        if after is None:
+            return
+
+# Every row of stmt through a single server-side cursor, fetched batch_size rows at a time
+def stream_rows(connection, stmt, batch_size=DEFAULT_PAGE_SIZE):
+    # Statement-level options so this works with a Connection or an ORM Session
+    result = connection.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    try:
+        yield from result
+    finally:
+        result.close()
+
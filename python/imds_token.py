@@ -0,0 +1,157 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+IMDS_URL = "http://169.254.169.254/metadata/identity/oauth2/token"
+IMDS_API_VERSION = "2018-02-01"
+
+# Refresh this many seconds before expires_on (or halfway through shorter-lived tokens)
+REFRESH_MARGIN = 300
+# Never hand out a token with less than this many seconds (or a quarter of its lifetime) left
+EXPIRY_SKEW = 30
+# Wait between background retries after a failed refresh
+RETRY_INTERVAL = 15
+# Shortest wait before renewing a token that was just fetched
+MIN_REFRESH_DELAY = 1
+
+# One in-flight IMDS request; every concurrent caller for the same resource waits on it
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+# Thread-safe cache of IMDS access tokens keyed by resource.
+# Concurrent refreshes of one resource collapse into a single request, and a background thread
+# renews tokens before they expire so get_token() normally returns straight from memory.
+class ImdsTokenProvider:
+    def __init__(self, imds_url=IMDS_URL, api_version=IMDS_API_VERSION, timeout=10,
+                 refresh_margin=REFRESH_MARGIN, background_refresh=True, pool_size=10):
+        self.imds_url = imds_url
+        self.api_version = api_version
+        self.timeout = timeout
+        self.refresh_margin = refresh_margin
+        self.background_refresh = background_refresh
+
+        # Pooled keep-alive session instead of a new connection per request
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.headers['Metadata'] = 'true'
+
+        self._tokens = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._refresher = None
+        self._closed = False
+
+    def _fetch(self, resource):
+        response = self.session.get(self.imds_url, params={"api-version": self.api_version, "resource": resource},
+                                    timeout=self.timeout)
+        response.raise_for_status()
+        body = response.json()
+        now = time.time()
+        if body.get('expires_on'):
+            expires_on = float(body['expires_on'])
+        else:
+            expires_on = now + float(body.get('expires_in', 3600))
+        lifetime = expires_on - now
+        if lifetime <= 0:
+            # Clock skew or a stale token; caching it would have every caller (and the refresher) refetch at once
+            raise ValueError(f"IMDS returned a token for {resource} that expired {-lifetime:.0f}s ago")
+        # Even a token about to expire isn't renewed more often than every MIN_REFRESH_DELAY seconds
+        refresh_at = max(expires_on - self.refresh_margin, now + lifetime / 2, now + MIN_REFRESH_DELAY)
+        valid_until = expires_on - min(EXPIRY_SKEW, lifetime / 4)
+        return {'access_token': body['access_token'], 'expires_on': expires_on,
+                'refresh_at': refresh_at, 'valid_until': valid_until}
+
+    # Fetch a token for resource, joining the request already in flight if there is one
+    def _refresh(self, resource):
+        with self._lock:
+            flight = self._inflight.get(resource)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[resource] = _Flight()
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._fetch(resource)
+        except Exception as e:
+            flight.error = e
+        with self._lock:
+            if flight.error is None:
+                self._tokens[resource] = flight.result
+            del self._inflight[resource]
+            self._wakeup.notify()
+        flight.event.set()
+
+        if flight.error is not None:
+            raise flight.error
+        if self.background_refresh:
+            self._start_refresher()
+        return flight.result
+
+    # Return {'access_token', 'expires_on', 'refresh_at', 'valid_until'} for resource
+    def get_token_info(self, resource):
+        info = self._tokens.get(resource)
+        if info is not None and time.time() < info['valid_until']:
+            return info
+        return self._refresh(resource)
+
+    def get_token(self, resource):
+        return self.get_token_info(resource)['access_token']
+
+    def _start_refresher(self):
+        with self._lock:
+            if self._refresher is None and not self._closed:
+                self._refresher = threading.Thread(target=self._refresh_loop, name='imds-token-refresh', daemon=True)
+                self._refresher.start()
+
+    # Sleep until the earliest refresh_at, renew that token, repeat
+    def _refresh_loop(self):
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                due = min(((info['refresh_at'], resource) for resource, info in self._tokens.items()), default=None)
+                now = time.time()
+                if due is None or due[0] > now:
+                    self._wakeup.wait(timeout=None if due is None else due[0] - now)
+                    continue
+                resource = due[1]
+
+            try:
+                self._refresh(resource)
+            except Exception:
+                # Keep serving the current token while it is still valid and try again shortly
+                with self._lock:
+                    info = self._tokens.get(resource)
+                    now = time.time()
+                    if info is not None and now >= info['valid_until']:
+                        del self._tokens[resource]
+                    elif info is not None:
+                        info['refresh_at'] = min(now + RETRY_INTERVAL, info['valid_until'])
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify_all()
+        self.session.close()
+
+_default_provider = None
+_default_lock = threading.Lock()
+
+# Process-wide provider shared by every script that needs an IMDS token
+def default_provider():
+    global _default_provider
+    with _default_lock:
+        if _default_provider is None:
+            _default_provider = ImdsTokenProvider()
+        return _default_provider
@@ -0,0 +1,217 @@
+import contextvars
+import queue
+import threading
+import time
+import traceback
+import tracemalloc
+from contextlib import ContextDecorator, contextmanager
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, column, insert, table, text
+from sqlalchemy.exc import SQLAlchemyError
+
+STATUS_RUNNING = 'RUNNING'
+STATUS_SUCCESS = 'SUCCESS'
+STATUS_FAILED = 'FAILED'
+# Stage name of the row that covers the whole run
+TOTAL_STAGE = '(total)'
+# Stage rows are written by a background thread once this many are queued, or this many seconds pass
+FLUSH_BATCH = 100
+FLUSH_INTERVAL = 2.0
+# Longest error text kept in fts_job_log / fts_job_stage_log
+MAX_ERROR_LENGTH = 4000
+
+# One row per finished stage, see sql/fts_job_stage_log.sql
+stage_table = table(
+    'fts_job_stage_log',
+    column('log_id', String),
+    column('stage', String),
+    column('started_at', DateTime),
+    column('ended_at', DateTime),
+    column('duration_ms', Integer),
+    column('row_count', Integer),
+    column('peak_memory_bytes', Integer),
+    column('status', String),
+    column('error_message', String),
+)
+
+_current_run = contextvars.ContextVar('job_run', default=None)
+
+# Handed to the body of a stage so it can report how many rows it handled
+class _Stage:
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+        self.error = None
+        self.peak = 0
+
+    def add_rows(self, count):
+        self.rows = (self.rows or 0) + count
+
+# Writes queued stage rows in batches from a daemon thread, so the job never waits on the metrics insert.
+# A failed write is reported once and dropped; instrumentation must not fail the job it measures.
+class _MetricWriter:
+    def __init__(self, engine, flush_batch=FLUSH_BATCH, flush_interval=FLUSH_INTERVAL):
+        self.engine = engine
+        self.flush_batch = flush_batch
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='job-run-metrics', daemon=True)
+        self._thread.start()
+
+    def put(self, row):
+        self._queue.put(row)
+
+    def _flush(self, rows):
+        if not rows:
+            return
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(insert(stage_table), rows)
+        except Exception as e:
+            if not self.dropped:
+                print(f"Could not write job stage metrics: {e}")
+            self.dropped += len(rows)
+
+    def _run(self):
+        pending = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                row = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                row = ()
+            if row is None:
+                self._flush(pending)
+                return
+            if row:
+                pending.append(row)
+            if len(pending) >= self.flush_batch or time.monotonic() >= deadline:
+                self._flush(pending)
+                pending = []
+                deadline = time.monotonic() + self.flush_interval
+
+    # Write everything still queued and stop the thread
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+# One fts_job_log run: start_job_run() on entry, end_job_run() on exit (FAILED with the traceback if the
+# body raised), and a fts_job_stage_log row per stage with its duration, row count and tracemalloc peak.
+# Works as a context manager or a decorator:
+#     with JobRun(engine, 'sr_summary_report') as run:
+#         with run.stage('load_summary') as stage:
+#             df = load_summary(engine)
+#             stage.rows = len(df)
+# Code below the run can use the module-level stage() without being handed the run.
+# Logging never fails the job: if start_job_run() fails (e.g. no fts_job_master row for job_name) the job
+# runs unlogged, and a failing end_job_run() only prints a warning. tracemalloc slows every allocation,
+# so stage peaks are only traced with trace_memory=True.
+class JobRun(ContextDecorator):
+    def __init__(self, engine, job_name, trace_memory=False, flush_batch=FLUSH_BATCH, flush_interval=FLUSH_INTERVAL):
+        self.engine = engine
+        self.job_name = job_name
+        self.trace_memory = trace_memory
+        self.flush_batch = flush_batch
+        self.flush_interval = flush_interval
+        self.log_id = None
+        self.stages = []
+
+    def __enter__(self):
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        try:
+            with self.engine.begin() as connection:
+                self.log_id = connection.execute(
+                    text("SELECT start_job_run(:job_name, :started_at)"),
+                    {'job_name': self.job_name, 'started_at': self.started_at},
+                ).scalar()
+        except SQLAlchemyError as e:
+            print(f"Could not start job log for {self.job_name}, running unlogged: {e}")
+            self.log_id = None
+        self._writer = _MetricWriter(self.engine, self.flush_batch, self.flush_interval) \
+            if self.log_id is not None else None
+        self._owns_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start()
+        self._total = _Stage(TOTAL_STAGE)
+        self._open = [self._total]
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        self._token = _current_run.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_run.reset(self._token)
+        error = None if exc is None else ''.join(traceback.format_exception(exc_type, exc, tb))[-MAX_ERROR_LENGTH:]
+        status = STATUS_SUCCESS if exc is None else STATUS_FAILED
+        self._close_stage(self._total, self.started_at, self._start, status, error)
+        if self._owns_tracing:
+            tracemalloc.stop()
+        if self._writer is None:
+            return False
+        self._writer.close()
+
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(
+                    text("SELECT end_job_run(:log_id, :status, :ended_at, :error_message)"),
+                    {'log_id': self.log_id, 'status': status, 'ended_at': datetime.now(), 'error_message': error},
+                )
+        except SQLAlchemyError as e:
+            print(f"Could not end job log {self.log_id} for {self.job_name}: {e}")
+        return False
+
+    # tracemalloc keeps a single peak, so entering a stage folds the peak so far into the enclosing stage
+    # before resetting it, and leaving one folds the stage's own peak back out
+    def _peak(self):
+        return tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+
+    def _close_stage(self, current, started_at, start, status, error):
+        current.peak = max(current.peak, self._peak())
+        self._open.pop()
+        if self._open:
+            self._open[-1].peak = max(self._open[-1].peak, current.peak)
+        row = {
+            'log_id': str(self.log_id),
+            'stage': current.name,
+            'started_at': started_at,
+            'ended_at': datetime.now(),
+            'duration_ms': int((time.perf_counter() - start) * 1000),
+            'row_count': current.rows,
+            'peak_memory_bytes': current.peak if self.trace_memory else None,
+            'status': status,
+            'error_message': error if error is not None else current.error,
+        }
+        self.stages.append(row)
+        if self._writer is not None:
+            self._writer.put(row)
+
+    @contextmanager
+    def stage(self, name):
+        current = _Stage(name)
+        if self.trace_memory:
+            self._open[-1].peak = max(self._open[-1].peak, self._peak())
+            tracemalloc.reset_peak()
+        self._open.append(current)
+        started_at, start = datetime.now(), time.perf_counter()
+        try:
+            yield current
+        except BaseException as e:
+            self._close_stage(current, started_at, start, STATUS_FAILED, repr(e)[:MAX_ERROR_LENGTH])
+            raise
+        self._close_stage(current, started_at, start, STATUS_SUCCESS, None)
+
+def current_run():
+    return _current_run.get()
+
+# A stage of the current run, or an unrecorded one when the code runs outside a JobRun
+@contextmanager
+def stage(name):
+    run = current_run()
+    if run is None:
+        yield _Stage(name)
+        return
+    with run.stage(name) as current:
+        yield current
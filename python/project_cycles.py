@@ -0,0 +1,160 @@
+import io
+from datetime import date
+
+import pandas as pd
+from sqlalchemy import Boolean, Date, Integer, String, bindparam, column, select, table, tuple_, update
+
+definition_table = table(
+    'project_definition',
+    column('id', Integer),
+    column('recurrence', String),
+    column('start_date', Date),
+    column('end_date', Date),
+    column('cycle_index', Integer),
+    column('cycle_start_date', Date),
+    column('cycle_end_date', Date),
+    column('scope', String),
+    column('scope_data', String),
+)
+execution_table = table(
+    'project_execution_data',
+    column('project_id', Integer),
+    column('site', String),
+    column('cycle_index', Integer),
+    column('cycle_start_date', Date),
+    column('cycle_end_date', Date),
+    column('is_on_project', Boolean),
+    column('execution_status', String),
+)
+site_table = table(
+    'site_master',
+    column('site', String),
+    column('zone', String),
+    column('state', String),
+    column('store_type', String),
+)
+
+ONE_TIME = 'one-time'
+# Cycle length of each recurring project type, as generate_project_execution_data() adds it
+RECURRENCE_MONTHS = {'monthly': 1, 'quarterly': 3, 'half-yearly': 6, 'yearly': 12}
+GLOBAL_SCOPE = 'Global'
+SPECIFIED_SITES = 'Specified Sites'
+# site_master column each filtered scope matches its comma-separated scope_data against
+SCOPE_COLUMNS = {'Zone': 'zone', 'State': 'state', 'Store Type': 'store_type'}
+# Execution rows inserted, and (project, cycle) pairs probed, per round trip
+BATCH_SIZE = 10000
+
+# Next cycle of every project, with generate_project_execution_data()'s date arithmetic:
+# a recurring cycle starts the day after the last one ended (or after start_date) and runs its
+# recurrence length less a day, month ends clamped like PostgreSQL's date + interval
+def next_cycles(definitions):
+    cycles = definitions[['id', 'recurrence', 'scope', 'scope_data']].copy()
+    one_time = definitions['recurrence'] == ONE_TIME
+    last_end = pd.to_datetime(definitions['cycle_end_date'].fillna(definitions['start_date']))
+    cycles['cycle_index'] = (definitions['cycle_index'].fillna(0).astype(int) + 1).where(~one_time, 1)
+    cycles['cycle_start_date'] = (last_end + pd.Timedelta(days=1)).where(~one_time,
+                                                                          pd.to_datetime(definitions['start_date']))
+    cycles['cycle_end_date'] = pd.to_datetime(definitions['end_date']).where(one_time)
+    for recurrence, months in RECURRENCE_MONTHS.items():
+        rows = definitions['recurrence'] == recurrence
+        cycles.loc[rows, 'cycle_end_date'] = (cycles.loc[rows, 'cycle_start_date'] + pd.DateOffset(months=months)
+                                              - pd.Timedelta(days=1))
+    return cycles
+
+# (project_id, cycle_index) pairs that already have execution rows
+def _existing_cycles(connection, cycles, batch_size):
+    pairs = list(zip(cycles['id'].tolist(), cycles['cycle_index'].tolist()))
+    existing = set()
+    query = (select(execution_table.c.project_id, execution_table.c.cycle_index).distinct()
+             .where(tuple_(execution_table.c.project_id, execution_table.c.cycle_index)
+                    .in_(bindparam('pairs', expanding=True))))
+    for start in range(0, len(pairs), batch_size):
+        existing.update(connection.execute(query, {'pairs': pairs[start:start + batch_size]}).tuples())
+    return existing
+
+# One row per (project, site) in each cycle's scope, resolved against site_master in memory
+def _scope_sites(cycles, sites):
+    frames = []
+    is_global = cycles['scope'] == GLOBAL_SCOPE
+    if is_global.any():
+        frames.append(cycles.loc[is_global, ['id']].merge(sites[['site']], how='cross'))
+
+    values = cycles.loc[~is_global, ['id', 'scope', 'scope_data']].copy()
+    values['value'] = values['scope_data'].str.split(',')
+    values = values.explode('value').dropna(subset=['value'])
+    specified = values['scope'] == SPECIFIED_SITES
+    frames.append(values.loc[specified, ['id', 'value']].rename(columns={'value': 'site'}))
+    for scope, site_column in SCOPE_COLUMNS.items():
+        matches = values.loc[values['scope'] == scope, ['id', 'value']].drop_duplicates()
+        frames.append(matches.merge(sites[['site', site_column]], left_on='value', right_on=site_column)[['id', 'site']])
+    return pd.concat(frames, ignore_index=True)
+
+# COPY on PostgreSQL; elsewhere plain executemany batches, skipping per-row statement processing
+def _insert_rows(connection, rows, batch_size):
+    columns = [c.name for c in execution_table.c]
+    if connection.dialect.name == 'postgresql':
+        buffer = io.StringIO()
+        rows[columns].to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(f"COPY project_execution_data ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    else:
+        marker = '?' if connection.dialect.paramstyle == 'qmark' else '%s'
+        statement = (f"INSERT INTO project_execution_data ({', '.join(columns)}) "
+                     f"VALUES ({', '.join([marker] * len(columns))})")
+        records = list(zip(*(rows[name].tolist() for name in columns)))
+        for start in range(0, len(records), batch_size):
+            connection.exec_driver_sql(statement, records[start:start + batch_size])
+
+# Generate the next cycle of every project due by as_of (default today) in one pass: one-time projects
+# without their single cycle, recurring projects whose next cycle starts within lead_days of as_of.
+# Cycles that already have execution rows are skipped, so re-running (or running after the
+# per-project procedure) never duplicates them. A project further behind gets one more cycle per call.
+# Projects with an unknown recurrence or scope are left alone and listed in the result.
+def generate_due_cycles(engine, as_of=None, lead_days=0, batch_size=BATCH_SIZE):
+    horizon = pd.Timestamp(as_of or date.today()) + pd.Timedelta(days=lead_days)
+    stats = {'due': 0, 'skipped_existing': 0, 'generated': 0, 'rows': 0, 'invalid': []}
+    with engine.begin() as connection:
+        definitions = pd.DataFrame(connection.execute(select(*definition_table.c)).fetchall(),
+                                   columns=[c.name for c in definition_table.c])
+        valid = (definitions['recurrence'].isin([ONE_TIME, *RECURRENCE_MONTHS])
+                 & definitions['scope'].isin([GLOBAL_SCOPE, SPECIFIED_SITES, *SCOPE_COLUMNS]))
+        stats['invalid'] = definitions.loc[~valid, 'id'].tolist()
+
+        cycles = next_cycles(definitions[valid])
+        one_time = cycles['recurrence'] == ONE_TIME
+        due = cycles[one_time | (cycles['cycle_start_date'] <= horizon)]
+        stats['due'] = len(due)
+
+        existing = _existing_cycles(connection, due, batch_size)
+        is_new = [(project_id, cycle_index) not in existing
+                  for project_id, cycle_index in zip(due['id'].tolist(), due['cycle_index'].tolist())]
+        stats['skipped_existing'] = len(due) - sum(is_new)
+        due = due[is_new]
+        if due.empty:
+            return stats
+
+        sites = pd.DataFrame(connection.execute(select(*site_table.c)).fetchall(),
+                             columns=[c.name for c in site_table.c])
+        rows = _scope_sites(due, sites).merge(due[['id', 'cycle_index', 'cycle_start_date', 'cycle_end_date']], on='id')
+        rows = pd.DataFrame({
+            'project_id': rows['id'].astype(int),
+            'site': rows['site'],
+            'cycle_index': rows['cycle_index'].astype(int),
+            'cycle_start_date': rows['cycle_start_date'].dt.strftime('%Y-%m-%d'),
+            'cycle_end_date': rows['cycle_end_date'].dt.strftime('%Y-%m-%d'),
+            'is_on_project': True,
+            'execution_status': 'pending',
+        })
+        _insert_rows(connection, rows, batch_size)
+
+        connection.execute(
+            update(definition_table).where(definition_table.c.id == bindparam('b_id')),
+            [{'b_id': int(project_id), 'cycle_index': int(cycle_index),
+              'cycle_start_date': start.date(), 'cycle_end_date': end.date()}
+             for project_id, cycle_index, start, end in zip(due['id'], due['cycle_index'],
+                                                            due['cycle_start_date'], due['cycle_end_date'])],
+        )
+        stats['generated'] = len(due)
+        stats['rows'] = len(rows)
+    return stats
@@ -0,0 +1,207 @@
+import hashlib
+import io
+import json
+import math
+from datetime import date, datetime, time
+from decimal import Decimal
+from json.encoder import encode_basestring_ascii
+
+from sqlalchemy import bindparam, inspect, text
+
+SOURCE_TABLE = 'project_data'
+METADATA_TABLE = 'project_metadata'
+# One document per site, see sql/new_project_data_json.sql
+TARGET_TABLE = 'new_project_data_json'
+KEY = 'site'
+# Sites rebuilt and written per transaction (and validated per query by validate_documents)
+BATCH_SIZE = 1000
+
+def _quote(connection, name):
+    return connection.dialect.identifier_preparer.quote(name)
+
+# Hash of a whole project_data row, computed in the database so unchanged sites are never fetched.
+# Elsewhere (the SQLite stand-in) it is md5() of the quote()d columns, md5 registered on the connection.
+def _row_hash(connection, columns):
+    if connection.dialect.name == 'postgresql':
+        return "md5(CAST(t AS text))"
+    values = " || ',' || ".join(f"quote(t.{_quote(connection, name)})" for name in columns)
+    return f"md5({values})"
+
+def _encode_float(value):
+    return repr(value) if math.isfinite(value) else f'"{value!r}"'.replace('nan', 'NaN').replace('inf', 'Infinity')
+
+def _encode_temporal(value):
+    return f'"{value.isoformat()}"'
+
+def _encode_other(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return encode_basestring_ascii(str(value))
+
+# A value as (t.*)::jsonb renders it, looked up by type: json.dumps per value is most of a build's time
+_ENCODERS = {
+    str: encode_basestring_ascii,
+    int: int.__repr__,
+    float: _encode_float,
+    bool: lambda value: 'true' if value else 'false',
+    type(None): lambda value: 'null',
+    Decimal: str,
+    date: _encode_temporal,
+    datetime: _encode_temporal,
+    time: _encode_temporal,
+}
+
+# field_info for every row from a template per metadata field: each row is serialized once, each column value
+# encoded once, and the fields projected from it in column_name order
+class DocumentBuilder:
+    def __init__(self, metadata, columns):
+        metadata = sorted(metadata, key=lambda field: field['column_name'])
+        positions = {name: index for index, name in enumerate(columns)}
+        self.field_names = [field['field_name'] for field in metadata]
+        self.columns = [field['column_name'] for field in metadata]
+        self._indexes = [positions.get(field['column_name'], len(columns)) for field in metadata]
+        self._prefixes = [
+            '{' + f'"field_name": {json.dumps(field["field_name"])}, '
+                  f'"field_display_name": {json.dumps(field["field_display_name"])}, '
+                  f'"is_track_time": false, "value": '
+            for field in metadata
+        ]
+        # Part of every site's hash, so editing project_metadata rebuilds every document
+        self.fingerprint = hashlib.md5(json.dumps(metadata, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+    # row is a tuple of the source columns; a field whose column is missing gets null
+    def build(self, row):
+        values = map((*row, None).__getitem__, self._indexes)
+        return '[' + ', '.join([prefix + _ENCODERS.get(type(value), _encode_other)(value) + '}'
+                                for prefix, value in zip(self._prefixes, values)]) + ']'
+
+def _load_metadata(connection):
+    return [dict(field) for field in connection.execute(text(
+        f"SELECT field_name, field_display_name, column_name FROM {METADATA_TABLE}"
+    )).mappings()]
+
+def _source_columns(connection):
+    return [c['name'] for c in inspect(connection).get_columns(SOURCE_TABLE)]
+
+# Sites whose row hash differs from the one their document was built from, with the new hash,
+# and documents whose site is gone from project_data
+def _stale_sites(connection, columns, fingerprint, full):
+    stale = connection.execute(text(f"""
+        SELECT {KEY}, source_hash FROM (
+            SELECT t.{KEY}, {_row_hash(connection, columns)} || :fingerprint AS source_hash, d.source_hash AS built_hash
+            FROM {SOURCE_TABLE} t
+            LEFT JOIN {TARGET_TABLE} d ON d.{KEY} = t.{KEY}
+        ) s
+        WHERE :full OR built_hash IS NULL OR built_hash <> source_hash
+    """), {'fingerprint': ':' + fingerprint, 'full': full}).all()
+    removed = connection.execute(text(f"""
+        SELECT d.{KEY} FROM {TARGET_TABLE} d
+        WHERE NOT EXISTS (SELECT 1 FROM {SOURCE_TABLE} t WHERE t.{KEY} = d.{KEY})
+    """)).scalars().all()
+    return stale, removed
+
+def _fetch_rows(connection, sites):
+    result = connection.execute(
+        text(f"SELECT * FROM {SOURCE_TABLE} WHERE {KEY} IN :sites").bindparams(bindparam('sites', expanding=True)),
+        {'sites': sites},
+    )
+    position = list(result.keys()).index(KEY)
+    return {row[position]: row for row in result.cursor.fetchall()}
+
+def _delete_documents(connection, sites):
+    connection.execute(
+        text(f"DELETE FROM {TARGET_TABLE} WHERE {KEY} IN :sites").bindparams(bindparam('sites', expanding=True)),
+        {'sites': sites},
+    )
+
+# Replace the documents of a batch of sites: COPY on PostgreSQL, executemany elsewhere
+def _write_documents(connection, documents, built_at):
+    _delete_documents(connection, [site for site, _, _ in documents])
+    if connection.dialect.name == 'postgresql':
+        buffer = io.StringIO()
+        for site, document, source_hash in documents:
+            buffer.write(f"{_csv(site)},{_csv(document)},{source_hash},{built_at.isoformat()}\n")
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(
+            f"COPY {TARGET_TABLE} ({KEY}, field_info, source_hash, built_at) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    else:
+        marker = '?' if connection.dialect.paramstyle == 'qmark' else '%s'
+        connection.exec_driver_sql(
+            f"INSERT INTO {TARGET_TABLE} ({KEY}, field_info, source_hash, built_at) VALUES ({marker}, {marker}, {marker}, {marker})",
+            [(site, document, source_hash, built_at.isoformat(' ')) for site, document, source_hash in documents],
+        )
+
+def _csv(value):
+    return '"' + str(value).replace('"', '""') + '"'
+
+def _parse(document):
+    try:
+        return json.loads(document)
+    except (TypeError, ValueError):
+        return None
+
+# build_json.sql's validation for a batch of sites: each stored document against the one its source row gives.
+# Documents are compared as text and only parsed when they differ. Returns (site, column_name, original_value,
+# json_value) per field that differs, None for a missing or unreadable side.
+def _validate(connection, builder, expected):
+    result = connection.execute(
+        text(f"SELECT {KEY}, CAST(field_info AS TEXT) FROM {TARGET_TABLE} WHERE {KEY} IN :sites")
+        .bindparams(bindparam('sites', expanding=True)),
+        {'sites': list(expected)},
+    )
+    stored = dict(result.cursor.fetchall())
+    mismatches = []
+    for site, document in expected.items():
+        if stored.get(site) == document:
+            continue
+        stored_fields = _parse(stored.get(site))
+        if stored_fields == json.loads(document):
+            continue
+        stored_values = {field.get('field_name'): field.get('value')
+                         for field in stored_fields or [] if isinstance(field, dict)}
+        for column_name, field in zip(builder.columns, json.loads(document)):
+            if field['field_name'] not in stored_values or stored_values[field['field_name']] != field['value']:
+                mismatches.append((site, column_name, field['value'], stored_values.get(field['field_name'])))
+    return mismatches
+
+# Rebuild new_project_data_json for the sites whose project_data row changed since their document was built
+# (every site when full=True), in batches of batch_size sites, each written in its own transaction so an
+# interrupted build resumes where it stopped. Documents of deleted sites are removed. Reading back what was just
+# written can't catch anything, so checking them is left to validate_documents(engine, stats['sites']), which
+# re-explodes only the sites this build rewrote.
+def build_documents(engine, batch_size=BATCH_SIZE, full=False):
+    with engine.connect() as connection:
+        columns = _source_columns(connection)
+        builder = DocumentBuilder(_load_metadata(connection), columns)
+        stale, removed = _stale_sites(connection, columns, builder.fingerprint, full)
+
+    stats = {'rebuilt': 0, 'removed': len(removed), 'sites': []}
+    for start in range(0, len(removed), batch_size):
+        with engine.begin() as connection:
+            _delete_documents(connection, removed[start:start + batch_size])
+
+    for start in range(0, len(stale), batch_size):
+        batch = stale[start:start + batch_size]
+        built_at = datetime.now()
+        with engine.begin() as connection:
+            rows = _fetch_rows(connection, [site for site, _ in batch])
+            documents = [(site, builder.build(rows[site]), source_hash) for site, source_hash in batch if site in rows]
+            _write_documents(connection, documents, built_at)
+        stats['rebuilt'] += len(documents)
+        stats['sites'] += [site for site, _, _ in documents]
+    return stats
+
+# Validate stored documents against project_data without rebuilding them; every site when sites is None.
+# Catches documents edited or damaged after they were built, and builds interrupted between batches.
+def validate_documents(engine, sites=None, batch_size=BATCH_SIZE):
+    with engine.connect() as connection:
+        builder = DocumentBuilder(_load_metadata(connection), _source_columns(connection))
+        if sites is None:
+            sites = connection.execute(text(f"SELECT {KEY} FROM {SOURCE_TABLE}")).scalars().all()
+        mismatches = []
+        for start in range(0, len(sites), batch_size):
+            rows = _fetch_rows(connection, sites[start:start + batch_size])
+            mismatches += _validate(connection, builder, {site: builder.build(row) for site, row in rows.items()})
+    return mismatches
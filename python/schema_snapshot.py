@@ -0,0 +1,172 @@
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from compare_db_schema import compare_columns_and_generate_sql_queries, get_constraints, get_indexes, get_schema
+
+# Bump when the snapshot file layout changes; older files are ignored as a baseline
+SNAPSHOT_VERSION = 1
+SNAPSHOT_TIME_FORMAT = '%Y%m%dT%H%M%S'
+
+# Function to fetch a cheap per-table fingerprint of the catalog from pg_class/pg_attribute.
+# Any column added, dropped, retyped, made (not) nullable or given a new default changes the hash.
+# Only the columns information_schema.columns shows this role (owned, or with some column privilege) are
+# fingerprinted, so tables get_schema() can't see are left out here too instead of reading as missing.
+def get_table_fingerprints(engine, schema_name='public'):
+    query = """
+                SELECT c.relname AS table_name,
+                       md5(string_agg(
+                           a.attname || ':' || format_type(a.atttypid, a.atttypmod) || ':' || a.attnotnull::text
+                               || ':' || coalesce(pg_get_expr(d.adbin, d.adrelid), ''),
+                           ',' ORDER BY a.attnum
+                       )) AS fingerprint
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+                    AND (pg_has_role(c.relowner, 'USAGE')
+                         OR has_column_privilege(c.oid, a.attnum, 'SELECT, INSERT, UPDATE, REFERENCES'))
+                LEFT JOIN pg_attrdef d ON d.adrelid = c.oid AND d.adnum = a.attnum
+                WHERE n.nspname = :schema_name
+                  AND c.relkind IN ('r', 'p', 'v', 'f')
+                GROUP BY c.relname;
+            """
+    try:
+        with engine.connect() as connection:
+            result = connection.execute(text(query), {'schema_name': schema_name}).fetchall()
+        return {table_name: fingerprint for table_name, fingerprint in result}
+    except SQLAlchemyError as e:
+        print(f"Error while fetching table fingerprints: {e}")
+        return None
+
+# Snapshots live in <snapshot_dir>/<env_name>/<timestamp>.json, one file per run
+def list_snapshots(snapshot_dir, env_name):
+    env_dir = os.path.join(snapshot_dir, env_name)
+    if not os.path.isdir(env_dir):
+        return []
+    return sorted(os.path.join(env_dir, name) for name in os.listdir(env_dir) if name.endswith('.json'))
+
+# Load the latest snapshot of an environment, or the latest one taken at or before as_of
+def load_snapshot(snapshot_dir, env_name, as_of=None):
+    for path in reversed(list_snapshots(snapshot_dir, env_name)):
+        taken_at = datetime.strptime(os.path.splitext(os.path.basename(path))[0], SNAPSHOT_TIME_FORMAT)
+        if as_of is not None and taken_at > as_of:
+            continue
+        with open(path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+        if snapshot.get('version') == SNAPSHOT_VERSION:
+            return snapshot
+    return None
+
+def save_snapshot(snapshot_dir, snapshot):
+    env_dir = os.path.join(snapshot_dir, snapshot['env_name'])
+    os.makedirs(env_dir, exist_ok=True)
+    path = os.path.join(env_dir, f"{snapshot['taken_at']}.json")
+    # Write to a temp file first so a crashed run never leaves a half-written snapshot behind
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+    return path
+
+# Take a new snapshot, re-reading information_schema only for tables whose fingerprint changed.
+# Constraints and indexes are one query each and are re-read in full.
+# Returns (snapshot, changed_tables), or (None, changed_tables) without saving anything when a changed table
+# could not be read: saving the new fingerprints would drop it from every later snapshot.
+def take_snapshot(engine, snapshot_dir, env_name, schema_name='public'):
+    previous = load_snapshot(snapshot_dir, env_name)
+    if previous is not None and previous['schema_name'] != schema_name:
+        previous = None
+
+    fingerprints = get_table_fingerprints(engine, schema_name)
+    if fingerprints is None:
+        return None, []
+
+    previous_fingerprints = previous['fingerprints'] if previous else {}
+    changed_tables = [table_name for table_name, fingerprint in fingerprints.items()
+                      if previous_fingerprints.get(table_name) != fingerprint]
+
+    tables = {}
+    if previous:
+        changed = set(changed_tables)
+        tables = {table_name: columns for table_name, columns in previous['tables'].items()
+                  if table_name in fingerprints and table_name not in changed}
+    try:
+        changed_schema = get_schema(engine, schema_name=schema_name, tables=changed_tables, raise_errors=True)
+        constraints = get_constraints(engine, schema_name=schema_name, raise_errors=True)
+        indexes = get_indexes(engine, schema_name=schema_name, raise_errors=True)
+    except SQLAlchemyError as e:
+        print(f"Error while reading {env_name}, snapshot not saved: {e}")
+        return None, changed_tables
+    missing_tables = sorted(set(changed_tables) - changed_schema.keys())
+    if missing_tables:
+        print(f"Changed tables of {env_name} could not be read, snapshot not saved: {', '.join(missing_tables)}")
+        return None, changed_tables
+    tables.update(changed_schema)
+
+    snapshot = {
+        'version': SNAPSHOT_VERSION,
+        'env_name': env_name,
+        'schema_name': schema_name,
+        'taken_at': datetime.now().strftime(SNAPSHOT_TIME_FORMAT),
+        'fingerprints': fingerprints,
+        'tables': dict(sorted(tables.items())),
+        'constraints': constraints,
+        'indexes': indexes
+    }
+    save_snapshot(snapshot_dir, snapshot)
+    print(f"Snapshot of {env_name}: {len(changed_tables)} of {len(fingerprints)} tables re-read")
+    return snapshot, changed_tables
+
+# Column diff between two snapshots that reuses the cached rows of every table whose
+# fingerprints on both sides are the same as in the previous diff of this pair.
+def incremental_column_changes(source_snapshot, target_snapshot, snapshot_dir):
+    source_schema_name = source_snapshot['schema_name']
+    target_schema_name = target_snapshot['schema_name']
+    cache_dir = os.path.join(snapshot_dir, 'diffs')
+    cache_path = os.path.join(cache_dir, f"{source_snapshot['env_name']}.{source_schema_name}__{target_snapshot['env_name']}.{target_schema_name}.json")
+
+    cache = {}
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') != SNAPSHOT_VERSION:
+            cache = {}
+
+    source_fingerprints = source_snapshot['fingerprints']
+    target_fingerprints = target_snapshot['fingerprints']
+    cached_source = cache.get('source_fingerprints', {})
+    cached_target = cache.get('target_fingerprints', {})
+    cached_changes = cache.get('column_changes', {})
+
+    shared_tables = [table_name for table_name in source_snapshot['tables'] if table_name in target_snapshot['tables']]
+    dirty_tables = [table_name for table_name in shared_tables
+                    if table_name not in cached_changes
+                    or cached_source.get(table_name) != source_fingerprints.get(table_name)
+                    or cached_target.get(table_name) != target_fingerprints.get(table_name)]
+
+    fresh_changes = defaultdict(list)
+    for row in compare_columns_and_generate_sql_queries(
+            {table_name: source_snapshot['tables'][table_name] for table_name in dirty_tables},
+            {table_name: target_snapshot['tables'][table_name] for table_name in dirty_tables},
+            source_schema_name, target_schema_name):
+        fresh_changes[row['table']].append(row)
+
+    dirty = set(dirty_tables)
+    column_changes = {table_name: fresh_changes[table_name] if table_name in dirty else cached_changes[table_name]
+                      for table_name in shared_tables}
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': SNAPSHOT_VERSION,
+            'source_fingerprints': {table_name: source_fingerprints.get(table_name) for table_name in shared_tables},
+            'target_fingerprints': {table_name: target_fingerprints.get(table_name) for table_name in shared_tables},
+            'column_changes': column_changes
+        }, f)
+
+    print(f"Re-diffed {len(dirty_tables)} of {len(shared_tables)} shared tables")
+    return [row for table_name in shared_tables for row in column_changes[table_name]]
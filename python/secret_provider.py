@@ -0,0 +1,261 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from imds_token import IMDS_URL, ImdsTokenProvider, default_provider
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # only needed for the encrypted on-disk cache
+    Fernet = None
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; the disk cache then works without a cross-process lock
+    fcntl = None
+
+AZURE_RESOURCE = "https://management.azure.com/"
+
+# Used when a secret or session token does not say when it expires
+DEFAULT_SECRET_TTL = 3600
+DEFAULT_SESSION_TTL = 1800
+# Treat cached values as expired this many seconds early so callers never get one that is about to lapse
+REFRESH_MARGIN = 300
+# Secrets fetched at the same time by get_secrets()
+BULK_CONCURRENCY = 10
+
+# Parse '2025-07-29 07:00:00 UTC' (rotated secrets) or ISO-8601 (session tokens) into epoch seconds
+def parse_expiry(value):
+    if not value:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    for fmt in ('%Y-%m-%d %H:%M:%S %Z', '%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S.%fZ'):
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc).timestamp()
+        except ValueError:
+            continue
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+# Encrypted, per-secret files shared by every job on the host.
+# A lock file per secret makes concurrent jobs wait for the one that is fetching instead of all fetching.
+class EncryptedDiskCache:
+    def __init__(self, cache_dir, key=None):
+        if Fernet is None:
+            raise RuntimeError("The encrypted secret cache needs the 'cryptography' package")
+        key = key or os.environ.get('SECRET_CACHE_KEY')
+        if not key:
+            raise RuntimeError("Set SECRET_CACHE_KEY (a Fernet key) or pass key= to use the disk cache")
+        self.cache_dir = cache_dir
+        self.fernet = Fernet(key)
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.cache_dir, hashlib.sha256(name.encode('utf-8')).hexdigest())
+
+    def get(self, name, now):
+        try:
+            with open(self._path(name) + '.enc', 'rb') as f:
+                entry = json.loads(self.fernet.decrypt(f.read()))
+        except (OSError, InvalidToken, ValueError):
+            return None
+        if entry['expires_at'] <= now:
+            return None
+        return entry
+
+    def put(self, name, value, expires_at):
+        path = self._path(name) + '.enc'
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        payload = self.fernet.encrypt(json.dumps({'value': value, 'expires_at': expires_at}).encode('utf-8'))
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def delete(self, name):
+        try:
+            os.remove(self._path(name) + '.enc')
+        except FileNotFoundError:
+            pass
+
+    def lock(self, name):
+        return _FileLock(self._path(name) + '.lock')
+
+class _FileLock:
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+# Fetches Akeyless rotated secrets with an Azure AD (IMDS) identity and caches them until they expire.
+# imds_url/config_url can point at local stub servers for testing; pass token_provider to share one.
+# With the default imds_url and timeout the process-wide imds_token.default_provider() is used.
+class SecretProvider:
+    def __init__(self, config_url, access_id, resource=AZURE_RESOURCE, imds_url=IMDS_URL,
+                 disk_cache=None, timeout=10, refresh_margin=REFRESH_MARGIN,
+                 default_secret_ttl=DEFAULT_SECRET_TTL, default_session_ttl=DEFAULT_SESSION_TTL,
+                 token_provider=None, pool_size=BULK_CONCURRENCY):
+        self.config_url = config_url.rstrip('/')
+        self.access_id = access_id
+        self.resource = resource
+        if token_provider is None:
+            if imds_url == IMDS_URL and timeout == 10:
+                token_provider = default_provider()
+            else:
+                token_provider = ImdsTokenProvider(imds_url=imds_url, timeout=timeout)
+        self.token_provider = token_provider
+        self.session = requests.Session()
+        self.pool_size = 0
+        self._grow_pool(pool_size)
+        self.disk_cache = disk_cache
+        self.timeout = timeout
+        self.refresh_margin = refresh_margin
+        self.default_secret_ttl = default_secret_ttl
+        self.default_session_ttl = default_session_ttl
+
+        self._lock = threading.Lock()
+        self._session_lock = threading.Lock()
+        self._path_locks = {}
+        self._secrets = {}
+        self._session_token = None
+        self._session_expires_at = 0
+
+    # Keep at least size pooled connections per host, so concurrent fetches don't open and drop extra ones
+    def _grow_pool(self, size):
+        if size > self.pool_size:
+            self.session.mount('https://', HTTPAdapter(pool_maxsize=size))
+            self.session.mount('http://', HTTPAdapter(pool_maxsize=size))
+            self.pool_size = size
+
+    # Azure AD token from IMDS, base64-encoded as Akeyless expects for cloud_id
+    def _cloud_id(self):
+        access_token = self.token_provider.get_token(self.resource)
+        return base64.b64encode(access_token.encode("utf-8")).decode("utf-8")
+
+    # Akeyless session token, reused until its own expiration (or default_session_ttl)
+    def session_token(self):
+        with self._session_lock:
+            if self._session_token and time.time() < self._session_expires_at:
+                return self._session_token
+
+            response = self.session.post(f"{self.config_url}/v2/auth", timeout=self.timeout, json={
+                "access_id": self.access_id,
+                "access_type": "azure_ad",
+                "cloud_id": self._cloud_id(),
+            })
+            response.raise_for_status()
+            auth = response.json()
+            expires_at = parse_expiry(auth.get("expiration")) or time.time() + self.default_session_ttl
+            self._session_token = auth["token"]
+            self._session_expires_at = expires_at - self.refresh_margin
+            return self._session_token
+
+    def _fetch_secret(self, secret_path):
+        response = self.session.post(f"{self.config_url}/v2/rotated-secret-get-value", timeout=self.timeout,
+                                 json={"name": secret_path, "token": self.session_token()})
+        response.raise_for_status()
+        value = response.json()["value"]
+        expires_at = parse_expiry(value.get("expiration_date") if isinstance(value, dict) else None)
+        return value, (expires_at or time.time() + self.default_secret_ttl) - self.refresh_margin
+
+    def _path_lock(self, secret_path):
+        with self._lock:
+            return self._path_locks.setdefault(secret_path, threading.Lock())
+
+    # Return the secret value for secret_path, fetching it only when no cached copy is still valid
+    def get_secret(self, secret_path):
+        cached = self._secrets.get(secret_path)
+        if cached and time.time() < cached[1]:
+            return cached[0]
+
+        # One fetch per path at a time in this process ...
+        with self._path_lock(secret_path):
+            cached = self._secrets.get(secret_path)
+            if cached and time.time() < cached[1]:
+                return cached[0]
+
+            if self.disk_cache is None:
+                value, expires_at = self._fetch_secret(secret_path)
+            else:
+                # ... and across processes on this host
+                with self.disk_cache.lock(secret_path):
+                    entry = self.disk_cache.get(secret_path, time.time())
+                    if entry:
+                        value, expires_at = entry['value'], entry['expires_at']
+                    else:
+                        value, expires_at = self._fetch_secret(secret_path)
+                        self.disk_cache.put(secret_path, value, expires_at)
+
+            self._secrets[secret_path] = (value, expires_at)
+            return value
+
+    # Drop a cached secret, e.g. after the target system rejected the credentials
+    def invalidate(self, secret_path):
+        self._secrets.pop(secret_path, None)
+        if self.disk_cache is not None:
+            self.disk_cache.delete(secret_path)
+
+    # Secret from the in-memory cache if it is still valid; raises error otherwise
+    def _cached_secret(self, secret_path, error):
+        cached = self._secrets.get(secret_path)
+        if cached and time.time() < cached[1]:
+            return cached[0]
+        raise error
+
+    # Fetch many secret paths after a single authentication, at most max_concurrency at a time.
+    # Returns (secrets, errors): path -> value for the ones that worked, path -> exception for the rest.
+    # If authentication fails, secrets still cached in memory are returned and every other path gets that error.
+    async def get_secrets_async(self, secret_paths, max_concurrency=BULK_CONCURRENCY):
+        loop = asyncio.get_running_loop()
+        secret_paths = list(dict.fromkeys(secret_paths))
+        # One pooled connection per worker thread
+        self._grow_pool(max_concurrency)
+
+        # Own executor so the default one (min(32, cpus + 4) threads) doesn't cap the concurrency
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='secret-fetch') as executor:
+            try:
+                await loop.run_in_executor(executor, self.session_token)
+                fetch = self.get_secret
+            except Exception as error:
+                fetch = lambda secret_path, error=error: self._cached_secret(secret_path, error)
+            results = await asyncio.gather(
+                *(loop.run_in_executor(executor, fetch, secret_path) for secret_path in secret_paths),
+                return_exceptions=True
+            )
+
+        secrets = {}
+        errors = {}
+        for secret_path, result in zip(secret_paths, results):
+            if isinstance(result, Exception):
+                errors[secret_path] = result
+            else:
+                secrets[secret_path] = result
+        return secrets, errors
+
+    def get_secrets(self, secret_paths, max_concurrency=BULK_CONCURRENCY):
+        return asyncio.run(self.get_secrets_async(secret_paths, max_concurrency=max_concurrency))
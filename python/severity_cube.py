@@ -0,0 +1,275 @@
+import pandas as pd
+from sqlalchemy import (Column, Date, DateTime, Index, Integer, MetaData, String, Table, bindparam, cast, column, delete,
+                        func, insert, literal, select, table, union_all)
+from sqlalchemy.dialects import postgresql, sqlite
+
+# Source columns, as GetSeverityCounts() reads them
+SOURCE = table(
+    'siebel_srs',
+    column('id', Integer),
+    column('open_date', DateTime),
+    column('close_date', DateTime),
+    column('severity', Integer),
+    column('assoc_manager_id', Integer),
+    column('manager_id', Integer),
+    column('updated_at', DateTime),
+)
+# Stands in for a NULL manager id inside the cube's primary key
+NO_MANAGER = -1
+# Manager ids of the rollup rows that total every manager, so unfiltered views read one row per day/severity
+ALL_MANAGERS = -2
+# Source rows read, and cube/ledger rows written, per round trip
+CHUNK_SIZE = 20000
+LEVELS = ('daily', 'weekly', 'monthly')
+
+metadata = MetaData()
+# One row per (day, manager pair, severity, open|close) with the number of SRs opened or closed
+cube_table = Table(
+    'sr_severity_cube', metadata,
+    Column('day', Date, primary_key=True),
+    Column('assoc_manager_id', Integer, primary_key=True),
+    Column('manager_id', Integer, primary_key=True),
+    Column('severity', Integer, primary_key=True),
+    Column('event', String(5), primary_key=True),
+    Column('sr_count', Integer, nullable=False),
+    # Dashboards read one manager's date range
+    Index('ix_sr_severity_cube_assoc_manager', 'assoc_manager_id', 'day'),
+    Index('ix_sr_severity_cube_manager', 'manager_id', 'day'),
+)
+# What each SR currently contributes to the cube, so an update can take its old contribution back out
+ledger_table = Table(
+    'sr_severity_cube_ledger', metadata,
+    Column('sr_id', Integer, primary_key=True),
+    Column('open_day', Date),
+    Column('close_day', Date),
+    Column('assoc_manager_id', Integer, nullable=False),
+    Column('manager_id', Integer, nullable=False),
+    Column('severity', Integer),
+)
+state_table = Table(
+    'sr_severity_cube_state', metadata,
+    Column('name', String(50), primary_key=True),
+    Column('watermark', DateTime),
+)
+CUBE_KEYS = ['day', 'assoc_manager_id', 'manager_id', 'severity', 'event']
+LEDGER_COLUMNS = ['sr_id', 'open_day', 'close_day', 'assoc_manager_id', 'manager_id', 'severity']
+
+# Insert rows into target, or update the row with the same keys: columns in add are added to, the rest replaced.
+# PostgreSQL and SQLite get INSERT ... ON CONFLICT; other databases an UPDATE per row and then one INSERT of the
+# rows that matched nothing, which is slower and relies on refresh() being the only writer.
+def _upsert(connection, target, keys, rows, add=()):
+    values = [name for name in rows[0] if name not in keys]
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        upsert = (postgresql if dialect == 'postgresql' else sqlite).insert(target)
+        connection.execute(upsert.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: target.c[name] + upsert.excluded[name] if name in add else upsert.excluded[name]
+                  for name in values},
+        ), rows)
+        return
+
+    update = target.update().where(*(target.c[name] == bindparam(f"key_{name}") for name in keys)).values({
+        name: target.c[name] + bindparam(f"value_{name}") if name in add else bindparam(f"value_{name}")
+        for name in values
+    })
+    missing = []
+    for row in rows:
+        params = {f"key_{name}": row[name] for name in keys}
+        params.update({f"value_{name}": row[name] for name in values})
+        if connection.execute(update, params).rowcount == 0:
+            missing.append(row)
+    if missing:
+        connection.execute(insert(target), missing)
+
+# Turn ledger-shaped rows into +sign/-sign cube events
+def _events(ledger_rows, sign):
+    frames = []
+    for event, day_column in (('open', 'open_day'), ('close', 'close_day')):
+        # SRs without a severity have no column to be counted in, as in GetSeverityCounts()
+        rows = ledger_rows[ledger_rows[day_column].notna() & ledger_rows['severity'].notna()]
+        frames.append(pd.DataFrame({
+            'day': rows[day_column],
+            'assoc_manager_id': rows['assoc_manager_id'],
+            'manager_id': rows['manager_id'],
+            'severity': rows['severity'],
+            'event': event,
+            'sr_count': sign,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+# Day x manager x severity x open/close counts of siebel_srs, kept in sync from rows changed since a watermark.
+# Dashboards read a few thousand cube rows through counts() instead of scanning every SR.
+# Rows deleted from siebel_srs are not visible to refresh(); pass their ids to remove().
+class SeverityCube:
+    def __init__(self, engine, name='siebel_srs', chunk_size=CHUNK_SIZE):
+        self.engine = engine
+        self.name = name
+        self.chunk_size = chunk_size
+
+    def create_tables(self):
+        metadata.create_all(self.engine, checkfirst=True)
+
+    def watermark(self, connection=None):
+        query = select(state_table.c.watermark).where(state_table.c.name == self.name)
+        if connection is not None:
+            return connection.execute(query).scalar()
+        with self.engine.connect() as connection:
+            return connection.execute(query).scalar()
+
+    # Retire the previous contributions of sr_ids and add current (ledger-shaped rows, their new values)
+    def _apply(self, connection, sr_ids, current):
+        previous = pd.DataFrame(
+            connection.execute(
+                select(*(ledger_table.c[name] for name in LEDGER_COLUMNS)).where(ledger_table.c.sr_id.in_(sr_ids))
+            ).fetchall(),
+            columns=LEDGER_COLUMNS,
+        )
+        events = pd.concat([_events(current, 1), _events(previous, -1)], ignore_index=True)
+        deltas = events.groupby(CUBE_KEYS)['sr_count'].sum().reset_index()
+        rollup = (deltas.groupby(['day', 'severity', 'event'])['sr_count'].sum().reset_index()
+                      .assign(assoc_manager_id=ALL_MANAGERS, manager_id=ALL_MANAGERS))
+        deltas = pd.concat([deltas, rollup[deltas.columns]], ignore_index=True)
+        deltas = deltas[deltas['sr_count'] != 0].astype({'severity': 'int64'})
+
+        if len(deltas):
+            _upsert(connection, cube_table, CUBE_KEYS,
+                    deltas.astype(object).where(deltas.notna(), None).to_dict('records'), add=['sr_count'])
+
+        if len(current):
+            _upsert(connection, ledger_table, ['sr_id'],
+                    current.astype(object).where(current.notna(), None).to_dict('records'))
+        return len(deltas)
+
+    def _day(self, column):
+        # CAST(... AS DATE) in SQLite yields the year as a number
+        if self.engine.dialect.name == 'sqlite':
+            return func.date(column, type_=Date)
+        return cast(column, Date)
+
+    # Start of the day's week (Monday, like date_trunc('week')) or month, rolled up inside the database
+    def _period(self, day, level):
+        if level == 'daily':
+            return day
+        if self.engine.dialect.name == 'sqlite':
+            modifiers = ('weekday 0', '-6 days') if level == 'weekly' else ('start of month',)
+            return func.date(day, *modifiers, type_=Date)
+        return cast(func.date_trunc('week' if level == 'weekly' else 'month', day), Date)
+
+    # siebel_srs rows in ledger shape (plus updated_at), with the day and NULL-manager handling done in SQL
+    def _source_query(self):
+        return select(
+            SOURCE.c.id.label('sr_id'),
+            self._day(SOURCE.c.open_date).label('open_day'),
+            self._day(SOURCE.c.close_date).label('close_day'),
+            func.coalesce(SOURCE.c.assoc_manager_id, NO_MANAGER).label('assoc_manager_id'),
+            func.coalesce(SOURCE.c.manager_id, NO_MANAGER).label('manager_id'),
+            SOURCE.c.severity,
+            SOURCE.c.updated_at,
+        )
+
+    # First load: ledger and cube filled set-based inside the database, no rows pulled into Python
+    def _build(self, connection):
+        connection.execute(delete(cube_table))
+        connection.execute(delete(ledger_table))
+        latest = connection.execute(select(func.max(SOURCE.c.updated_at))).scalar()
+        source = self._source_query().subquery()
+        connection.execute(insert(ledger_table).from_select(
+            LEDGER_COLUMNS, select(*(source.c[name] for name in LEDGER_COLUMNS))
+        ))
+        events = [
+            select(ledger_table.c[day_column], ledger_table.c.assoc_manager_id, ledger_table.c.manager_id,
+                   ledger_table.c.severity, literal(event), func.count())
+                .where(ledger_table.c[day_column].is_not(None), ledger_table.c.severity.is_not(None))
+                .group_by(ledger_table.c[day_column], ledger_table.c.assoc_manager_id, ledger_table.c.manager_id,
+                          ledger_table.c.severity)
+            for event, day_column in (('open', 'open_day'), ('close', 'close_day'))
+        ]
+        connection.execute(insert(cube_table).from_select(CUBE_KEYS + ['sr_count'], union_all(*events)))
+        connection.execute(insert(cube_table).from_select(
+            CUBE_KEYS + ['sr_count'],
+            select(cube_table.c.day, literal(ALL_MANAGERS), literal(ALL_MANAGERS), cube_table.c.severity,
+                   cube_table.c.event, func.sum(cube_table.c.sr_count))
+                .group_by(cube_table.c.day, cube_table.c.severity, cube_table.c.event)
+        ))
+        changed = connection.execute(select(func.count()).select_from(ledger_table)).scalar()
+        cells = connection.execute(select(func.count()).select_from(cube_table)).scalar()
+        return changed, cells, latest
+
+    # Fold every SR changed since the watermark into the cube, in one transaction.
+    # The first call (no watermark yet) builds the cube from the whole table. Re-applying an SR
+    # whose values did not change is a no-op, so rows committed late at an old timestamp are
+    # the only thing a watermark can miss; call refresh(rebuild=True) now and then if that can happen.
+    def refresh(self, rebuild=False):
+        stats = {'changed_srs': 0, 'cube_cells': 0}
+        with self.engine.begin() as connection:
+            watermark = None if rebuild else self.watermark(connection)
+            if watermark is None:
+                stats['changed_srs'], stats['cube_cells'], latest = self._build(connection)
+            else:
+                query = self._source_query().where(SOURCE.c.updated_at > watermark)
+                result = connection.execute(query.execution_options(stream_results=True))
+                latest = watermark
+                for rows in result.partitions(self.chunk_size):
+                    current = pd.DataFrame(rows, columns=LEDGER_COLUMNS + ['updated_at'])
+                    stats['changed_srs'] += len(current)
+                    stats['cube_cells'] += self._apply(connection, current['sr_id'].tolist(), current[LEDGER_COLUMNS])
+                    chunk_latest = current['updated_at'].max()
+                    if pd.notna(chunk_latest) and chunk_latest > latest:
+                        latest = chunk_latest
+                # Cells that dropped to zero carry no information
+                connection.execute(delete(cube_table).where(cube_table.c.sr_count == 0))
+
+            if latest is not None and latest != watermark:
+                _upsert(connection, state_table, ['name'], [{'name': self.name, 'watermark': latest}])
+            stats['watermark'] = latest
+        return stats
+
+    # Take deleted SRs back out of the cube
+    def remove(self, sr_ids):
+        sr_ids = list(sr_ids)
+        with self.engine.begin() as connection:
+            for offset in range(0, len(sr_ids), self.chunk_size):
+                chunk = sr_ids[offset:offset + self.chunk_size]
+                self._apply(connection, chunk, pd.DataFrame(columns=LEDGER_COLUMNS))
+                connection.execute(delete(ledger_table).where(ledger_table.c.sr_id.in_(chunk)))
+            connection.execute(delete(cube_table).where(cube_table.c.sr_count == 0))
+
+    # Same shape as GetSeverityCounts(): one row per day/week/month with open_sevN and close_sevN columns.
+    # Opens are counted on their open day and closes on their close day; both ends of the range are inclusive.
+    # severities picks the columns (any range, e.g. range(1, 21)); None means every severity present.
+    def counts(self, start_date, end_date, level='daily', assoc_mgr_id=None, manager_id=None, severities=None):
+        if level not in LEVELS:
+            raise ValueError(f"Unknown aggregation level {level!r}; expected one of {LEVELS}")
+
+        period = self._period(cube_table.c.day, level).label('aggregation_date')
+        query = (
+            select(period, cube_table.c.severity, cube_table.c.event, func.sum(cube_table.c.sr_count).label('sr_count'))
+                .where(cube_table.c.day.between(start_date, end_date))
+                .group_by(period, cube_table.c.severity, cube_table.c.event)
+        )
+        if assoc_mgr_id is not None:
+            query = query.where(cube_table.c.assoc_manager_id == assoc_mgr_id)
+        if manager_id is not None:
+            query = query.where(cube_table.c.manager_id == manager_id)
+        if assoc_mgr_id is None and manager_id is None:
+            query = query.where(cube_table.c.assoc_manager_id == ALL_MANAGERS)
+        else:
+            query = query.where(cube_table.c.assoc_manager_id != ALL_MANAGERS)
+        if severities is not None:
+            severities = sorted(set(severities))
+            query = query.where(cube_table.c.severity.in_(severities))
+
+        with self.engine.connect() as connection:
+            cells = pd.DataFrame(connection.execute(query).fetchall(),
+                                 columns=['aggregation_date', 'severity', 'event', 'sr_count'])
+        if severities is None:
+            severities = sorted(int(severity) for severity in cells['severity'].unique())
+        columns = [(event, severity) for event in ('open', 'close') for severity in severities]
+        if cells.empty:
+            return pd.DataFrame(columns=['aggregation_date'] + [f"{event}_sev{severity}" for event, severity in columns])
+
+        counts = cells.set_index(['aggregation_date', 'event', 'severity'])['sr_count'].unstack(['event', 'severity'])
+        counts = counts.reindex(columns=pd.MultiIndex.from_tuples(columns), fill_value=0).fillna(0).astype('int64')
+        counts.columns = [f"{event}_sev{severity}" for event, severity in columns]
+        return counts.reset_index()
@@ -0,0 +1,90 @@
+import json
+from datetime import date, timedelta
+from itertools import groupby
+
+from sqlalchemy import text
+
+STAFF_COLUMNS = ['tech_id', 'first_name', 'state', 'city', 'zone', 'team']
+TOTAL_COLUMN = 'Total SRs'
+
+# closed_date's day as each database spells it; the range filter itself stays on the raw column
+# so an index on siebel_srs.closed_date can be used
+DAY_EXPRESSIONS = {
+    'postgresql': "s.closed_date::date",
+    'sqlite': "date(s.closed_date)",
+}
+
+# One scan of the period's SRs, grouped per technician, day and severity bucket before the staff join
+PIVOT_QUERY = """
+    SELECT sm.tech_id, sm.first_name, sm.state, sm.city, sm.zone, sm.team, sm.emp_id, c.closed_day, c.bucket, c.cnt
+    FROM (
+        SELECT s.siebel_id,
+               {closed_day} AS closed_day,
+               CASE WHEN s.severity > 5 THEN '5+' ELSE CAST(s.severity AS TEXT) END AS bucket,
+               COUNT(*) AS cnt
+        FROM siebel_srs s
+        WHERE s.closed_date >= :start_date AND s.closed_date < :end_exclusive
+        GROUP BY 1, 2, 3
+    ) c
+    JOIN staff_master sm ON sm.emp_id = c.siebel_id
+    ORDER BY sm.tech_id, sm.emp_id, c.closed_day, c.bucket
+"""
+
+# Same period pivot_severity_summary_json() uses: the 1st of this month up to yesterday
+def default_period(today=None):
+    today = today or date.today()
+    return today.replace(day=1), today - timedelta(days=1)
+
+# Yield one dict per technician, ordered by tech_id, with the same keys pivot_severity_summary_json() builds:
+# the staff columns, "Total SRs", then one "YYYY-MM-DD" key per day holding e.g. "2 P1, 3 P5+" or None.
+# Rows are streamed from a server-side cursor, so only one technician is held in memory at a time.
+def iter_pivot_rows(engine, start_date=None, end_date=None):
+    if start_date is None or end_date is None:
+        start_date, end_date = default_period()
+    days = [(start_date + timedelta(days=offset)).isoformat() for offset in range((end_date - start_date).days + 1)]
+    if not days:
+        return
+
+    query = text(PIVOT_QUERY.format(closed_day=DAY_EXPRESSIONS[engine.dialect.name]))
+    params = {'start_date': start_date, 'end_exclusive': end_date + timedelta(days=1)}
+    with engine.connect().execution_options(stream_results=True) as connection:
+        result = connection.execute(query, params)
+        for _, tech_rows in groupby(result, key=lambda row: (row.tech_id, row.emp_id)):
+            tech_rows = list(tech_rows)
+            first = tech_rows[0]
+            record = {column: getattr(first, column) for column in STAFF_COLUMNS}
+            record[TOTAL_COLUMN] = sum(row.cnt for row in tech_rows)
+            record.update(dict.fromkeys(days))
+
+            # Buckets arrive sorted within each day, so the breakdown reads "2 P1, 3 P2, 1 P5+".
+            # SRs without a severity count towards the total but, as string_agg() skips them in
+            # pivot_severity_summary_rows(), not in the breakdown; a day with only those stays None.
+            for closed_day, day_rows in groupby(tech_rows, key=lambda row: row.closed_day):
+                breakdown = [f"{row.cnt} P{row.bucket}" for row in day_rows if row.bucket is not None]
+                record[str(closed_day)] = ', '.join(breakdown) or None
+            yield record
+
+def iter_pivot_json(engine, start_date=None, end_date=None):
+    for record in iter_pivot_rows(engine, start_date, end_date):
+        yield json.dumps(record, default=str)
+
+# Write the JSON array pivot_severity_summary_json() returns, one technician at a time
+def write_pivot_json(engine, file, start_date=None, end_date=None):
+    count = 0
+    file.write('[')
+    for document in iter_pivot_json(engine, start_date, end_date):
+        file.write(',\n' if count else '\n')
+        file.write(document)
+        count += 1
+    file.write('\n]\n' if count else ']\n')
+    return count
+
+# Stream the SQL path, pivot_severity_summary_rows() (sql/pivot_severity_summary_rows.sql), one JSON row per technician
+def iter_pivot_json_sql(engine, start_date=None, end_date=None):
+    if start_date is None or end_date is None:
+        start_date, end_date = default_period()
+    with engine.connect().execution_options(stream_results=True) as connection:
+        result = connection.execute(text("SELECT pivot_severity_summary_rows(:start_date, :end_date)::text"),
+                                    {'start_date': start_date, 'end_date': end_date})
+        for (document,) in result:
+            yield document
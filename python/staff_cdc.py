@@ -0,0 +1,147 @@
+import io
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import JSON, DateTime, Integer, String, bindparam, column, delete, insert, select, table, text, update
+
+KEY = 'emp_id'
+# Columns copied from staff_staging into staff_master; a row is rewritten only when their hash changes
+SYNC_COLUMNS = ['zone', 'team', 'title', 'firstname', 'lastname', 'mobile']
+# Columns whose changes are recorded in staff_history, as compare_old_new_data_in_col.sql does
+HISTORY_COLUMNS = ['zone', 'team', 'title']
+# Staging rows loaded, and master/history rows written, per round trip
+BATCH_SIZE = 10000
+
+def _staff_table(name):
+    return table(name, column(KEY, Integer), *(column(name, String) for name in SYNC_COLUMNS))
+
+staging_table = _staff_table('staff_staging')
+master_table = _staff_table('staff_master')
+history_table = table(
+    'staff_history',
+    column(KEY, Integer),
+    *(column(name, String) for name in SYNC_COLUMNS),
+    column('change_date', DateTime),
+    column('comments', JSON),
+)
+
+# Changed feed rows, staged per sync in a temporary table so staff_staging is left to whoever else loads it
+CHANGES_TABLE = 'staff_cdc_changes'
+
+# Append frame to target: COPY on PostgreSQL, batched inserts elsewhere
+def _copy_rows(connection, target, frame, batch_size):
+    frame = frame[[KEY] + SYNC_COLUMNS]
+    if connection.dialect.name == 'postgresql':
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False, na_rep='\\N')
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(
+            f"COPY {target.name} ({', '.join([KEY] + SYNC_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer,
+        )
+    else:
+        records = frame.astype(object).where(frame.notna(), None).to_dict('records')
+        for start in range(0, len(records), batch_size):
+            connection.execute(insert(target), records[start:start + batch_size])
+
+# Replace the contents of staff_staging with frame
+def _replace_staging(connection, frame, batch_size):
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text("TRUNCATE staff_staging"))
+    else:
+        connection.execute(delete(staging_table))
+    _copy_rows(connection, staging_table, frame, batch_size)
+
+# Empty temporary table shaped like staff_staging, private to this connection. PostgreSQL drops it at commit;
+# elsewhere sync_staff drops it itself (and any left over on a pooled connection is dropped first).
+def _create_changes_table(connection):
+    columns = ', '.join([KEY] + SYNC_COLUMNS)
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text(f"CREATE TEMP TABLE {CHANGES_TABLE} ON COMMIT DROP AS "
+                                f"SELECT {columns} FROM staff_staging WITH NO DATA"))
+    else:
+        connection.execute(text(f"DROP TABLE IF EXISTS temp.{CHANGES_TABLE}"))
+        connection.execute(text(f"CREATE TEMP TABLE {CHANGES_TABLE} AS SELECT {columns} FROM staff_staging WHERE 0"))
+    connection.execute(text(f"CREATE INDEX {CHANGES_TABLE}_{KEY} ON {CHANGES_TABLE} ({KEY})"))
+    return _staff_table(CHANGES_TABLE)
+
+def load_staging(engine, frame, batch_size=BATCH_SIZE):
+    with engine.begin() as connection:
+        _replace_staging(connection, frame, batch_size)
+    return len(frame)
+
+# One 64-bit hash per row over columns. Values are compared as nullable strings, so every NULL hashes alike
+# whatever dtype it was read as, and NULL -> value or value -> NULL both count as changes.
+def _row_hashes(frame, columns):
+    return pd.util.hash_pandas_object(frame[columns].astype('string'), index=False, categorize=False).to_numpy()
+
+def _read(connection, source):
+    query = select(source.c[KEY], *(source.c[name] for name in SYNC_COLUMNS))
+    return pd.DataFrame(connection.execute(query).fetchall(), columns=[KEY] + SYNC_COLUMNS)
+
+def _history_rows(changed, change_date):
+    rows = []
+    for record in changed.to_dict('records'):
+        rows.append({
+            KEY: record[KEY],
+            **{name: record[f"{name}_old"] for name in SYNC_COLUMNS},
+            'change_date': change_date,
+            'comments': {'changes': {
+                name: {'old': record[f"{name}_old"], 'new': record[f"{name}_new"]} for name in HISTORY_COLUMNS
+            }},
+        })
+    return rows
+
+# Apply a staff feed to staff_master, rewriting only the rows whose SYNC_COLUMNS hash changed and writing a
+# staff_history row for each that changed in HISTORY_COLUMNS. Feed rows with no master row are ignored.
+# A feed DataFrame is diffed in memory and only its changed rows are staged, in a temporary table; without one,
+# whatever is already in staff_staging is applied.
+def sync_staff(engine, feed=None, batch_size=BATCH_SIZE):
+    change_date = datetime.now()
+    with engine.begin() as connection:
+        staging = _read(connection, staging_table) if feed is None else feed[[KEY] + SYNC_COLUMNS]
+        master = _read(connection, master_table)
+
+        merged = staging.merge(master, on=KEY, suffixes=('_new', '_old'))
+        new = merged[[f"{name}_new" for name in SYNC_COLUMNS]].set_axis(SYNC_COLUMNS, axis=1)
+        old = merged[[f"{name}_old" for name in SYNC_COLUMNS]].set_axis(SYNC_COLUMNS, axis=1)
+        differs = _row_hashes(new, SYNC_COLUMNS) != _row_hashes(old, SYNC_COLUMNS)
+        in_history = _row_hashes(new[differs], HISTORY_COLUMNS) != _row_hashes(old[differs], HISTORY_COLUMNS)
+        changed = merged[differs]
+        changed = changed.astype(object).where(changed.notna(), None)
+        history = changed[in_history]
+
+        staged = 0
+        source = staging_table
+        if feed is not None:
+            source = _create_changes_table(connection)
+            _copy_rows(connection, source, new[differs].assign(**{KEY: merged[KEY][differs]}), batch_size)
+            staged = len(changed)
+
+        # New values are in source, so each batch is one UPDATE ... FROM over the changed ids
+        changed_ids = [int(emp_id) for emp_id in changed[KEY]]
+        statement = (
+            update(master_table)
+            .values({name: source.c[name] for name in SYNC_COLUMNS})
+            .where(master_table.c[KEY] == source.c[KEY])
+            .where(master_table.c[KEY].in_(bindparam('emp_ids', expanding=True)))
+        )
+        for start in range(0, len(changed_ids), batch_size):
+            connection.execute(statement, {'emp_ids': changed_ids[start:start + batch_size]})
+        if feed is not None and connection.dialect.name != 'postgresql':
+            connection.execute(text(f"DROP TABLE temp.{CHANGES_TABLE}"))
+
+        history_rows = _history_rows(history, change_date)
+        for start in range(0, len(history_rows), batch_size):
+            connection.execute(insert(history_table), history_rows[start:start + batch_size])
+
+    return {
+        'scanned': len(staging),
+        'unmatched': len(staging) - len(merged),
+        'changed': len(changed),
+        'staged': staged,
+        'master_written': len(changed_ids),
+        'history_written': len(history_rows),
+        'written': staged + len(changed_ids) + len(history_rows),
+    }
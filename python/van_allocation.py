@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import Boolean, Date, Integer, String, column, select, table, text
+
+allocation_table = table(
+    'van_allocation_history',
+    column('van_number', String),
+    column('emp_id', Integer),
+    column('start_date', Date),
+    column('end_date', Date),
+    column('is_active', Boolean),
+)
+mileage_table = table(
+    'van_mileage',
+    column('id', Integer),
+    column('van_number', String),
+    column('mileage_date', Date),
+    column('emp_id', Integer),
+)
+# Mileage rows read, and emp_id updates sent, per round trip
+CHUNK_SIZE = 500000
+BATCH_SIZE = 20000
+# Day number an open-ended (NULL end_date) allocation runs until
+OPEN_END = np.iinfo(np.int32).max
+# Allocation keys are van_code * DAY_SPAN + day, so one sorted array covers every van
+DAY_SPAN = 1 << 32
+DAY_OFFSET = 1 << 31
+NO_EMP = -1
+OVERLAP_POLICIES = ('latest', 'raise')
+
+def _days(values):
+    return pd.to_datetime(pd.Series(values)).to_numpy().astype('datetime64[D]').astype(np.int64)
+
+def load_allocations(connection, include_inactive=True):
+    query = select(*allocation_table.c)
+    if not include_inactive:
+        query = query.where(allocation_table.c.is_active.is_(True))
+    return pd.DataFrame(connection.execute(query).fetchall(), columns=[c.name for c in allocation_table.c])
+
+def _ends(ordered):
+    return np.where(ordered['end_date'].isna(), OPEN_END, _days(ordered['end_date'].fillna(ordered['start_date'])))
+
+# Allocations that start on or before an earlier allocation of the same van ends. Each is paired with the
+# earlier one that runs longest, so one allocation spanning several later ones is reported against each.
+def find_overlaps(allocations):
+    ordered = allocations.sort_values(['van_number', 'start_date', 'is_active'], kind='stable').reset_index(drop=True)
+    starts = _days(ordered['start_date'])
+    ends = _ends(ordered)
+    van_numbers = ordered['van_number']
+    # Running latest end per van, and the position of the allocation holding it
+    running_end = pd.Series(ends).groupby(van_numbers).cummax().to_numpy()
+    holder = pd.Series(np.where(ends == running_end, np.arange(len(ends)), -1)).groupby(van_numbers).cummax().to_numpy()
+
+    same_van = (van_numbers.to_numpy()[1:] == van_numbers.to_numpy()[:-1])
+    following = np.flatnonzero(same_van & (starts[1:] <= running_end[:-1])) + 1
+    previous, following = ordered.iloc[holder[following - 1]], ordered.iloc[following]
+    return pd.DataFrame({
+        'van_number': previous['van_number'].to_numpy(),
+        'emp_id': previous['emp_id'].to_numpy(),
+        'start_date': previous['start_date'].to_numpy(),
+        'end_date': previous['end_date'].to_numpy(),
+        'next_emp_id': following['emp_id'].to_numpy(),
+        'next_start_date': following['start_date'].to_numpy(),
+    })
+
+# Allocations sorted per van into non-overlapping [start, end] day intervals.
+# Where two overlap, the one that starts later takes over from its start date (an active allocation wins
+# a tie), which is what a reassignment recorded without closing the previous one means. An allocation nested
+# inside a longer one only covers its own days: the longer one owns the van again once it ends.
+class AllocationIntervals:
+    def __init__(self, allocations, overlap='latest'):
+        if overlap not in OVERLAP_POLICIES:
+            raise ValueError(f"overlap must be one of {OVERLAP_POLICIES}, not {overlap!r}")
+        self.overlaps = find_overlaps(allocations)
+        if overlap == 'raise' and len(self.overlaps):
+            raise ValueError(f"{len(self.overlaps)} overlapping van allocations, first: "
+                             f"{self.overlaps.iloc[0].to_dict()}")
+
+        ordered = allocations.sort_values(['van_number', 'start_date', 'is_active'], kind='stable')
+        self.vans = pd.Index(ordered['van_number'].unique())
+        van_codes = self.vans.get_indexer(ordered['van_number']).astype(np.int64)
+        starts = _days(ordered['start_date'])
+        ends = _ends(ordered)
+        # An allocation without an emp_id still takes the van over, but assigns nobody
+        self.unassigned = int(ordered['emp_id'].isna().sum())
+        emp_ids = ordered['emp_id'].astype('Int64').to_numpy(dtype=np.int64, na_value=NO_EMP)
+
+        # Sweep each van's allocations in start order with a stack of the ones still running: the newest owns
+        # the van until it ends, then the next one down that hasn't ended yet takes it back. One Python step
+        # per allocation; the per-row lookups in assign() stay vectorized.
+        segment_vans, segment_starts, segment_ends, segment_emps = [], [], [], []
+
+        def emit(van_code, start, end, emp_id):
+            if start <= end:
+                segment_vans.append(van_code)
+                segment_starts.append(start)
+                segment_ends.append(end)
+                segment_emps.append(emp_id)
+
+        def close(van_code, running, cursor, before=OPEN_END + 1):
+            # Hand the van down the stack until the owner still runs at day before
+            while running and running[-1][0] < before:
+                end, emp_id = running.pop()
+                if cursor <= end:
+                    emit(van_code, cursor, end, emp_id)
+                    cursor = end + 1
+            return cursor
+
+        running, cursor, current_van = [], 0, None
+        for van_code, start, end, emp_id in zip(van_codes.tolist(), starts.tolist(), ends.tolist(), emp_ids.tolist()):
+            if van_code != current_van:
+                close(current_van, running, cursor)
+                running, cursor, current_van = [], start, van_code
+            cursor = close(van_code, running, cursor, start)
+            if running:
+                emit(van_code, cursor, start - 1, running[-1][1])
+            running.append((end, emp_id))
+            cursor = start
+        close(current_van, running, cursor)
+
+        segment_vans = np.array(segment_vans, dtype=np.int64)
+        self.keys = segment_vans * DAY_SPAN + (np.array(segment_starts, dtype=np.int64) + DAY_OFFSET)
+        self.van_codes = segment_vans
+        self.ends = np.array(segment_ends, dtype=np.int64)
+        self.emp_ids = np.array(segment_emps, dtype=np.int64)
+
+    # emp_id owning each (van_number, day), NO_EMP where no allocation covers it
+    def assign(self, van_numbers, days):
+        van_codes = self.vans.get_indexer(van_numbers).astype(np.int64)
+        positions = np.searchsorted(self.keys, van_codes * DAY_SPAN + (days + DAY_OFFSET), side='right') - 1
+        clipped = np.maximum(positions, 0)
+        covered = ((van_codes >= 0) & (positions >= 0) & (self.van_codes[clipped] == van_codes)
+                   & (days <= self.ends[clipped]))
+        return np.where(covered, self.emp_ids[clipped], NO_EMP)
+
+# Set van_mileage.emp_id by primary key, one batch per round trip: PostgreSQL gets a single
+# UPDATE ... FROM unnest(), other databases a driver-level executemany (SQLAlchemy's per-row
+# parameter processing costs more than the update itself at this volume)
+def _write(connection, ids, emp_ids):
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text("""
+            UPDATE van_mileage vm SET emp_id = v.emp_id
+            FROM unnest(CAST(:ids AS BIGINT[]), CAST(:emp_ids AS BIGINT[])) AS v(id, emp_id)
+            WHERE vm.id = v.id
+        """), {'ids': ids.tolist(), 'emp_ids': emp_ids.tolist()})
+    else:
+        marker = '?' if connection.dialect.paramstyle == 'qmark' else '%s'
+        connection.exec_driver_sql(f"UPDATE van_mileage SET emp_id = {marker} WHERE id = {marker}",
+                                   list(zip(emp_ids.tolist(), ids.tolist())))
+
+# Backfill van_mileage.emp_id between start_date and end_date (both optional) from every allocation,
+# historical ones included. Rows no allocation covers, or one without an emp_id (counted in
+# stats['null_emp_allocations']), keep their emp_id; rows already right are not written.
+# Each chunk is committed on its own, so an interrupted backfill keeps its progress and a rerun skips it.
+def backfill_mileage(engine, start_date=None, end_date=None, include_inactive=True, overlap='latest',
+                     chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE):
+    stats = {'scanned': 0, 'assigned': 0, 'unassigned': 0, 'written': 0, 'overlaps': 0, 'null_emp_allocations': 0}
+    with engine.connect() as connection:
+        intervals = AllocationIntervals(load_allocations(connection, include_inactive), overlap)
+    stats['overlaps'] = len(intervals.overlaps)
+    stats['null_emp_allocations'] = intervals.unassigned
+    if intervals.unassigned:
+        print(f"Warning: {intervals.unassigned} van allocations have no emp_id; their mileage is left as is")
+
+    query = select(mileage_table.c.id, mileage_table.c.van_number, mileage_table.c.mileage_date,
+                   mileage_table.c.emp_id)
+    if start_date is not None:
+        query = query.where(mileage_table.c.mileage_date >= start_date)
+    if end_date is not None:
+        query = query.where(mileage_table.c.mileage_date <= end_date)
+    query = query.order_by(mileage_table.c.id).limit(chunk_size)
+
+    after = None
+    while True:
+        page = query if after is None else query.where(mileage_table.c.id > after)
+        with engine.begin() as connection:
+            rows = pd.DataFrame(connection.execute(page).fetchall(),
+                                columns=['id', 'van_number', 'mileage_date', 'emp_id'])
+            if rows.empty:
+                break
+            after = int(rows['id'].iloc[-1])
+            owners = intervals.assign(rows['van_number'].to_numpy(dtype=object), _days(rows['mileage_date']))
+            current = rows['emp_id'].astype('Int64').to_numpy(dtype=np.int64, na_value=NO_EMP)
+
+            covered = owners != NO_EMP
+            changed = covered & (owners != current)
+            ids, owners = rows['id'].to_numpy(dtype=np.int64)[changed], owners[changed]
+            for start in range(0, len(ids), batch_size):
+                _write(connection, ids[start:start + batch_size], owners[start:start + batch_size])
+
+        stats['scanned'] += len(rows)
+        stats['assigned'] += int(covered.sum())
+        stats['unassigned'] += int((~covered).sum())
+        stats['written'] += len(ids)
+    return stats
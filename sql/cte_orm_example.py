@@ -1,5 +1,8 @@
+from sqlalchemy import select
 from sqlalchemy.orm import aliased
-from sqlalchemy.sql import func, or_, and_
+from sqlalchemy.sql import func
+
+from filter_query import FilterSpec, iter_keyset, keyset_page
 
 # Alias for Employee (Manager Table)
 manager_alias = aliased(Employee)
@@ -12,8 +15,22 @@ filters = {
     "manager_first_name": "John"
 }
 
+# 🔹 Filters applied inside the CTE, plus the joined columns the search text looks in
+cte_spec = FilterSpec(
+    {
+        "department": (NewHire.department, "eq"),
+        "employee_last_name": (Employee.last_name, "like"),
+    },
+    search_columns=[NewHire.name, NewHire.position, Employee.first_name, Employee.last_name],
+)
+
+# 🔹 Filters applied outside the CTE (Manager)
+manager_spec = FilterSpec({
+    "manager_first_name": (manager_alias.first_name, "like"),
+})
+
 # Step 1: Define the CTE
-cte_query = session.query(
+cte_query = select(
     NewHire.id.label('emp_id'),
     func.concat(Employee.first_name, ' ', Employee.last_name).label('emp_full_name'),
     NewHire.manager_id.label('emp_manager_id')
@@ -21,54 +38,23 @@ cte_query = session.query(
     Employee, Employee.id == NewHire.old_emp_id  # Join Employee inside CTE
 )
 
-# 🔹 Apply dynamic filters inside CTE
-cte_filters = {
-    "department": (NewHire.department, "eq"),
-    "employee_last_name": (Employee.last_name, "like"),
-}
-
-for key, (column, filter_type) in cte_filters.items():
-    if key in filters:
-        if filter_type == "eq":
-            cte_query = cte_query.filter(column == filters[key])
-        elif filter_type == "like":
-            cte_query = cte_query.filter(column.like(f"{filters[key]}%"))
-
-# 🔹 Apply search text dynamically
-search_conditions = [
-    or_(
-        NewHire.name.ilike(f"%{term}%"),
-        NewHire.position.ilike(f"%{term}%"),
-        Employee.first_name.ilike(f"%{term}%"),
-        Employee.last_name.ilike(f"%{term}%")
-    )
-    for term in search_text.split()
-]
-
-if search_conditions:
-    cte_query = cte_query.filter(or_(*search_conditions))
-
-cte = cte_query.cte()  # Create the CTE
+# Values are bound parameters, so every call with the same active filters reuses one compiled statement
+cte = cte_spec.apply(cte_query, filters, search_text).cte()  # Create the CTE
 
 # Step 2: Query CTE + Apply Additional Filters Outside CTE (Manager)
-query = session.query(
-    *[cte.c[column.name] for column in cte.columns],  # Select all CTE columns
+query = select(
+    *cte.c,  # Select all CTE columns
     func.concat(manager_alias.first_name, ' ', manager_alias.last_name).label('manager_name')
 ).join(
     manager_alias, manager_alias.id == cte.c.emp_manager_id
 )
+query = manager_spec.apply(query, filters)
 
-# 🔹 Apply dynamic filters outside CTE (Manager)
-manager_filters = {
-    "manager_first_name": (manager_alias.first_name, "like")
-}
-
-for key, (column, filter_type) in manager_filters.items():
-    if key in filters:
-        if filter_type == "eq":
-            query = query.filter(column == filters[key])
-        elif filter_type == "like":
-            query = query.filter(column.like(f"{filters[key]}%"))
+# Execute Query: one page at a time, keyed on emp_id, instead of pulling everything with .all()
+first_page, next_after = keyset_page(session, query, [cte.c.emp_id], page_size=500)
+if next_after is not None:
+    second_page, next_after = keyset_page(session, query, [cte.c.emp_id], page_size=500, after=next_after)
 
-# Execute Query
-results = query.all()
+# ... or walk every match without holding them all in memory
+for row in iter_keyset(session, query, [cte.c.emp_id], page_size=500):
+    print(row.emp_id, row.emp_full_name, row.manager_name)
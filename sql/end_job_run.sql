@@ -1,11 +1,14 @@
+-- fts_job_log ids are the UUIDs start_job_run() returns; drop the old INTEGER overload
+DROP FUNCTION IF EXISTS end_job_run(INTEGER, TEXT, TIMESTAMP, TEXT);
+
 CREATE OR REPLACE FUNCTION end_job_run(
-    p_log_id INTEGER,
+    p_log_id UUID,
     p_status TEXT,
     p_ended_at TIMESTAMP,
     p_error_message TEXT DEFAULT NULL
 ) RETURNS VOID AS $$
 DECLARE
-    v_job_id INTEGER;
+    v_job_id UUID;
 BEGIN
     -- Update the log entry
     UPDATE fts_job_log
@@ -0,0 +1,18 @@
+-- Per-stage metrics of a job run, written by python/job_run.py.
+-- One row per named stage plus a '(total)' row for the whole run; compare a stage's duration_ms
+-- and peak_memory_bytes across days to see which one regressed.
+CREATE TABLE IF NOT EXISTS fts_job_stage_log (
+    id BIGSERIAL PRIMARY KEY,
+    log_id UUID NOT NULL REFERENCES fts_job_log (id),
+    stage TEXT NOT NULL,
+    started_at TIMESTAMP NOT NULL,
+    ended_at TIMESTAMP NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    row_count BIGINT,
+    peak_memory_bytes BIGINT,
+    status TEXT NOT NULL,
+    error_message TEXT
+);
+
+CREATE INDEX IF NOT EXISTS ix_fts_job_stage_log_log_id ON fts_job_stage_log (log_id);
+CREATE INDEX IF NOT EXISTS ix_fts_job_stage_log_stage ON fts_job_stage_log (stage, started_at);
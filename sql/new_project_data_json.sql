@@ -0,0 +1,14 @@
+-- Per-site field_info documents, kept up to date by python/project_json.py instead of rebuilding
+-- the whole table with build_json.sql. source_hash is md5 of the project_data row the document was
+-- built from plus a fingerprint of project_metadata; a site is rebuilt only when it no longer matches.
+CREATE TABLE IF NOT EXISTS new_project_data_json (
+    site TEXT PRIMARY KEY,
+    field_info JSON NOT NULL,
+    source_hash TEXT,
+    built_at TIMESTAMP
+);
+
+-- A table created by build_json.sql's SELECT ... INTO: every site is rebuilt on the first run
+ALTER TABLE new_project_data_json ADD COLUMN IF NOT EXISTS source_hash TEXT;
+ALTER TABLE new_project_data_json ADD COLUMN IF NOT EXISTS built_at TIMESTAMP;
+CREATE UNIQUE INDEX IF NOT EXISTS ux_new_project_data_json_site ON new_project_data_json (site);
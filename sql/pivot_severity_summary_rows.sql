@@ -0,0 +1,65 @@
+-- Single-scan replacement for pivot_severity_summary_json().
+-- Reads the period's SRs once, builds every day's "2 P1, 3 P5+" breakdown in one grouped pass and
+-- returns one JSON object per technician (same keys and order as before) instead of one giant value.
+CREATE OR REPLACE FUNCTION pivot_severity_summary_rows(
+    p_start_date DATE DEFAULT date_trunc('month', CURRENT_DATE)::date,
+    p_end_date DATE DEFAULT CURRENT_DATE - 1
+) RETURNS SETOF JSON AS $$
+BEGIN
+    RETURN QUERY
+    WITH day_counts AS (
+        -- Range on the raw column so an index on closed_date can be used
+        SELECT
+            s.siebel_id,
+            s.closed_date::date AS closed_day,
+            CASE WHEN s.severity > 5 THEN '5+' ELSE s.severity::TEXT END AS sev,
+            COUNT(*) AS cnt
+        FROM siebel_srs s
+        WHERE s.closed_date >= p_start_date
+          AND s.closed_date < p_end_date + 1
+        GROUP BY 1, 2, 3
+    ),
+    day_breakdowns AS (
+        SELECT
+            siebel_id,
+            closed_day,
+            string_agg(cnt || ' P' || sev, ', ' ORDER BY sev) AS breakdown,
+            SUM(cnt) AS total
+        FROM day_counts
+        GROUP BY siebel_id, closed_day
+    ),
+    tech_totals AS (
+        SELECT siebel_id, SUM(total) AS total
+        FROM day_breakdowns
+        GROUP BY siebel_id
+    ),
+    fields AS (
+        SELECT sm.tech_id, sm.emp_id, f.ord, f.key, f.value
+        FROM staff_master sm
+        JOIN tech_totals t ON t.siebel_id = sm.emp_id
+        CROSS JOIN LATERAL (VALUES
+            (1, 'tech_id', to_json(sm.tech_id)),
+            (2, 'first_name', to_json(sm.first_name)),
+            (3, 'state', to_json(sm.state)),
+            (4, 'city', to_json(sm.city)),
+            (5, 'zone', to_json(sm.zone)),
+            (6, 'team', to_json(sm.team)),
+            (7, 'Total SRs', to_json(t.total))
+        ) AS f(ord, key, value)
+
+        UNION ALL
+
+        -- Every day of the period, null where the technician closed nothing
+        SELECT sm.tech_id, sm.emp_id, 8 + (g.day - p_start_date), g.day::TEXT, to_json(b.breakdown)
+        FROM staff_master sm
+        JOIN tech_totals t ON t.siebel_id = sm.emp_id
+        CROSS JOIN generate_series(p_start_date, p_end_date, INTERVAL '1 day') AS gs(ts)
+        CROSS JOIN LATERAL (SELECT gs.ts::date AS day) g
+        LEFT JOIN day_breakdowns b ON b.siebel_id = sm.emp_id AND b.closed_day = g.day
+    )
+    SELECT json_object_agg(key, value ORDER BY ord)
+    FROM fields
+    GROUP BY tech_id, emp_id
+    ORDER BY tech_id, emp_id;
+END;
+$$ LANGUAGE plpgsql;